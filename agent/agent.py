@@ -1,37 +1,186 @@
-
+import copy
+from itertools import islice
 from .llm import call_llm
-from . import tools
+from .context_store import ContextStore
+from .executor import execute_plan, prefetches, run_prefetches
+from .memo import MEMO, MEMO_ENABLED
+from .plan_cache import normalize_prompt
+from .registry import ToolSpec, get_tool
+from .tracing import span
 from logger.info_logger import info_logger
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
 
 # Logger setup
 logger = info_logger()
 
-def answer(q: str):
-    logger.info(f"answer: Received question: {q}")
-    tasks: Union[List[Dict[str, Any]], str, None] = call_llm(q)
-    results: List[Any] = []
-    context: Dict[str, Any] = {}
+NO_ANSWER = "Sorry, I could not find an answer."
+DEFAULT_CHUNK_SIZE = 1000
+
+def prepare_call(sub_tasks: Dict[str, Any], caller: str = "answer") -> Optional[Tuple[ToolSpec, Dict[str, Any], bool]]:
+    """`(spec, validated args, memoized)` for a planned call, or None for an unknown tool."""
+    spec = get_tool(sub_tasks["tool"])
+    if spec is None:
+        return None
+    args: Dict[str, Any] = sub_tasks.get("args", {})
+    spec.validate(args)
+    logger.info("%s: Calling %s with args: %s", caller, spec.name, args)
+    return spec, args, spec.cacheable and MEMO_ENABLED
+
+def run_tool(sub_tasks: Dict[str, Any], context: Dict[str, Any]) -> Any:
+    call = prepare_call(sub_tasks)
+    if call is None:
+        return None
+    spec, args, memoized = call
+    with span("tool", spec.name):
+        if memoized:
+            return MEMO.call(spec, args, context, lambda ctx: spec.invoke(args, ctx))
+        return spec.invoke(args, context)
+
+def _is_call(sub_tasks: Any) -> bool:
+    return isinstance(sub_tasks, dict) and "tool" in sub_tasks
 
+def plan(q: str) -> List[Dict[str, Any]]:
+    """The tool calls `call_llm` plans for a question, without any non-call entries."""
+    with span("call_llm"):
+        tasks: Union[List[Dict[str, Any]], str, None] = call_llm(q)
     if tasks and isinstance(tasks, list):
-        for sub_tasks in tasks:
-            if isinstance(sub_tasks, dict) and "tool" in sub_tasks:
-                if sub_tasks["tool"] == "calc":
-                    logger.info(f"answer: Calling evaluate with expr: {sub_tasks['args']['expr']}")
-                    results.append(tools.evaluate(sub_tasks["args"]["expr"], context))
-                elif sub_tasks["tool"] == "weather":
-                    city: str = sub_tasks["args"]["city"]
-                    keyword: str = sub_tasks["args"]["keyword"]
-                    logger.info(f"answer: Calling temp for city: {city}, keyword: {keyword}")
-                    t = tools.temp(city, keyword, context)
-                    results.append(t)
-                elif sub_tasks["tool"] == "kb":
-                    logger.info(f"answer: Calling kb_lookup for q: {sub_tasks['args']['q']}")
-                    results.append(tools.kb_lookup(sub_tasks["args"]["q"], context))
-                elif sub_tasks["tool"] == "job_search":
-                    logger.info(f"answer: Calling job_search with args: {sub_tasks['args']}")
-                    results.append(tools.job_search(sub_tasks["args"], context))
-
-    ans: str = results[-1] if results else "Sorry, I could not find an answer."
-    logger.info(f"answer: Final answer: {ans}")
+        return [t for t in tasks if _is_call(t)]
+    return []
+
+def final_answer(results: List[Any]) -> Any:
+    ans: str = results[-1] if results else NO_ANSWER
+    logger.info("answer: Final answer: %s", ans)
     return ans
+
+def begin(q: str, caller: str = "answer") -> Tuple[List[Dict[str, Any]], ContextStore]:
+    """The plan for a question and the fresh context it runs in."""
+    logger.info("%s: Received question: %s", caller, q)
+    return plan(q), ContextStore()
+
+def answer(q: str):
+    """
+    Answers one question: `begin`, `execute_plan` with `run_tool`, `final_answer`.
+
+    `answer_async` (agent.async_agent) shares this core: the same `begin`, `prepare_call`,
+    memo, level planning and `final_answer`. Only the way a level's calls run differs:
+    threads here, tasks on the event loop there. `answer` does not wrap `answer_async` in
+    `asyncio.run`, because an event loop per question costs several times a typical answer
+    (about 440 us vs 65 us for a calc question). It also cannot be called from code that is
+    already inside a running loop.
+    """
+    with span("answer"):
+        tasks, context = begin(q)
+        return final_answer(execute_plan(tasks, context, run_tool))
+
+def answer_stream(q: str, offset: int = 0, limit: Optional[int] = None) -> Iterator[Any]:
+    """
+    `answer` for results too large to hold: when the final call's tool can stream (job_search),
+    its results are yielded one by one as they are found, after the calls before it have run.
+    `offset`/`limit` page through them. Any other answer is yielded as a single item.
+    """
+    tasks = plan(q)
+    if not tasks:
+        yield final_answer([])
+        return
+    *head, last = tasks
+    spec = get_tool(last["tool"])
+    if spec is None or spec.stream_runner is None:
+        yield final_answer(execute_plan(tasks, ContextStore(), run_tool))
+        return
+    context = ContextStore()
+    execute_plan(head, context, run_tool)
+    args = dict(last.get("args", {}))
+    if offset:
+        args["offset"] = offset
+    if limit is not None:
+        args["limit"] = limit
+    spec.validate(args)
+    logger.info("answer_stream: Streaming %s with args: %s", spec.name, args)
+    yield from spec.invoke_stream(args, context)
+
+def _shared_key(call: Dict[str, Any]) -> Optional[Hashable]:
+    """
+    `(tool, args)` for a call whose result depends on its args alone, so identical calls of a
+    batch can share one run; None for calls that read the context (calc substitutes earlier
+    results into its expression) or have unhashable args.
+    """
+    spec = get_tool(call["tool"])
+    args = call.get("args", {})
+    if spec is None or spec.reads(args):
+        return None
+    try:
+        return spec.name, frozenset(args.items())
+    except TypeError:
+        return None
+
+def _run_shared(calls: Dict[Hashable, Dict[str, Any]]) -> Dict[Hashable, Tuple[Any, Dict[str, Any]]]:
+    """Runs each call once in an empty context: `(result or exception, context writes)` per key."""
+    outcomes = {}
+    for key, call in calls.items():
+        writes: Dict[str, Any] = {}
+        try:
+            outcomes[key] = (run_tool(call, writes), writes)
+        except Exception as e:  # raised again in every plan that makes the call
+            outcomes[key] = (e, writes)
+    return outcomes
+
+def _answer_chunk(questions: List[Any]) -> List[Any]:
+    """
+    Answers one chunk. Normalized-identical questions are planned once. A call that several
+    plans make with the same args (and that reads no context) runs once before the plans,
+    and each plan gets a copy of its result and context writes, as from the memo. Tools
+    with a prefetch hook get one for the whole chunk.
+    """
+    plans: Dict[Hashable, List[Dict[str, Any]]] = {}
+    for q in questions:
+        key = normalize_prompt(q)
+        if key not in plans:
+            plans[key] = begin(q, "answer_many")[0]
+    calls = [call for tasks in plans.values() for call in tasks]
+    run_prefetches(prefetches(calls))
+
+    counts: Dict[Hashable, int] = {}
+    first: Dict[Hashable, Dict[str, Any]] = {}
+    for call in calls:
+        key = _shared_key(call)
+        if key is not None:
+            counts[key] = counts.get(key, 0) + 1
+            first.setdefault(key, call)
+    outcomes = _run_shared({key: first[key] for key, n in counts.items() if n > 1})
+
+    def run(call: Dict[str, Any], context: Dict[str, Any]) -> Any:
+        outcome = outcomes.get(_shared_key(call)) if outcomes else None
+        if outcome is None:
+            return run_tool(call, context)
+        if isinstance(outcome[0], Exception):
+            raise outcome[0]
+        result, writes = copy.deepcopy(outcome)  # one copy keeps a result and its write aliased
+        context.update(writes)
+        return result
+
+    answers: Dict[Hashable, Any] = {}
+    for key, tasks in plans.items():
+        with span("answer"):
+            answers[key] = final_answer(execute_plan(tasks, ContextStore(), run, prefetch=False))
+    logger.info("answer_many: Answered %s questions (%s distinct, %s shared calls run once)",
+                len(questions), len(answers), len(outcomes))
+    return [answers[normalize_prompt(q)] for q in questions]
+
+def answer_many(questions: Iterable[Any], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Answers a stream of questions, yielding answers in input order.
+
+    Questions are taken `chunk_size` at a time. Within a chunk, normalized-identical
+    questions are planned once, identical context-free calls across the chunk's plans run
+    once (`_answer_chunk`), and each plan then runs like `answer`, with the executor's level
+    concurrency. Non-string questions get `NO_ANSWER`, as from `answer`. Only one chunk is
+    held in memory, so arbitrarily long inputs can be streamed through.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    it = iter(questions)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield from _answer_chunk(chunk)
@@ -0,0 +1,162 @@
+from array import array
+from bisect import bisect_left
+from collections import deque
+from itertools import accumulate
+from typing import Dict, Iterable, List, Sequence, Set
+
+_SHIFT = 21  # every code point fits in 21 bits
+_CHAR_MASK = (1 << _SHIFT) - 1
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher over characters.
+
+    Transitions live in one flat dict keyed by `(state << 21) | ord(char)` rather than a dict
+    per trie node, which keeps large pattern sets (100k+ names) affordable. Pattern indices
+    are positions in the iterable passed in, so callers that add patterns in priority order
+    can ask for the best match directly with `first_match`.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        goto: Dict[int, int] = {}
+        children: List[List[int]] = [[]]
+        own: List[List[int]] = [[]]
+        count = 0
+        for idx, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                key = (state << _SHIFT) | ord(ch)
+                nxt = goto.get(key)
+                if nxt is None:
+                    nxt = len(own)
+                    goto[key] = nxt
+                    children[state].append(key)
+                    children.append([])
+                    own.append([])
+                state = nxt
+            own[state].append(idx)
+            count += 1
+
+        n = len(own)
+        fail = array("i", [0]) * n
+        best = array("i", [min(o) if o else -1 for o in own])
+        outputs: List[List[int]] = own
+        queue = deque([0])
+        while queue:
+            state = queue.popleft()
+            for key in children[state]:
+                child = goto[key]
+                queue.append(child)
+                if state == 0:
+                    continue
+                ch = key & _CHAR_MASK
+                f = fail[state]
+                while True:
+                    target = goto.get((f << _SHIFT) | ch)
+                    if target is not None:
+                        fail[child] = target
+                        break
+                    if f == 0:
+                        break
+                    f = fail[f]
+                f = fail[child]
+                if best[f] != -1 and (best[child] == -1 or best[f] < best[child]):
+                    best[child] = best[f]
+                if outputs[f]:
+                    outputs[child] = outputs[child] + outputs[f]
+
+        self._goto = goto
+        self._fail = fail
+        self._best = best
+        self._outputs = outputs
+        self.size = count
+
+    def tables(self) -> Dict[str, array]:
+        """
+        The automaton as flat arrays for `MappedAhoCorasick`: the edges of state s are
+        `chars[starts[s]:starts[s + 1]]` (ascending) with their `targets`, plus `fail` and `best`.
+        """
+        counts = [0] * (len(self._fail) + 1)
+        chars, targets = array("I"), array("I")
+        for key in sorted(self._goto):
+            counts[(key >> _SHIFT) + 1] += 1
+            chars.append(key & _CHAR_MASK)
+            targets.append(self._goto[key])
+        return {"starts": array("I", accumulate(counts)), "chars": chars, "targets": targets,
+                "fail": self._fail, "best": self._best}
+
+    def first_match(self, text: str) -> int:
+        """Smallest index of any pattern occurring in `text`, or -1."""
+        goto, fail, best = self._goto, self._fail, self._best
+        found = best[0]
+        state = 0
+        for ch in text:
+            c = ord(ch)
+            while True:
+                nxt = goto.get((state << _SHIFT) | c)
+                if nxt is not None or state == 0:
+                    break
+                state = fail[state]
+            state = nxt or 0
+            b = best[state]
+            if b != -1 and (found == -1 or b < found):
+                found = b
+        return found
+
+    def matches(self, text: str) -> Set[int]:
+        """Indices of every pattern occurring in `text`."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found: Set[int] = set(outputs[0])
+        state = 0
+        for ch in text:
+            c = ord(ch)
+            while True:
+                nxt = goto.get((state << _SHIFT) | c)
+                if nxt is not None or state == 0:
+                    break
+                state = fail[state]
+            state = nxt or 0
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+
+class MappedAhoCorasick:
+    """
+    `first_match` over the arrays from `AhoCorasick.tables()`, e.g. memoryviews of a mapped
+    snapshot. Edges are found by bisecting the state's sorted chars instead of hashing,
+    and the root's edges, where most scans restart, are kept in a small dict.
+    """
+
+    def __init__(self, starts: Sequence[int], chars: Sequence[int], targets: Sequence[int],
+                 fail: Sequence[int], best: Sequence[int]):
+        self._starts = starts
+        self._chars = chars
+        self._targets = targets
+        self._fail = fail
+        self._best = best
+        self._root = {chars[i]: targets[i] for i in range(starts[0], starts[1])}
+
+    def first_match(self, text: str) -> int:
+        """Smallest index of any pattern occurring in `text`, or -1."""
+        starts, chars, targets, fail, best, root = (
+            self._starts, self._chars, self._targets, self._fail, self._best, self._root)
+        found = best[0]
+        state = 0
+        for ch in text:
+            c = ord(ch)
+            while True:
+                if state == 0:
+                    state = root.get(c, 0)
+                    break
+                lo, hi = starts[state], starts[state + 1]
+                i = bisect_left(chars, c, lo, hi)
+                if i < hi and chars[i] == c:
+                    state = targets[i]
+                    break
+                state = fail[state]
+            b = best[state]
+            if b != -1 and (found == -1 or b < found):
+                found = b
+        return found
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import weakref
+from typing import Any, Dict, Optional
+from logger.info_logger import info_logger
+from .agent import begin, final_answer, prepare_call
+from .executor import execute_plan_async
+from .memo import MEMO
+from .tracing import span
+
+# Logger setup
+logger = info_logger()
+
+MAX_CONCURRENCY = int(os.environ.get("AGENT_ASYNC_CONCURRENCY", "256"))
+MAX_PENDING = int(os.environ.get("AGENT_ASYNC_MAX_PENDING", "1024"))
+REQUEST_TIMEOUT = float(os.environ.get("AGENT_REQUEST_TIMEOUT", "30"))
+
+class Overloaded(RuntimeError):
+    """Raised when a request arrives while the limiter's wait queue is already full."""
+
+
+class Limiter:
+    """At most `concurrency` requests in flight and `max_pending` waiting; beyond that, shed load."""
+
+    def __init__(self, concurrency: int = MAX_CONCURRENCY, max_pending: int = MAX_PENDING):
+        self._sem = asyncio.Semaphore(concurrency)
+        self._waiting = 0
+        self.max_pending = max_pending
+
+    async def __aenter__(self) -> "Limiter":
+        if self._sem.locked():
+            if self._waiting >= self.max_pending:
+                raise Overloaded(f"{self._waiting} requests already waiting")
+            self._waiting += 1
+            try:
+                await self._sem.acquire()
+            finally:
+                self._waiting -= 1
+        else:
+            await self._sem.acquire()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self._sem.release()
+
+
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Limiter]" = weakref.WeakKeyDictionary()
+
+
+def get_limiter() -> Limiter:
+    """The limiter of the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = _limiters[loop] = Limiter()
+    return limiter
+
+
+async def run_tool_async(sub_tasks: Dict[str, Any], context: Dict[str, Any]) -> Any:
+    """Dispatches to the tool's async runner; tools without one (calc) are CPU-only and run inline."""
+    call = prepare_call(sub_tasks, "answer_async")
+    if call is None:
+        return None
+    spec, args, memoized = call
+    with span("tool", spec.name):
+        if memoized:
+            return await MEMO.call_async(spec, args, context, lambda ctx: spec.invoke_async(args, ctx))
+        return await spec.invoke_async(args, context)
+
+
+async def _answer(q: str) -> Any:
+    async with get_limiter():
+        with span("answer_async"):
+            tasks, context = begin(q, "answer_async")
+            return final_answer(await execute_plan_async(tasks, context, run_tool_async))
+
+
+async def answer_async(q: str, timeout: Optional[float] = REQUEST_TIMEOUT) -> Any:
+    """
+    Async `answer`, on the same core (see `agent.agent.answer`). Requests beyond the running loop's concurrency limit wait their turn
+    (or raise `Overloaded` once the wait queue is full), and `timeout` seconds, queueing
+    included, bound the whole request (`asyncio.TimeoutError`).
+    """
+    return await asyncio.wait_for(_answer(q), timeout)
@@ -0,0 +1,35 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Union
+from .data_store import FileBackedStore
+from .job_store import get_job_store
+from .kb_store import get_kb_store
+from .weather import get_weather_service
+from . import tools
+
+
+async def ensure_loaded(store: FileBackedStore) -> None:
+    """Moves a (re)load of the store's file off the event loop; a warm store is only `stat`ed."""
+    try:
+        stale = store.is_stale()
+    except OSError:
+        return  # let the tool report the missing file the way it always has
+    if stale:
+        await asyncio.to_thread(store.snapshot)
+
+
+async def temp_async(city: str, keyword: str, context: Optional[Dict[str, Any]] = None) -> str:
+    """Answers from the weather cache on the loop; a fetch from the weather service runs in a thread."""
+    if get_weather_service().fresh((city or "").strip().lower()):
+        return tools.temp(city, keyword, context)
+    return await asyncio.to_thread(tools.temp, city, keyword, context)
+
+
+async def kb_lookup_async(q: str, context: Optional[Dict[str, Any]] = None,
+                          k: Optional[int] = None) -> Union[str, List[Dict[str, Any]]]:
+    await ensure_loaded(get_kb_store())
+    return tools.kb_lookup(q, context, k)
+
+
+async def job_search_async(args: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    await ensure_loaded(get_job_store())
+    return tools.job_search(args, context)
@@ -0,0 +1,107 @@
+"""
+Trains the byte-level BPE vocab used by agent.token_count.
+
+    python -m agent.bpe_train data/bpe_vocab.tiktoken FILES... [--vocab-size 8192]
+
+Ranks 0-255 are the single bytes; every later rank is one merge, in the order it was learned.
+The output is tiktoken's format, so a vocab trained here and a published one are interchangeable.
+"""
+import argparse
+import base64
+import heapq
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from .token_count import PIECE_PATTERN
+
+
+def count_pieces(texts: Iterable[str]) -> Counter:
+    pieces = Counter()
+    for text in texts:
+        pieces.update(PIECE_PATTERN.findall(text))
+    return pieces
+
+
+def train(pieces: Counter, vocab_size: int, min_count: int = 2) -> Dict[bytes, int]:
+    """Learns merges from piece frequencies, updating pair counts incrementally after each merge."""
+    ranks = {bytes([b]): b for b in range(256)}
+    words: List[List[bytes]] = []
+    freqs: List[int] = []
+    for piece, n in pieces.items():
+        if n >= min_count:
+            data = piece.encode("utf-8")
+            words.append([data[i:i + 1] for i in range(len(data))])
+            freqs.append(n)
+
+    pair_counts: Dict[Tuple[bytes, bytes], int] = defaultdict(int)
+    where: Dict[Tuple[bytes, bytes], set] = defaultdict(set)
+    for idx, word in enumerate(words):
+        for pair in zip(word, word[1:]):
+            pair_counts[pair] += freqs[idx]
+            where[pair].add(idx)
+    heap = [(-n, pair) for pair, n in pair_counts.items()]
+    heapq.heapify(heap)
+
+    while len(ranks) < vocab_size and heap:
+        neg, pair = heapq.heappop(heap)
+        if pair_counts.get(pair, 0) != -neg:
+            continue  # stale entry
+        if -neg < min_count:
+            break
+        merged = pair[0] + pair[1]
+        if merged not in ranks:
+            ranks[merged] = len(ranks)
+        touched = set()
+        for idx in where.pop(pair, ()):
+            word, n = words[idx], freqs[idx]
+            for old in zip(word, word[1:]):
+                pair_counts[old] -= n
+                touched.add(old)
+            out, i = [], 0
+            while i < len(word):
+                if i + 1 < len(word) and word[i] == pair[0] and word[i + 1] == pair[1]:
+                    out.append(merged)
+                    i += 2
+                else:
+                    out.append(word[i])
+                    i += 1
+            words[idx] = out
+            for new in zip(out, out[1:]):
+                pair_counts[new] += n
+                where[new].add(idx)
+                touched.add(new)
+        pair_counts.pop(pair, None)
+        for p in touched:
+            n = pair_counts.get(p, 0)
+            if n > 0:
+                heapq.heappush(heap, (-n, p))
+            else:
+                pair_counts.pop(p, None)
+    return ranks
+
+
+def write_ranks(ranks: Dict[bytes, int], path: str) -> None:
+    with open(path, "wb") as f:
+        for token, rank in sorted(ranks.items(), key=lambda item: item[1]):
+            f.write(base64.b64encode(token) + b" " + str(rank).encode() + b"\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m agent.bpe_train")
+    parser.add_argument("out")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--vocab-size", type=int, default=8192)
+    opts = parser.parse_args()
+
+    def texts():
+        for path in opts.files:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                yield f.read()
+
+    ranks = train(count_pieces(texts()), opts.vocab_size)
+    write_ranks(ranks, opts.out)
+    print(f"wrote {len(ranks)} ranks to {opts.out}")
+
+
+if __name__ == "__main__":
+    main()
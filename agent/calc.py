@@ -0,0 +1,149 @@
+import re
+from functools import lru_cache
+from typing import List, Sequence, Tuple, Union
+from constants import OP_MAP
+from logger.info_logger import info_logger
+
+# Logger setup
+logger = info_logger()
+
+Node = tuple
+Program = Tuple[Union[int, str], ...]
+
+# One alternation, longest phrase first, does what a `\b{k}\b` substitution per OP_MAP key
+# (longest first) followed by dropping `and` did.
+_WORD_OPS = dict(OP_MAP, **{"and": ""})
+_WORD_OPS_RE = re.compile(r"\b(" + "|".join(re.escape(k) for k in sorted(_WORD_OPS, key=lambda x: -len(x))) + r")\b")
+_TOKEN_RE = re.compile(r"\d+\.?\d*|[+\-*/%A()]")
+_NUMBER_RE = re.compile(r"^\d+\.?\d*$")
+
+NEG = "~"
+CACHE_SIZE = 4096
+
+
+def normalize(expr: str) -> str:
+    """Lowercases the expression, swaps operator words for symbols and drops `and`."""
+    return _WORD_OPS_RE.sub(lambda m: _WORD_OPS[m.group(1)], expr.lower())
+
+
+def normalize_expr(expr: str) -> str:
+    expr = normalize(expr)
+    logger.info("normalize_expr: Normalized expression: %s", expr)
+    return expr
+
+
+def tokenize(expr: str) -> List[str]:
+    return _TOKEN_RE.findall(expr.strip())
+
+
+def is_number(token: str) -> bool:
+    return _NUMBER_RE.match(token) is not None
+
+
+def precedence(op: str) -> int:
+    if op in ('+', '-', 'A'): return 1
+    if op in ('*', '/', '%'): return 2
+    return 0
+
+
+def apply_operation(a: float, b: float, op: str) -> float:
+    if op == '+': return a + b
+    if op == '-': return a - b
+    if op == '*': return a * b
+    if op == '/': return a / b if b != 0 else (float("inf") if a >= 0 else float('-inf'))
+    if op == '%': return (a / 100) * b
+    if op == 'A': return (a + b) / 2
+    raise ValueError(f"Unsupported operator {op}")
+
+
+def _reduce(nodes: List[Node], ops: List[str]) -> bool:
+    """
+    Folds the top operator into a node, mirroring the stack evaluator's rules: with fewer
+    than two operands only a pending `-` can be applied (as unary minus). Returns False when
+    the operator has to stay on the stack.
+    """
+    if len(nodes) < 2:
+        if len(nodes) == 1 and ops[-1] == '-':
+            ops.pop()
+            nodes[-1] = (NEG, nodes[-1])
+            return True
+        return False
+    b = nodes.pop()
+    a = nodes.pop()
+    nodes.append((ops.pop(), a, b))
+    return True
+
+
+def parse(tokens: Sequence[str]) -> List[Node]:
+    """
+    Shunting-yard parse of a token list into ASTs. Leaves are `("num", i)` where `i` is the
+    position of the number among the numeric tokens, so the tree depends only on the shape
+    of the expression and can be reused for any numbers. Returns the operand stack that is
+    left over; the expression's value is the value of its last tree.
+    """
+    nodes: List[Node] = []
+    ops: List[str] = []
+    slot = 0
+    for token in tokens:
+        if _NUMBER_RE.match(token):
+            nodes.append(("num", slot))
+            slot += 1
+        elif token == '(':
+            ops.append(token)
+        elif token == ')':
+            while ops and ops[-1] != '(':
+                if not _reduce(nodes, ops):
+                    break
+            ops.pop()
+        else:
+            while ops and ops[-1] != '(' and precedence(ops[-1]) >= precedence(token):
+                if not _reduce(nodes, ops):
+                    break
+            ops.append(token)
+    while ops:
+        if not _reduce(nodes, ops):
+            break
+    return nodes
+
+
+def compile_nodes(nodes: Sequence[Node]) -> Program:
+    """Flattens ASTs into a postfix program: ints push a number slot, strings apply an operator."""
+    program: List[Union[int, str]] = []
+    for root in nodes:
+        stack = [root]
+        out: List[Union[int, str]] = []
+        while stack:
+            node = stack.pop()
+            if node[0] == "num":
+                out.append(node[1])
+            elif node[0] == NEG:
+                out.append(NEG)
+                stack.append(node[1])
+            else:
+                out.append(node[0])
+                stack.append(node[1])
+                stack.append(node[2])
+        out.reverse()
+        program.extend(out)
+    return tuple(program)
+
+
+def run(program: Program, numbers: Sequence[float]) -> float:
+    stack: List[float] = []
+    for step in program:
+        if step.__class__ is int:
+            stack.append(numbers[step])
+        elif step == NEG:
+            stack[-1] = -stack[-1]
+        else:
+            b = stack.pop()
+            stack.append(apply_operation(stack.pop(), b, step))
+    return stack[-1] if stack else 0.0
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expr(expr: str) -> Tuple[Program, Tuple[float, ...]]:
+    """Tokenizes and parses a normalized expression once; repeated expressions hit the cache."""
+    tokens = tokenize(expr)
+    numbers = tuple(float(t) for t in tokens if _NUMBER_RE.match(t))
+    return compile_nodes(parse(tokens)), numbers
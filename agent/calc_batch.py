@@ -0,0 +1,81 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple, Union
+import numpy as np
+from .calc import NEG, Program, compile_nodes, normalize, parse, tokenize
+
+Shape = str
+BatchResult = Union[float, Exception]
+
+_NUMBER_RE = re.compile(r"\d+\.?\d*")
+
+
+@lru_cache(maxsize=1024)
+def compile_shape(shape: Shape) -> Program:
+    """Parses an expression shape (its space-joined tokens, every number replaced by `0`) once."""
+    return compile_nodes(parse(shape.split()))
+
+
+def apply_operation_vec(a: np.ndarray, b: np.ndarray, op: str) -> np.ndarray:
+    """`calc.apply_operation` over whole columns, divide-by-zero giving ±inf by the sign of `a`."""
+    if op == '+': return a + b
+    if op == '-': return a - b
+    if op == '*': return a * b
+    if op == '/':
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            return np.where(b != 0, a / np.where(b != 0, b, 1.0), np.where(a >= 0, np.inf, -np.inf))
+    if op == '%': return (a / 100) * b
+    if op == 'A': return (a + b) / 2
+    raise ValueError(f"Unsupported operator {op}")
+
+
+def run_vec(program: Program, numbers: np.ndarray) -> np.ndarray:
+    """Runs a compiled program over a (rows x slots) matrix of numbers, one row per expression."""
+    stack: List[np.ndarray] = []
+    with np.errstate(over="ignore", invalid="ignore"):
+        for step in program:
+            if step.__class__ is int:
+                stack.append(numbers[:, step])
+            elif step == NEG:
+                stack[-1] = -stack[-1]
+            else:
+                b = stack.pop()
+                stack.append(apply_operation_vec(stack.pop(), b, step))
+    return stack[-1] if stack else np.zeros(len(numbers))
+
+
+def evaluate_batch(exprs: Iterable[str]) -> List[BatchResult]:
+    """
+    Evaluates many expressions at once, returning results in input order.
+
+    Expressions are grouped by shape; each shape is parsed once and evaluated for all of its
+    rows as NumPy column operations. A row that cannot be evaluated gets the exception that
+    `tools.evaluate` would have raised in its place instead of failing the batch. Context
+    substitution is not applied: callers pass fully resolved expressions.
+    """
+    results: List[BatchResult] = []
+    groups: Dict[Shape, Tuple[List[int], List[List[float]]]] = {}
+    for i, expr in enumerate(exprs):
+        results.append(0.0)
+        try:
+            tokens = " ".join(tokenize(normalize(expr)))
+        except Exception as e:
+            results[i] = e
+            continue
+        shape = _NUMBER_RE.sub("0", tokens)
+        group = groups.get(shape)
+        if group is None:
+            group = groups[shape] = ([], [])
+        group[0].append(i)
+        group[1].append(list(map(float, _NUMBER_RE.findall(tokens))))
+
+    for shape, (rows, matrix) in groups.items():
+        try:
+            values = run_vec(compile_shape(shape), np.array(matrix, dtype=np.float64).reshape(len(rows), -1))
+        except Exception as e:
+            for i in rows:
+                results[i] = e
+            continue
+        for i, value in zip(rows, values.tolist()):
+            results[i] = value
+    return results
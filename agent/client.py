@@ -0,0 +1,81 @@
+"""
+Thin client for the answer server (agent.server). It imports nothing from the agent, so a
+question costs a connect and one round trip instead of interpreter warm-up and data loading.
+"""
+import json
+import os
+import socket
+import struct
+import tempfile
+from typing import Any, Dict, Optional
+
+DEFAULT_SOCKET = os.environ.get("AGENT_SOCKET") or os.path.join(tempfile.gettempdir(), "ai-agent.sock")
+OVERLOADED = "overloaded"
+
+
+class ServerError(Exception):
+    """The server answered the request with an error."""
+
+
+class Overloaded(ServerError):
+    """The server's queue was full and the request was shed."""
+
+
+def _check_peer(sock: socket.socket, path: str) -> None:
+    """Refuses a server run by another user, where the OS reports the peer (SO_PEERCRED)."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return
+    _pid, uid, _gid = struct.unpack("3i", sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")))
+    if uid != os.getuid():
+        raise PermissionError(f"the server on {path} runs as uid {uid}, not {os.getuid()}")
+
+
+class Client:
+    """One connection to the server; requests on it are sent one at a time."""
+
+    def __init__(self, path: str = DEFAULT_SOCKET, timeout: Optional[float] = None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(path)
+            _check_peer(self.sock, path)
+        except OSError:
+            self.sock.close()
+            raise
+        self._reader = self.sock.makefile("rb")
+        self._next_id = 0
+
+    def _call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    def ask(self, q: str) -> Any:
+        self._next_id += 1
+        response = self._call({"id": self._next_id, "q": q})
+        error = response.get("error")
+        if error is not None:
+            raise Overloaded(error) if error == OVERLOADED else ServerError(error)
+        return response["answer"]
+
+    def stats(self) -> Dict[str, Any]:
+        return self._call({"cmd": "stats"})
+
+    def close(self) -> None:
+        self._reader.close()
+        self.sock.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def ask(q: str, path: str = DEFAULT_SOCKET, timeout: Optional[float] = None) -> Any:
+    """Answers one question through the server. Raises OSError when no server of this user is
+    listening, and ServerError when the server answers with an error."""
+    with Client(path, timeout) as client:
+        return client.ask(q)
@@ -0,0 +1,157 @@
+"""
+The context a plan's tool calls share: results keyed by the text they stand for (a city name,
+a normalized expression), which `tools.evaluate` substitutes into later expressions.
+
+`ContextStore` keeps a character trie of its keys and updates it on every insert and delete.
+That lets `substitute` replace every key in a text in one left-to-right pass, taking the
+longest key that starts at each position. The cost depends on the text, not on how many keys
+the context has collected. Substituted values are never rescanned, so the result does not
+depend on the order the keys were written in. The store holds at most `max_keys` entries
+(`AGENT_CONTEXT_MAX_KEYS`, default 1024); past that, the least recently written key is dropped.
+Only keys of up to `max_key_length` characters (`AGENT_CONTEXT_MAX_KEY_LENGTH`, default 256)
+go into the trie, which has a node per character. Longer ones, such as a long calc expression,
+are stored but never substituted.
+"""
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Mapping, MutableMapping, Optional
+
+CONTEXT_MAX_KEYS = int(os.environ.get("AGENT_CONTEXT_MAX_KEYS", "1024"))
+CONTEXT_MAX_KEY_LENGTH = int(os.environ.get("AGENT_CONTEXT_MAX_KEY_LENGTH", "256"))
+_END = ""  # a trie node's entry for the key ending there; every other entry is one character
+
+
+def _clone(root: Dict[str, Any]) -> Dict[str, Any]:
+    """A deep copy of a trie, made without recursion so a long key cannot hit the recursion limit."""
+    root = dict(root)
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        for ch, child in node.items():
+            if ch != _END:
+                node[ch] = copy = dict(child)
+                stack.append(copy)
+    return root
+
+
+class ContextStore(MutableMapping):
+    """A dict-like context that substitutes its keys into text in one pass. See the module docstring."""
+
+    def __init__(self, data: Optional[Mapping[str, Any]] = None, max_keys: int = CONTEXT_MAX_KEYS,
+                 max_key_length: int = CONTEXT_MAX_KEY_LENGTH):
+        self.max_keys = max(1, max_keys)
+        self.max_key_length = max_key_length
+        self.evictions = 0
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._root: Dict[str, Any] = {}
+        self._owns_root = True  # False while the trie is shared with a copy
+        self._starts: Optional["re.Pattern"] = None  # finds the characters a key starts with
+        if data:
+            self.update(data)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._data:
+            self._data.move_to_end(key)
+        else:
+            while len(self._data) >= self.max_keys:
+                oldest, _ = self._data.popitem(last=False)
+                self._remove(oldest)
+                self.evictions += 1
+            self._insert(key)
+        self._data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._data[key]
+        self._remove(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __repr__(self) -> str:
+        return f"ContextStore({dict(self._data)!r})"
+
+    def copy(self) -> "ContextStore":
+        """A copy for isolated writes; the trie is shared until either side changes its keys."""
+        other = ContextStore.__new__(ContextStore)
+        other.max_keys, other.max_key_length, other.evictions = self.max_keys, self.max_key_length, 0
+        other._data = OrderedDict(self._data)
+        other._root, other._starts = self._root, self._starts
+        self._owns_root = other._owns_root = False
+        return other
+
+    def _own_root(self) -> Dict[str, Any]:
+        if not self._owns_root:
+            self._root = _clone(self._root)
+            self._owns_root = True
+        return self._root
+
+    def _indexed(self, key: Any) -> bool:
+        return isinstance(key, str) and 0 < len(key) <= self.max_key_length
+
+    def _insert(self, key: str) -> None:
+        if not self._indexed(key):
+            return  # stored, but never substituted
+        node = self._own_root()
+        if key[0] not in node:
+            self._starts = None
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[_END] = key
+
+    def _remove(self, key: str) -> None:
+        if not self._indexed(key):
+            return
+        path = [self._own_root()]
+        for ch in key:
+            node = path[-1].get(ch)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].pop(_END, None)
+        for k in range(len(key) - 1, -1, -1):  # prune the nodes no other key goes through
+            if path[k + 1]:
+                break
+            del path[k][key[k]]
+            if k == 0:
+                self._starts = None
+
+    def substitute(self, text: str) -> str:
+        """`text` with every key replaced by `str(value)`, longest key first, in a single pass."""
+        root = self._root
+        if not root:
+            return text
+        starts = self._starts
+        if starts is None:
+            starts = self._starts = re.compile("[" + "".join(re.escape(ch) for ch in root) + "]")
+        out, start, n = [], 0, len(text)
+        m = starts.search(text)
+        while m is not None:
+            i = m.start()
+            node, key, end = root, None, i
+            for j in range(i, n):  # walk the trie as far as the text follows it, keeping the longest key
+                node = node.get(text[j])
+                if node is None:
+                    break
+                if _END in node:
+                    key, end = node[_END], j + 1
+            if key is None:
+                m = starts.search(text, i + 1)
+                continue
+            out.append(text[start:i])
+            out.append(str(self._data[key]))
+            start = end
+            m = starts.search(text, end)
+        if not out:
+            return text
+        out.append(text[start:])
+        return "".join(out)
@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+from typing import Any, Optional, Tuple
+from logger.info_logger import info_logger
+from .snapshot import SNAPSHOT_SUFFIX, Snapshot, SnapshotError, snapshot_path
+
+USE_SNAPSHOTS = os.environ.get("AGENT_SNAPSHOTS", "1") != "0"
+
+logger = info_logger()
+
+
+class FileBackedStore:
+    """
+    Keeps a parsed, precomputed view of a JSON data file in memory.
+
+    The file is loaded once; every access only `stat`s it, and when the mtime or size
+    changes a brand new view is built off to the side and swapped in as a single
+    attribute assignment, so readers never observe a half-built view.
+
+    Subclasses that set `snapshot_kind` can also be served from a binary snapshot
+    (`agent.snapshot`): `path` may name a `.snap` file directly, and a JSON `path` is
+    mapped from its sibling snapshot when that was compiled from the same file version.
+    """
+
+    snapshot_kind: Optional[str] = None
+
+    def __init__(self, path: str):
+        self.path = path
+        self._state: Optional[Tuple[Tuple[int, int], Any]] = None
+        self._lock = threading.Lock()
+
+    def _build(self, data: Any, stamp: Tuple[int, int]) -> Any:
+        raise NotImplementedError
+
+    def _map(self, snap: Snapshot, stamp: Tuple[int, int]) -> Any:
+        raise NotImplementedError
+
+    def _open(self, stamp: Tuple[int, int]) -> Any:
+        if self.snapshot_kind is not None:
+            if self.path.endswith(SNAPSHOT_SUFFIX):
+                return self._map(Snapshot(self.path, self.snapshot_kind), stamp)
+            if USE_SNAPSHOTS:
+                try:
+                    return self._map(Snapshot(snapshot_path(self.path), self.snapshot_kind, stamp), stamp)
+                except FileNotFoundError:
+                    pass
+                except (SnapshotError, KeyError, ValueError) as e:
+                    logger.warning("%s: Not using snapshot, loading JSON instead: %s", type(self).__name__, e)
+        return self._build(self._load(), stamp)
+
+    def _load(self) -> Any:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _stamp(self) -> Tuple[int, int]:
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def is_stale(self) -> bool:
+        """True when the next `snapshot()` would have to (re)load the file."""
+        state = self._state
+        return state is None or state[0] != self._stamp()
+
+    def snapshot(self) -> Any:
+        stamp = self._stamp()
+        state = self._state
+        if state is not None and state[0] == stamp:
+            return state[1]
+        with self._lock:
+            state = self._state
+            if state is None or state[0] != stamp:
+                state = (stamp, self._open(stamp))
+                self._state = state
+        return state[1]
+
+    def clear(self) -> None:
+        self._state = None
@@ -0,0 +1,206 @@
+"""
+Typo-tolerant lookup of the entities the planner knows: cities, roles, companies, locations
+and KB names.
+
+The extractors match keywords exactly (agent.router), and exact matching stays the fast path.
+`EntityIndex` is only consulted for a slot that the exact scan left empty in a call that has
+already been triggered, such as the city of a weather question. A prompt that matches exactly
+never reaches it. Terms come from the data the tools serve: the cities of the weather table,
+the distinct values of the loaded jobs (`JobSnapshot.fuzzy_values`) and the KB names, so a
+correction never leads to a filter that matches nothing. A prompt word that is itself a term
+is taken as is and never corrected, and neither is an ordinary word: one that is a whole word
+of the BPE vocabulary (`common_words`), such as "remove", is only ever matched exactly.
+
+Lookups use a SymSpell-style deletion dictionary. Every term is stored under each string
+obtained by deleting up to `max_distance(term)` characters from its first `PREFIX` characters.
+A query generates its own deletes the same way, so the terms within edit distance d of it are
+found with O(len^d) dict lookups whatever the vocabulary size. The few candidates are then
+checked with the real (optimal string alignment) distance. Terms shorter than 5 characters
+("uk", "swe") only match exactly; longer ones allow 1 edit, and 9 characters or more allow 2.
+
+    AGENT_FUZZY=1   turns fuzzy resolution on. It is off by default: ordinary words sit one
+                    edit away from terms ("remove" from "remote", "parts" from "paris").
+"""
+import os
+import re
+from typing import Container, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+from .router import keyword_tables, tables_fingerprint
+from .token_count import get_counter
+
+FUZZY_ENABLED = os.environ.get("AGENT_FUZZY", "0") == "1"
+PREFIX = 7  # deletes are generated from this many leading characters, as SymSpell does
+MIN_QUERY = 4  # shorter prompt words are never corrected
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def max_distance(length: int) -> int:
+    """Edits tolerated for a term of this length."""
+    return 0 if length < 5 else 1 if length < 9 else 2
+
+
+def normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent transpositions count once), or limit + 1 beyond `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    start = 0  # a shared prefix or suffix never changes the distance
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return len(a) + len(b) if len(a) + len(b) <= limit else limit + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        ca = a[i - 1]
+        for j in range(1, len(b) + 1):
+            cb = b[j - 1]
+            cost = 0 if ca == cb else 1
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                d = min(d, prev2[j - 2] + 1)
+            cur[j] = d
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1] if prev[-1] <= limit else limit + 1
+
+
+def deletes(text: str, depth: int) -> Set[str]:
+    """`text` and every string made by deleting up to `depth` of its characters."""
+    out = {text}
+    frontier = {text}
+    for _ in range(depth):
+        frontier = {s[:i] + s[i + 1:] for s in frontier if len(s) > 1 for i in range(len(s))} - out
+        out |= frontier
+    return out
+
+
+class EntityIndex:
+    """Deletion dictionary over named tables of terms; see the module docstring."""
+
+    def __init__(self, tables: Dict[str, Iterable[str]]):
+        # normalized term -> [(table, rank, term as listed)]
+        self._owners: Dict[str, List[Tuple[str, int, str]]] = {}
+        self._deletes: Dict[str, List[str]] = {}
+        self._sizes: Dict[str, Dict[int, Tuple[int, int]]] = {}  # table -> word count -> (min, max) term length
+        self.max_distance = 0
+        for table, terms in tables.items():
+            sizes = self._sizes.setdefault(table, {})
+            for rank, term in enumerate(terms):
+                key = normalize(term)
+                if not key:
+                    continue
+                n = key.count(" ") + 1
+                shortest, longest = sizes.get(n, (len(key), len(key)))
+                sizes[n] = (min(shortest, len(key)), max(longest, len(key)))
+                owners = self._owners.get(key)
+                if owners is None:
+                    owners = self._owners[key] = []
+                    depth = max_distance(len(key))
+                    self.max_distance = max(self.max_distance, depth)
+                    for variant in deletes(key[:PREFIX], depth):
+                        self._deletes.setdefault(variant, []).append(key)
+                owners.append((table, rank, term))
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    def lookup(self, text: str, tables: Optional[Sequence[str]] = None,
+               exact: bool = False) -> List[Tuple[int, str, int, str]]:
+        """
+        `(distance, table, rank, term)` for every term within its tolerated distance of `text`
+        (only the exact one with `exact`), closest first. When `text` is itself a term, only its
+        exact owners are returned.
+        """
+        query = normalize(text)
+        owners = self._owners.get(query)
+        if owners is not None:  # exact: no deletes, no distance computation
+            return [(0, table, rank, term) for table, rank, term in owners if tables is None or table in tables]
+        if exact or len(query) < MIN_QUERY:
+            return []
+        found: Dict[str, int] = {}
+        index = self._deletes
+        for variant in deletes(query[:PREFIX], min(self.max_distance, max_distance(len(query) + 2))):
+            for key in index.get(variant, ()):
+                if key not in found:
+                    found[key] = edit_distance(query, key, max_distance(len(key)))
+        out = []
+        for key, distance in found.items():
+            if distance <= max_distance(len(key)):
+                out.extend((distance, table, rank, term) for table, rank, term in self._owners[key]
+                           if tables is None or table in tables)
+        return sorted(out)
+
+    def resolve(self, prompt: str, tables: Sequence[str], known: Container[str] = ()) -> Dict[str, List[str]]:
+        """
+        The terms of `tables` that word spans of `prompt` resolve to, per table in table order
+        (as `Hits.all` reports them). Each span and each term is used at most once; closer
+        matches claim their span first, then longer spans, then earlier ones. Spans made only
+        of `known` words are taken to be spelled right and only match exactly.
+        """
+        words = _WORD_RE.findall(prompt.lower())
+        bounds: Dict[int, Tuple[int, int]] = {}  # word count -> lengths a span needs to reach some term
+        for table in tables:
+            for n, (shortest, longest) in self._sizes.get(table, {}).items():
+                low, high = bounds.get(n, (shortest, longest))
+                bounds[n] = (min(low, shortest), max(high, longest))
+        matches = []
+        for n, (shortest, longest) in bounds.items():
+            for i in range(len(words) - n + 1):
+                text = " ".join(words[i:i + n])
+                if len(text) + max_distance(longest) < shortest or len(text) - max_distance(longest) > longest:
+                    continue
+                exact = all(word in known for word in words[i:i + n])
+                for distance, table, rank, term in self.lookup(text, tables, exact):
+                    matches.append((distance, -n, i, table, rank, term))
+        taken: Set[int] = set()
+        used: Set[Tuple[str, str]] = set()
+        hits: Dict[str, List[Tuple[int, str]]] = {}
+        for distance, neg_n, i, table, rank, term in sorted(matches):
+            span = set(range(i, i - neg_n))
+            if span & taken or (table, term) in used:
+                continue
+            taken |= span
+            used.add((table, term))
+            hits.setdefault(table, []).append((rank, term))
+        return {table: [term for _, term in sorted(found)] for table, found in hits.items()}
+
+
+_index: Optional[Tuple[int, EntityIndex]] = None
+_common: Optional[Tuple[object, FrozenSet[str]]] = None
+
+
+def common_words() -> FrozenSet[str]:
+    """The words that are whole tokens (with their leading space) of the token counter's BPE vocabulary."""
+    global _common
+    counter = get_counter()
+    if _common is None or _common[0] is not counter:
+        tokens = getattr(counter, "ascii_tokens", ())
+        _common = (counter, frozenset(t[1:].lower() for t in tokens if t[:1] == " " and t[1:].isalpha()))
+    return _common[1]
+
+
+def get_entity_index() -> EntityIndex:
+    """The index over the router's city table (the cities the weather provider knows), rebuilt when it changes."""
+    global _index
+    fingerprint = tables_fingerprint()
+    if _index is None or _index[0] != fingerprint:
+        _index = (fingerprint, EntityIndex({"city": keyword_tables()["city"]}))
+    return _index[1]
+
+
+def resolve(prompt: str, tables: Sequence[str]) -> Dict[str, List[str]]:
+    """Fuzzy cities in `prompt` (empty unless AGENT_FUZZY=1)."""
+    if not FUZZY_ENABLED:
+        return {}
+    return get_entity_index().resolve(prompt, tables, common_words())
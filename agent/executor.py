@@ -0,0 +1,162 @@
+import os
+import threading
+from contextvars import copy_context
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+from .registry import ALL, ToolSpec, get_tool
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+
+KeySet = FrozenSet[str]
+Runner = Callable[[Dict[str, Any], Dict[str, Any]], Any]
+AsyncRunner = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Any]]
+
+MAX_WORKERS = int(os.environ.get("AGENT_MAX_WORKERS", "8"))
+
+_pool: Optional["ThreadPoolExecutor"] = None
+_pool_lock = threading.Lock()
+
+
+def context_reads(call: Dict[str, Any]) -> KeySet:
+    """Context keys a tool call reads, as declared by its tool spec; unknown tools read everything."""
+    spec = get_tool(call["tool"])
+    return spec.reads(call.get("args", {})) if spec is not None else ALL
+
+
+def context_writes(call: Dict[str, Any]) -> KeySet:
+    """Context keys a tool call writes, as declared by its tool spec; unknown tools write everything."""
+    spec = get_tool(call["tool"])
+    return spec.writes(call.get("args", {})) if spec is not None else ALL
+
+
+def _parallel_safe(call: Dict[str, Any]) -> bool:
+    spec = get_tool(call["tool"])
+    return spec is None or spec.parallel_safe
+
+
+def _overlaps(a: KeySet, b: KeySet) -> bool:
+    if not a or not b:
+        return False
+    return a is ALL or b is ALL or not a.isdisjoint(b)
+
+
+def plan_levels(tasks: List[Dict[str, Any]]) -> List[List[int]]:
+    """
+    Groups a tool plan into levels that can each run concurrently. Call j depends on an
+    earlier call i when one writes a context key the other reads or writes, or when either
+    tool is not parallel-safe; it is placed one level after the deepest call it depends on.
+    """
+    reads = [context_reads(t) for t in tasks]
+    writes = [context_writes(t) for t in tasks]
+    alone = [not _parallel_safe(t) for t in tasks]
+    depth: List[int] = []
+    for j in range(len(tasks)):
+        level = 0
+        for i in range(j):
+            if (alone[i] or alone[j] or _overlaps(writes[i], reads[j]) or _overlaps(writes[i], writes[j])
+                    or _overlaps(reads[i], writes[j])):
+                level = max(level, depth[i] + 1)
+        depth.append(level)
+    levels: List[List[int]] = [[] for _ in range(max(depth, default=-1) + 1)]
+    for j, level in enumerate(depth):
+        levels[level].append(j)
+    return levels
+
+
+def _get_pool() -> "ThreadPoolExecutor":
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from concurrent.futures import ThreadPoolExecutor  # a plan with one call per level never needs it
+                _pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="agent-tool")
+    return _pool
+
+
+def _writes(scratch: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in scratch.items() if k not in context or context[k] is not v}
+
+
+def _run_isolated(run: Runner, call: Dict[str, Any], context: Dict[str, Any]):
+    scratch = context.copy()
+    result = run(call, scratch)
+    return result, _writes(scratch, context)
+
+
+async def _run_isolated_async(run: AsyncRunner, call: Dict[str, Any], context: Dict[str, Any]):
+    scratch = context.copy()
+    result = await run(call, scratch)
+    return result, _writes(scratch, context)
+
+
+def prefetches(tasks: List[Dict[str, Any]]) -> List[Tuple[ToolSpec, List[Dict[str, Any]]]]:
+    """The tools with a prefetch hook that a plan calls more than once, with the args of each call."""
+    calls: Dict[str, List[Dict[str, Any]]] = {}
+    specs: Dict[str, ToolSpec] = {}
+    for t in tasks:
+        spec = get_tool(t["tool"])
+        if spec is not None and spec.prefetch is not None:
+            specs[spec.name] = spec
+            calls.setdefault(spec.name, []).append(t.get("args", {}))
+    return [(specs[name], args) for name, args in calls.items() if len(args) > 1]
+
+
+def run_prefetches(batches: List[Tuple[ToolSpec, List[Dict[str, Any]]]]) -> None:
+    for spec, calls in batches:
+        spec.invoke_prefetch(calls)
+
+
+def execute_plan(tasks: List[Dict[str, Any]], context: Dict[str, Any], run: Runner, prefetch: bool = True) -> List[Any]:
+    """
+    Runs a tool plan level by level, concurrently within a level, and returns the results in
+    plan order. Concurrent calls work on a copy of the context and their writes are merged
+    back in plan order, so results and context match running the plan sequentially.
+    Tools called more than once get their prefetch hook first (one bulk weather fetch),
+    unless the caller has prefetched for them already (`prefetch=False`).
+    """
+    results: List[Any] = [None] * len(tasks)
+    if prefetch:
+        run_prefetches(prefetches(tasks))
+    for level in plan_levels(tasks):
+        if len(level) == 1:
+            results[level[0]] = run(tasks[level[0]], context)
+            continue
+        pool = _get_pool()
+        # Each call runs in a copy of the caller's contextvars, so tracing spans keep their parent.
+        futures = [pool.submit(copy_context().run, _run_isolated, run, tasks[j], context) for j in level]
+        outcomes = [f.result() for f in futures]
+        for j, (result, writes) in zip(level, outcomes):
+            results[j] = result
+            context.update(writes)
+    return results
+
+
+async def execute_plan_async(tasks: List[Dict[str, Any]], context: Dict[str, Any], run: AsyncRunner) -> List[Any]:
+    """`execute_plan` for async tools: the calls of a level run as concurrent tasks on the running loop."""
+    import asyncio  # already loaded by whoever runs the loop; not imported for the sync path
+
+    results: List[Any] = [None] * len(tasks)
+    batches = prefetches(tasks)
+    if batches:
+        await asyncio.to_thread(run_prefetches, batches)
+    for level in plan_levels(tasks):
+        if len(level) == 1:
+            results[level[0]] = await run(tasks[level[0]], context)
+            continue
+        outcomes = await asyncio.gather(*(_run_isolated_async(run, tasks[j], context) for j in level))
+        for j, (result, writes) in zip(level, outcomes):
+            results[j] = result
+            context.update(writes)
+    return results
+
+
+def _after_fork_in_child() -> None:
+    """A forked child (agent.server's workers) has none of the parent's pool threads; its
+    first parallel level builds a fresh pool instead of queueing work no thread will run."""
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
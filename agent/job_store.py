@@ -0,0 +1,216 @@
+import json
+import os
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from .data_store import FileBackedStore
+from .entity_index import FUZZY_ENABLED, EntityIndex
+from .snapshot import JsonColumn, Snapshot, SnapshotWriter
+
+JOBS_PATH = os.environ.get("AGENT_JOBS_PATH", "data/jobs.json")
+FILTER_ATTRS = ("role", "location", "company", "date_posted")
+FUZZY_ATTRS = ("role", "company", "location")  # the slots agent.llm may resolve as typos
+
+_MISSING = object()
+
+
+def match_key(value: Any) -> str:
+    """What a filter attribute is compared on, by the store and `agent.job_stream` alike:
+    its lowercased text, with a missing or null value as ""."""
+    if value is _MISSING or value is None:
+        return ""
+    return str(value).lower()
+
+
+def _value_key(value: Any) -> Tuple[type, str]:
+    """Distinct-value key for a non-string attribute: by type, so 1 and True stay apart, and by
+    JSON text, so lists and objects can be keyed too."""
+    return value.__class__, json.dumps(value, sort_keys=True)
+
+
+class JobSnapshot:
+    """
+    Columnar view of one version of jobs.json.
+
+    Each filter attribute is an `array('I')` of codes into a table of distinct values, with a
+    posting list (ascending row ids) per lowercased value. Any other fields are kept as plain
+    columns so rows can be rebuilt exactly as they appear in the file, key order included.
+    A `mapped` snapshot has the same attributes backed by views of a binary snapshot file.
+    """
+
+    def __init__(self, jobs: List[Dict[str, Any]], version: Tuple[int, int]):
+        self.version = version
+        self.count = len(jobs)
+        self.values: Dict[str, List[Any]] = {attr: [_MISSING] for attr in FILTER_ATTRS}
+        self.codes: Dict[str, array] = {attr: array("I", bytes(4 * len(jobs))) for attr in FILTER_ATTRS}
+        self.postings: Dict[str, Dict[str, array]] = {attr: {} for attr in FILTER_ATTRS}
+        self.columns: Dict[str, List[Any]] = {}
+        self._fuzzy: Optional[EntityIndex] = None
+        self.schemas: List[Tuple[str, ...]] = []
+        self.schema_ids = array("I")
+
+        code_of: Dict[str, Dict[Any, int]] = {attr: {} for attr in FILTER_ATTRS}  # by value_key
+        schema_of: Dict[Tuple[str, ...], int] = {}
+        for row, job in enumerate(jobs):
+            keys = tuple(job)
+            sid = schema_of.get(keys)
+            if sid is None:
+                sid = schema_of[keys] = len(self.schemas)
+                self.schemas.append(keys)
+            self.schema_ids.append(sid)
+
+            for attr in FILTER_ATTRS:
+                value = job.get(attr, _MISSING)
+                if value is _MISSING:
+                    key = ""
+                else:
+                    codes = code_of[attr]
+                    vkey = value if value.__class__ is str else _value_key(value)
+                    code = codes.get(vkey)
+                    if code is None:
+                        code = codes[vkey] = len(self.values[attr])
+                        self.values[attr].append(value)
+                    self.codes[attr][row] = code
+                    key = match_key(value)
+                posting = self.postings[attr].get(key)
+                if posting is None:
+                    self.postings[attr][key] = array("I", (row,))
+                else:
+                    posting.append(row)
+
+            for key in keys:
+                if key in FILTER_ATTRS:
+                    continue
+                column = self.columns.get(key)
+                if column is None:
+                    column = self.columns[key] = [_MISSING] * len(jobs)
+                column[row] = job[key]
+
+    def dump(self, writer: SnapshotWriter) -> None:
+        writer.meta["count"] = self.count
+        writer.meta["schemas"] = [list(keys) for keys in self.schemas]
+        writer.array("schema_ids", "I", self.schema_ids)
+        value_kinds = {}
+        for attr in FILTER_ATTRS:
+            values = self.values[attr]
+            # Code 0 stands for a missing attribute and is never read back, so it can be "".
+            if all(v is _MISSING or isinstance(v, str) for v in values):
+                value_kinds[attr] = "str"
+                writer.strings(f"values.{attr}", ["" if v is _MISSING else v for v in values])
+            else:
+                value_kinds[attr] = "json"
+                writer.strings(f"values.{attr}", ["" if v is _MISSING else json.dumps(v) for v in values])
+            writer.array(f"codes.{attr}", "I", self.codes[attr])
+            writer.postings(f"postings.{attr}", self.postings[attr])
+        writer.meta["values"] = value_kinds
+        kinds = {}
+        for key, column in self.columns.items():
+            # Rows only read the columns their schema lists, so missing cells can be "".
+            if all(v is _MISSING or isinstance(v, str) for v in column):
+                kinds[key] = "str"
+                writer.strings(f"columns.{key}", ["" if v is _MISSING else v for v in column])
+            else:
+                kinds[key] = "json"
+                writer.strings(f"columns.{key}", ["" if v is _MISSING else json.dumps(v) for v in column])
+        writer.meta["columns"] = kinds
+
+    @classmethod
+    def mapped(cls, snap: Snapshot, version: Tuple[int, int]) -> "JobSnapshot":
+        jobs = cls.__new__(cls)
+        jobs.version = version
+        jobs.count = snap.meta["count"]
+        jobs.schemas = [tuple(keys) for keys in snap.meta["schemas"]]
+        jobs.schema_ids = snap.array("schema_ids")
+        value_kinds = snap.meta.get("values", {})
+        jobs.values = {
+            attr: JsonColumn(snap.strings(f"values.{attr}")) if value_kinds.get(attr) == "json"
+            else snap.strings(f"values.{attr}")
+            for attr in FILTER_ATTRS
+        }
+        jobs.codes = {attr: snap.array(f"codes.{attr}") for attr in FILTER_ATTRS}
+        jobs.postings = {attr: snap.postings(f"postings.{attr}") for attr in FILTER_ATTRS}
+        jobs.columns = {
+            key: snap.strings(f"columns.{key}") if kind == "str" else JsonColumn(snap.strings(f"columns.{key}"))
+            for key, kind in snap.meta["columns"].items()
+        }
+        jobs._fuzzy = None
+        return jobs
+
+    def fuzzy_values(self) -> EntityIndex:
+        """Typo-tolerant index over the distinct (lowercased) role, company and location values, built on first use."""
+        if self._fuzzy is None:
+            self._fuzzy = EntityIndex({attr: [key for key in self.postings[attr] if key] for attr in FUZZY_ATTRS})
+        return self._fuzzy
+
+    def row(self, i: int) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for key in self.schemas[self.schema_ids[i]]:
+            if key in self.codes:
+                out[key] = self.values[key][self.codes[key][i]]
+            else:
+                out[key] = self.columns[key][i]
+        return out
+
+    def match(self, filters: Dict[str, str]) -> Iterator[int]:
+        """Yields, in file order, the row ids whose attributes equal every filter (case-insensitive)."""
+        lists: List[Sequence[int]] = []
+        for attr, value in filters.items():
+            posting = self.postings[attr].get(match_key(value))
+            if posting is None:
+                return
+            lists.append(posting)
+        if not lists:
+            yield from range(self.count)
+            return
+        lists.sort(key=len)
+        head, rest = lists[0], lists[1:]
+        for row in head:
+            for other in rest:
+                i = bisect_left(other, row)
+                if i == len(other) or other[i] != row:
+                    break
+            else:
+                yield row
+
+    def search(self, filters: Dict[str, str], limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        stop = None if limit is None else offset + limit
+        return [self.row(i) for i in islice(self.match(filters), offset, stop)]
+
+
+class JobStore(FileBackedStore):
+    snapshot_kind = "jobs"
+
+    def _load(self) -> Any:
+        if self.path.endswith(".jsonl"):
+            from .job_stream import iter_jobs
+            return {"jobs": list(iter_jobs(self.path))}
+        return super()._load()
+
+    def _build(self, data: Any, stamp: Tuple[int, int]) -> JobSnapshot:
+        return self._ready(JobSnapshot(data.get("jobs", []), stamp))
+
+    def _map(self, snap: Snapshot, stamp: Tuple[int, int]) -> JobSnapshot:
+        return self._ready(JobSnapshot.mapped(snap, stamp))
+
+    @staticmethod
+    def _ready(jobs: JobSnapshot) -> JobSnapshot:
+        if FUZZY_ENABLED:  # built with the data, not inside the first request that needs it
+            jobs.fuzzy_values()
+        return jobs
+
+
+_stores: Dict[str, JobStore] = {}
+
+
+def get_job_store(path: str = JOBS_PATH) -> JobStore:
+    """Returns the process-wide store for `path`, creating it on first use."""
+    store = _stores.get(path)
+    if store is None:
+        store = _stores.setdefault(path, JobStore(path))
+    return store
+
+
+def jobs_version(path: str = JOBS_PATH) -> Tuple[int, int]:
+    """Version (mtime, size) of the jobs data currently served, loading it if needed."""
+    return get_job_store(path).snapshot().version
@@ -0,0 +1,136 @@
+import json
+from itertools import islice
+from typing import Any, Dict, IO, Iterator, Optional
+from logger.info_logger import info_logger
+from .job_store import JOBS_PATH, get_job_store, match_key
+from .snapshot import SNAPSHOT_SUFFIX
+from .tools import job_filters
+
+logger = info_logger()
+
+CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\r\n"
+
+
+class _Reader:
+    """A text buffer over a file that only ever holds the unparsed tail plus one chunk."""
+
+    def __init__(self, f: IO[str], chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it ("" at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self, decode) -> Any:
+        """Decodes one JSON value, reading more input while it is cut off at the buffer end."""
+        self.peek()
+        while True:
+            try:
+                value, end = decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            if end == len(self.buf) and not self.eof and self.buf[self.pos] not in "{[\"":
+                # A bare number may continue in the next chunk.
+                if self.fill():
+                    continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(f: IO[str], key: str = "jobs", chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yields the elements of `document[key]` from a JSON object one at a time, reading `f` in
+    chunks. Memory is bounded by one chunk plus the element being decoded, whatever the size
+    of the array. Keys before `key` are decoded and dropped; anything after the array is not read.
+    """
+    decode = json.JSONDecoder().raw_decode
+    r = _Reader(f, chunk_size)
+    r.expect("{")
+    while r.peek() != "}":
+        name = r.value(decode)
+        r.expect(":")
+        if name != key:
+            r.value(decode)
+        else:
+            r.expect("[")
+            if r.peek() == "]":
+                return
+            while True:
+                yield r.value(decode)
+                if r.peek() == ",":
+                    r.pos += 1
+                    continue
+                r.expect("]")
+                return
+        if r.peek() == ",":
+            r.pos += 1
+        elif r.peek() != "}":
+            raise json.JSONDecodeError("Expecting ',' or '}'", r.buf, r.pos)
+
+
+def iter_jobs(path: str = JOBS_PATH) -> Iterator[Dict[str, Any]]:
+    """Streams jobs from a jobs.json document, or from a `.jsonl` file with one job per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_json_array(f, "jobs")
+
+
+def matches(job: Dict[str, Any], filters: Dict[str, str]) -> bool:
+    """The job store's rule: every filter equals the attribute under `match_key`."""
+    for attr, value in filters.items():
+        if match_key(job.get(attr)) != match_key(value):
+            return False
+    return True
+
+
+def job_search_stream(args: Dict[str, Any], context: Optional[Dict[str, Any]] = None,
+                      path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lazy `job_search`: yields matching jobs in file order while the file is being read, so
+    the first match arrives before the feed is scanned and memory does not grow with it.
+    Honours the same filters and `offset`/`limit` args. A `.snap` path has no JSON to parse,
+    so its rows are read through the mapped store's posting lists instead, still lazily.
+    """
+    filters = job_filters(args)
+    logger.info("job_search_stream: Streaming jobs with args: %s", args)
+    offset = args.get("offset") or 0
+    limit = args.get("limit")
+    path = path or JOBS_PATH
+    if path.endswith(SNAPSHOT_SUFFIX):
+        snap = get_job_store(path).snapshot()
+        found = (snap.row(i) for i in snap.match(filters))
+    else:
+        found = (job for job in iter_jobs(path) if matches(job, filters))
+    yield from islice(found, offset, None if limit is None else offset + limit)
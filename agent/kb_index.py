@@ -0,0 +1,147 @@
+import re
+import string
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .aho_corasick import AhoCorasick
+
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by",
+    "for", "from", "has", "he", "in", "is", "it", "its", "'s", "s",
+    "of", "on", "that", "the", "to", "was", "were", "will", "with"
+})
+
+_PUNCT_RE = re.compile(f"[{re.escape(string.punctuation)}]")
+_WORD_RE = re.compile(r"\w+")
+_GRAM = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases the text, turns punctuation into spaces and splits it into words."""
+    return _PUNCT_RE.sub(" ", text.lower()).split()
+
+
+def _add_postings(index: Dict[str, array], keys: set, entry: int) -> None:
+    get = index.get
+    for key in keys:
+        posting = get(key)
+        if posting is None:
+            index[key] = array("I", (entry,))
+        else:
+            posting.append(entry)
+
+
+class KBIndex:
+    """
+    Inverted indexes over one KB snapshot.
+
+    - `names`: Aho-Corasick automaton over lowercase entry names, for "name occurs in prompt".
+    - `tokens`: planner token -> ascending entry ids, for "prompt word occurs in summary".
+    - `words`: `\\w+` summary word -> ascending entry ids, for kb_lookup.
+    - `grams`: name trigram -> ascending entry ids, for "query occurs in name".
+
+    Entry ids are positions in kb.json, so the head of a posting list is the first entry
+    in file order, which is what the linear scans returned.
+    """
+
+    def __init__(self, names_lower: List[str], summaries: List[str]):
+        self.names_lower = names_lower
+        self.names = AhoCorasick(names_lower)
+        self.tokens: Dict[str, array] = {}
+        self.words: Dict[str, array] = {}
+        self.grams: Dict[str, array] = {}
+        self.short: Dict[str, int] = {}
+
+        for entry, summary in enumerate(summaries):
+            _add_postings(self.tokens, set(tokenize(summary)), entry)
+            _add_postings(self.words, set(_WORD_RE.findall(summary.lower())), entry)
+
+        short = self.short
+        for entry, name in enumerate(names_lower):
+            for size in range(1, _GRAM):
+                for i in range(len(name) - size + 1):
+                    if name[i:i + size] not in short:
+                        short[name[i:i + size]] = entry
+            _add_postings(self.grams, {name[i:i + _GRAM] for i in range(len(name) - _GRAM + 1)}, entry)
+        if names_lower:
+            self.short.setdefault("", 0)
+
+    def match_prompt(self, prompt: str) -> Optional[Tuple[int, Optional[str]]]:
+        """
+        Resolves a prompt the way extract_kb_tool's scan did: the first entry (file order)
+        whose name occurs in the prompt or whose summary shares a non-stop word with it.
+        Returns `(entry, None)` for a name match, `(entry, word)` for a summary-word match.
+        """
+        name_entry = self.names.first_match(prompt.lower())
+
+        words = [w for w in tokenize(prompt) if w not in STOP_WORDS]
+        word_entry = -1
+        for word in words:
+            posting = self.tokens.get(word)
+            if posting is not None and (word_entry == -1 or posting[0] < word_entry):
+                word_entry = posting[0]
+
+        if name_entry != -1 and (word_entry == -1 or name_entry <= word_entry):
+            return name_entry, None
+        if word_entry == -1:
+            return None
+        for word in words:
+            posting = self.tokens.get(word)
+            if posting is not None and posting[0] == word_entry:
+                return word_entry, word
+        return None
+
+    def _name_containing(self, q: str, limit: int) -> int:
+        if len(q) < _GRAM:
+            entry = self.short.get(q, -1)
+            return entry if entry < limit else -1
+        shortest = None
+        for i in range(len(q) - _GRAM + 1):
+            posting = self.grams.get(q[i:i + _GRAM])
+            if posting is None:
+                return -1
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+        return self._first_containing(shortest, q, limit)
+
+    def _first_containing(self, entries: Iterable[int], q: str, limit: int) -> int:
+        names_lower = self.names_lower
+        for entry in entries:
+            if entry >= limit:
+                break
+            if q in names_lower[entry]:
+                return entry
+        return -1
+
+    def lookup(self, q: str) -> Optional[Tuple[int, bool]]:
+        """
+        Resolves a kb_lookup query: the first entry (file order) whose name contains `q` or
+        whose summary has `q` as a word. Returns `(entry, by_name)`.
+        """
+        q_lower = q.lower()
+        posting = self.words.get(q_lower)
+        word_entry = posting[0] if posting is not None else len(self.names_lower)
+        name_entry = self._name_containing(q_lower, word_entry + 1)
+        if name_entry != -1:
+            return name_entry, True
+        if posting is not None:
+            return word_entry, False
+        return None
+
+
+class MappedKBIndex(KBIndex):
+    """
+    KBIndex over prebuilt tables from a mapped snapshot: the lookups only need `get` on the
+    tables and `first_match` on the automaton. Name candidates are checked in the mapped
+    bytes (`StringTable.first_containing`) rather than by decoding every candidate name.
+    """
+
+    def __init__(self, names_lower: Any, names: Any, tokens: Any, words: Any, grams: Any, short: Any):
+        self.names_lower = names_lower
+        self.names = names
+        self.tokens = tokens
+        self.words = words
+        self.grams = grams
+        self.short = short
+
+    def _first_containing(self, entries: Iterable[int], q: str, limit: int) -> int:
+        return self.names_lower.first_containing(entries, q, limit)
@@ -0,0 +1,163 @@
+"""
+Ranked KB retrieval: BM25 over entry names and summaries.
+
+`BM25Index` is a sparse term-document matrix in CSR form by term. For term id t, the entries
+containing it are `docs[starts[t]:starts[t + 1]]` in ascending order, and `weights` holds
+their BM25 weights, computed once at build time:
+
+    idf(t) * tf * (K1 + 1) / (tf + K1 * (1 - B + B * len / avg_len))
+
+`order` lists each term's postings again by descending weight (ties in entry order), as
+offsets into the term's row.
+
+top_k merges the query's rows exactly. A single term needs no merging: the first k offsets
+of its `order` are the answer. Rows with few postings in total are merged with
+`np.unique`/`np.bincount` over just the entries they name. Longer ones are added row by row
+into one dense score vector, and only entries reaching the k-th best weight of some row are
+kept for selection: k entries score at least that much in that row alone, so nothing below
+it can make the top k. The k best then come from a partial selection (`np.partition`),
+ordered by score, and equal scores keep file order.
+
+The arrays are written into the KB snapshot (`agent.snapshot`), so a mapped KB ranks without
+tokenizing anything at load time.
+"""
+import re
+from array import array
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .kb_index import STOP_WORDS
+
+K1 = 1.2
+B = 0.75
+SPARSE_FRACTION = 8  # merge sparsely while the query's postings are under 1/8 of the entries
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def terms(text: str) -> List[str]:
+    """The words of `text` that BM25 counts: lowercase `\\w+` runs that are not stop words."""
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in STOP_WORDS]
+
+
+class BM25Index:
+    """Precomputed BM25 matrix over one KB version; see the module docstring."""
+
+    def __init__(self, term_id: Callable[[str], int], starts: np.ndarray, docs: np.ndarray,
+                 weights: np.ndarray, order: np.ndarray, count: int, vocab: Optional[List[str]] = None):
+        self.term_id = term_id
+        self.vocab = vocab  # term id -> term; only kept by `build`, for `dump`
+        self.starts = starts
+        self.docs = docs
+        self.weights = weights
+        self.order = order
+        self.count = count
+
+    @classmethod
+    def build(cls, names: Iterable[str], summaries: Iterable[str]) -> "BM25Index":
+        vocab: Dict[str, int] = {}
+        term_col, doc_col, tf_col, lengths = array("I"), array("I"), array("I"), array("I")
+        for doc, (name, summary) in enumerate(zip(names, summaries)):
+            counts = Counter(terms(f"{name} {summary}"))
+            lengths.append(sum(counts.values()))
+            for word, tf in counts.items():
+                tid = vocab.get(word)
+                if tid is None:
+                    tid = vocab[word] = len(vocab)
+                term_col.append(tid)
+                doc_col.append(doc)
+                tf_col.append(tf)
+
+        count = len(lengths)
+        term_ids = np.frombuffer(term_col, dtype=np.uint32)
+        order = np.argsort(term_ids, kind="stable")  # by term, then by entry as they were added
+        df = np.bincount(term_ids, minlength=len(vocab))
+        starts = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=starts[1:])
+        docs = np.frombuffer(doc_col, dtype=np.uint32)[order]
+        tf = np.frombuffer(tf_col, dtype=np.uint32)[order].astype(np.float64)
+        doc_len = np.frombuffer(lengths, dtype=np.uint32).astype(np.float64)
+        avg_len = doc_len.mean() if count else 1.0
+        idf = np.log1p((count - df + 0.5) / (df + 0.5))
+        norm = K1 * (1 - B + B * doc_len[docs] / (avg_len or 1.0))
+        weights = (np.repeat(idf, df) * tf * (K1 + 1) / (tf + norm)).astype(np.float32)
+        rows = np.repeat(np.arange(len(vocab), dtype=np.uint32), df)
+        by_weight = np.lexsort((np.arange(len(docs)), -weights, rows))  # per row: weight desc, then entry
+        order = (by_weight - starts[rows]).astype(np.uint32)
+        return cls(lambda w: vocab.get(w, -1), starts, docs, weights, order, count, list(vocab))
+
+    def dump(self, writer: Any) -> None:
+        writer.keys("bm25.terms", self.vocab)
+        writer.array("bm25.starts", "Q", array("Q", self.starts.astype(np.uint64).tobytes()))
+        writer.array("bm25.docs", "I", array("I", self.docs.astype(np.uint32).tobytes()))
+        writer.array("bm25.weights", "f", array("f", self.weights.astype(np.float32).tobytes()))
+        writer.array("bm25.order", "I", array("I", self.order.astype(np.uint32).tobytes()))
+
+    @classmethod
+    def mapped(cls, snap: Any, count: int) -> "BM25Index":
+        keys = snap.keys("bm25.terms")
+        return cls(keys.find, np.frombuffer(snap.array("bm25.starts"), dtype=np.uint64),
+                   np.frombuffer(snap.array("bm25.docs"), dtype=np.uint32),
+                   np.frombuffer(snap.array("bm25.weights"), dtype=np.float32),
+                   np.frombuffer(snap.array("bm25.order"), dtype=np.uint32), count)
+
+    def _spans(self, query: str) -> List[Tuple[int, int]]:
+        spans = []
+        for word in dict.fromkeys(terms(query)):
+            t = self.term_id(word)
+            if t != -1:
+                spans.append((int(self.starts[t]), int(self.starts[t + 1])))
+        return spans
+
+    def _merge(self, spans: List[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        if not spans:
+            return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.float64)
+        if len(spans) == 1:
+            lo, hi = spans[0]
+            return self.docs[lo:hi], self.weights[lo:hi].astype(np.float64)
+        docs = np.concatenate([self.docs[lo:hi] for lo, hi in spans])
+        weights = np.concatenate([self.weights[lo:hi] for lo, hi in spans])
+        if len(docs) * SPARSE_FRACTION < self.count:
+            entries, inverse = np.unique(docs, return_inverse=True)
+            return entries, np.bincount(inverse, weights=weights)
+        dense = np.bincount(docs, weights=weights, minlength=self.count)
+        entries = np.flatnonzero(dense)
+        return entries, dense[entries]
+
+    def scores(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """`(entries, scores)` of every entry sharing a term with `query`, entries ascending."""
+        return self._merge(self._spans(query))
+
+    def _dense_top_k(self, spans: List[Tuple[int, int]], k: int) -> List[Tuple[int, float]]:
+        scores = np.zeros(self.count)
+        floor = 0.0  # the k-th score is at least the k-th weight of any row
+        for lo, hi in spans:
+            scores[self.docs[lo:hi]] += self.weights[lo:hi]  # an entry occurs once per row
+            if hi - lo >= k:
+                floor = max(floor, float(self.weights[lo + int(self.order[lo + k - 1])]))
+        entries = np.flatnonzero(scores >= floor) if floor else np.flatnonzero(scores)
+        return _select(entries, scores[entries], k)
+
+    def top_k(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """The `k` best `(entry, score)` pairs for `query`, best first; equal scores in file order."""
+        spans = self._spans(query)
+        if k <= 0 or not spans:
+            return []
+        if len(spans) == 1:
+            lo, hi = spans[0]
+            best = lo + self.order[lo:min(hi, lo + k)].astype(np.int64)
+            return [(int(e), float(w)) for e, w in zip(self.docs[best], self.weights[best])]
+        if sum(hi - lo for lo, hi in spans) * SPARSE_FRACTION >= self.count:
+            return self._dense_top_k(spans, k)
+        entries, scores = self._merge(spans)
+        return _select(entries, scores, k)
+
+
+def _select(entries: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """The k best of `entries` by score, ties by entry."""
+    if len(entries) > k:
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = np.flatnonzero(scores >= kth)
+        entries, scores = entries[keep], scores[keep]
+    order = np.lexsort((entries, -scores))[:k]
+    return [(int(entries[i]), float(scores[i])) for i in order]
@@ -0,0 +1,120 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+from .aho_corasick import MappedAhoCorasick
+from .data_store import FileBackedStore
+from .entity_index import FUZZY_ENABLED, EntityIndex
+from .kb_index import KBIndex, MappedKBIndex
+from .snapshot import Snapshot, SnapshotWriter
+
+if TYPE_CHECKING:
+    from .kb_rank import BM25Index
+
+KB_PATH = os.environ.get("AGENT_KB_PATH", "data/kb.json")
+# > 0: the kb tool returns this many entries ranked by BM25 (agent.kb_rank) instead of the first match.
+KB_TOP_K = int(os.environ.get("AGENT_KB_TOP_K", "0"))
+
+_ranker_lock = threading.Lock()
+
+_AUTOMATON = ("starts", "chars", "targets", "fail", "best")
+
+
+class KBSnapshot:
+    """
+    One version of kb.json with lowercase names and the prebuilt search index. Built from
+    parsed JSON, or `mapped` from a binary snapshot, where the names, summaries and index
+    tables are views of the mapped file.
+    """
+
+    __slots__ = ("names", "names_lower", "summaries", "index", "version", "_fuzzy", "_ranker", "_snap")
+
+    def __init__(self, entries: List[Dict[str, Any]], version: Tuple[int, int]):
+        self.names: Sequence[str] = [e.get("name", "") for e in entries]
+        self.names_lower: Sequence[str] = [n.lower() for n in self.names]
+        self.summaries: Sequence[str] = [e.get("summary", "") for e in entries]
+        self.index = KBIndex(self.names_lower, self.summaries)
+        self.version = version
+        self._fuzzy: Optional[EntityIndex] = None
+        self._ranker: Optional["BM25Index"] = None
+        self._snap: Optional[Snapshot] = None
+
+    def dump(self, writer: SnapshotWriter) -> None:
+        writer.meta["count"] = len(self.names)
+        writer.strings("names", self.names)
+        writer.strings("names_lower", self.names_lower)
+        writer.strings("summaries", self.summaries)
+        for part, values in self.index.names.tables().items():
+            writer.array(f"automaton.{part}", values.typecode, values)
+        writer.postings("tokens", self.index.tokens)
+        writer.postings("words", self.index.words)
+        writer.postings("grams", self.index.grams)
+        writer.mapping("short", self.index.short)
+        self.ranker().dump(writer)
+
+    @classmethod
+    def mapped(cls, snap: Snapshot, version: Tuple[int, int]) -> "KBSnapshot":
+        kb = cls.__new__(cls)
+        kb.names = snap.strings("names")
+        kb.names_lower = snap.strings("names_lower")
+        kb.summaries = snap.strings("summaries")
+        kb.index = MappedKBIndex(
+            kb.names_lower,
+            MappedAhoCorasick(*(snap.array(f"automaton.{part}") for part in _AUTOMATON)),
+            snap.postings("tokens"), snap.postings("words"), snap.postings("grams"), snap.mapping("short"),
+        )
+        kb.version = version
+        kb._fuzzy = None
+        kb._ranker = None
+        kb._snap = snap
+        return kb
+
+    def fuzzy_names(self) -> EntityIndex:
+        """Typo-tolerant index over the entry names (table "name"), built on first use."""
+        if self._fuzzy is None:
+            self._fuzzy = EntityIndex({"name": self.names})
+        return self._fuzzy
+
+    def ranker(self) -> "BM25Index":
+        """The BM25 matrix over names and summaries: mapped when the snapshot has it, else built on first use."""
+        if self._ranker is None:
+            with _ranker_lock:
+                if self._ranker is None:
+                    from .kb_rank import BM25Index  # numpy is only needed for ranked lookups
+
+                    if self._snap is not None and self._snap.has("bm25.docs"):
+                        self._ranker = BM25Index.mapped(self._snap, len(self.names))
+                    else:
+                        self._ranker = BM25Index.build(self.names, self.summaries)
+        return self._ranker
+
+
+class KBStore(FileBackedStore):
+    snapshot_kind = "kb"
+
+    def _build(self, data: Any, stamp: Tuple[int, int]) -> KBSnapshot:
+        return self._ready(KBSnapshot(data.get("entries", []), stamp))
+
+    def _map(self, snap: Snapshot, stamp: Tuple[int, int]) -> KBSnapshot:
+        return self._ready(KBSnapshot.mapped(snap, stamp))
+
+    @staticmethod
+    def _ready(kb: KBSnapshot) -> KBSnapshot:
+        if FUZZY_ENABLED:  # built with the data, not inside the first request that needs it
+            kb.fuzzy_names()
+        return kb
+
+
+_stores: Dict[str, KBStore] = {}
+
+
+def get_kb_store(path: str = KB_PATH) -> KBStore:
+    """Returns the process-wide store for `path`, creating it on first use."""
+    store = _stores.get(path)
+    if store is None:
+        store = _stores.setdefault(path, KBStore(path))
+    return store
+
+
+def kb_version(path: str = KB_PATH) -> Tuple[int, int]:
+    """Version (mtime, size) of the KB data currently served, loading it if needed."""
+    return get_kb_store(path).snapshot().version
@@ -1,101 +1,127 @@
-import json
-import re
-import string
-from typing import List, Dict, Optional, Union
-from constants import OP_MAP, WEATHER, JOB_KEYWORDS, ROLE_KEYWORDS, LOCATION_KEYWORDS, DATE_KEYWORDS, COMPANY_KEYWORDS
+import logging
+from typing import List, Dict, Optional, Sequence, Union
 from logger.info_logger import info_logger
+from logger.cost_ledger import COST_AGGREGATOR, make_record
 from logger.llm_cost_logger import llm_cost_logger
+from .entity_index import FUZZY_ENABLED, common_words, resolve
+from .job_store import get_job_store
+from .kb_store import KB_TOP_K, get_kb_store
+from .plan_cache import PLAN_CACHE, normalize_prompt
+from .registry import all_tools, get_tool
+from . import registry
+from .router import Hits, scan, tables_fingerprint
+from .token_count import count_tokens
+from .tracing import span
 
 # Logger setup
 logger = info_logger()
 cost_logger = llm_cost_logger()
 
-def log_cost(prompt: str, tools_output: str = "") -> None:
+def log_cost(prompt: str, tools_output: str = "", tools: Sequence[str] = ()) -> Dict[str, object]:
+    """Records one planning call in the cost ledger and the in-process aggregator."""
     # 812 tokens for system prompt
     # 1M tokens = $1, so cost = (tokens / 1_000_000)
-    prompt_tokens = len(prompt.split())
-    output_tokens = len(tools_output.split()) if tools_output else 0
-    total_tokens = 812 + prompt_tokens + output_tokens
-    cost = total_tokens / 1_000_000
-    cost_logger.info(f"Prompt: {prompt} | Total Tokens: {total_tokens} | Cost: ${cost:.6f}")
-
-def extract_calc_tool(prompt: str) -> Optional[Dict[str, any]]:
+    prompt_tokens = count_tokens(prompt)
+    output_tokens = count_tokens(tools_output)
+    record = make_record(prompt, prompt_tokens, output_tokens, tools)
+    COST_AGGREGATOR.add(record)
+    if cost_logger.isEnabledFor(logging.INFO):
+        cost_logger.info("ledger", extra={"ledger": record})
+    return record
+
+def extract_calc_tool(prompt: str, hits: Optional[Hits] = None) -> Optional[Dict[str, any]]:
     """Checks if the prompt involves a calculation and returns a calc tool call if applicable."""
-    calc_keywords = set(OP_MAP.keys()) | set(OP_MAP.values())
-    if any(keyword in prompt for keyword in calc_keywords):
-        logger.info(f"extract_calc_tool: Detected calculation in prompt: {prompt}")
+    hits = hits if hits is not None else scan(prompt)
+    if hits.any("calc"):
+        logger.info("extract_calc_tool: Detected calculation in prompt: %s", prompt)
         return {"tool": "calc", "args": {"expr": prompt}}
     return None
 
-def extract_weather_tool(prompt: str) -> List[Dict[str, any]]:
+def extract_weather_tool(prompt: str, hits: Optional[Hits] = None) -> List[Dict[str, any]]:
     """
     Checks if the prompt involves weather or temperature and returns a list of weather tool calls
     for each mentioned city, including the matched keyword in args.
     """
-    weather_keywords = ["weather", "temperature", "condition", "temp", "humidity"]
-    cities = set(WEATHER.keys())
-    
-    matched_keyword = next((keyword for keyword in weather_keywords if keyword in prompt), None)
+    hits = hits if hits is not None else scan(prompt)
+    matched_keyword = hits.first("weather")
     if not matched_keyword:
         return []
     
-    mentioned_cities = [city for city in cities if city in prompt]
+    mentioned_cities = hits.all("city") or resolve(prompt, ("city",)).get("city")
     if not mentioned_cities:
         mentioned_cities = ["paris"]
-    logger.info(f"extract_weather_tool: Detected weather query for cities {mentioned_cities} with keyword '{matched_keyword}' in prompt: {prompt}")
+    logger.info("extract_weather_tool: Detected weather query for cities %s with keyword '%s' in prompt: %s", mentioned_cities, matched_keyword, prompt)
     return [{"tool": "weather", "args": {"city": city, "keyword": matched_keyword}} for city in mentioned_cities]
 
-def extract_kb_tool(prompt: str) -> Optional[Dict[str, any]]:
+def extract_kb_tool(prompt: str, hits: Optional[Hits] = None) -> Optional[Dict[str, any]]:
     """Detect KB query if an entry name OR any exact (non-stop_word) word from its summary exists in the prompt."""
 
-    STOP_WORDS = {
-        "a", "an", "and", "are", "as", "at", "be", "by",
-        "for", "from", "has", "he", "in", "is", "it", "its", "'s", "s",
-        "of", "on", "that", "the", "to", "was", "were", "will", "with"
-    }
-
-    def tokenize(text: str) -> list:
-        text = text.lower()
-        text = re.sub(f"[{re.escape(string.punctuation)}]", " ", text)
-        return [w for w in text.split() if w]
-
     try:
-        with open("data/kb.json", "r", encoding="utf-8") as f:
-            kb = json.load(f)
-
-        prompt_words = tokenize(prompt)
-
-        for entry in kb.get("entries", []):
-            name = entry["name"].lower()
-            summary_words = set(tokenize(entry.get("summary", "")))
+        kb = get_kb_store().snapshot()
+        match = kb.index.match_prompt(prompt)
+        if match is None:
+            return _fuzzy_kb_call(kb, prompt, hits)
+
+        entry, word = match
+        name = kb.names[entry]
+        if KB_TOP_K > 0:
+            logger.info("extract_kb_tool: Detected KB query (ranking top %s) in prompt: %s", KB_TOP_K, prompt)
+            return {"tool": "kb", "args": {"q": prompt, "k": KB_TOP_K}}
+        if word is None:
+            logger.info("extract_kb_tool: Detected KB query for '%s' (name match) in prompt: %s", name, prompt)
+            return {"tool": "kb", "args": {"q": name}}
+        logger.info("extract_kb_tool: Detected KB query for '%s' (matched word '%s') in prompt: %s", name, word, prompt)
+        return {"tool": "kb", "args": {"q": word}}
 
-            if name in prompt.lower():
-                logger.info(f"extract_kb_tool: Detected KB query for '{entry['name']}' (name match) in prompt: {prompt}")
-                return {"tool": "kb", "args": {"q": entry["name"]}}
+    except Exception as e:
+        logger.error("extract_kb_tool: Error reading or processing kb.json: %s", e)
+        return None
 
-            for word in prompt_words:
-                if word not in STOP_WORDS and word in summary_words:
-                    logger.info(f"extract_kb_tool: Detected KB query for '{entry['name']}' (matched word '{word}') in prompt: {prompt}")
-                    return {"tool": "kb", "args": {"q": word}}
 
+def _fuzzy_kb_call(kb, prompt: str, hits: Optional[Hits]) -> Optional[Dict[str, any]]:
+    """A KB call for a misspelled entry name, unless the prompt already belongs to another tool."""
+    if not FUZZY_ENABLED:
+        return None
+    hits = hits if hits is not None else scan(prompt.lower())
+    if any(hits.any(table) for table in ("calc", "weather", "job", "role")):
         return None
+    names = kb.fuzzy_names().resolve(prompt, ("name",), common_words()).get("name")
+    if not names:
+        return None
+    logger.info("extract_kb_tool: Detected KB query for '%s' (fuzzy name match) in prompt: %s", names[0], prompt)
+    if KB_TOP_K > 0:  # ranked on the corrected name: the misspelled word matches no term
+        return {"tool": "kb", "args": {"q": names[0], "k": KB_TOP_K}}
+    return {"tool": "kb", "args": {"q": names[0]}}
+
 
+def _fuzzy_job_slots(prompt: str, slots: Sequence[str]) -> Dict[str, List[str]]:
+    """Misspelled role, company or location values of the loaded jobs in `prompt`."""
+    if not FUZZY_ENABLED:
+        return {}
+    try:
+        return get_job_store().snapshot().fuzzy_values().resolve(prompt, slots, common_words())
     except Exception as e:
-        logger.error(f"extract_kb_tool: Error reading or processing kb.json: {e}")
-        return None
+        logger.error("extract_job_search_tool: Error reading jobs for fuzzy slots: %s", e)
+        return {}
 
 
-def extract_job_search_tool(prompt: str) -> Optional[Dict[str, any]]:
+def extract_job_search_tool(prompt: str, hits: Optional[Hits] = None) -> Optional[Dict[str, any]]:
     """Checks if the prompt involves a job search and returns a job_search tool call if applicable."""
-    prompt_lower = prompt.lower()
+    hits = hits if hits is not None else scan(prompt.lower())
 
-    has_job = any(keyword in prompt_lower for keyword in JOB_KEYWORDS)
-    matched_role = next((role for role in ROLE_KEYWORDS if role in prompt_lower), None)
-    matched_company = next((comp for comp in COMPANY_KEYWORDS if comp in prompt_lower), None)
+    has_job = hits.any("job")
+    matched_role = hits.first("role")
+    matched_company = hits.first("company")
 
     if not has_job and not matched_role:
         return None  
 
+    missing = [table for table, found in (("role", matched_role), ("company", matched_company),
+                                          ("location", hits.first("location"))) if not found]
+    fuzzy = _fuzzy_job_slots(prompt, missing) if missing else {}
+    matched_role = matched_role or fuzzy.get("role", [None])[0]
+    matched_company = matched_company or fuzzy.get("company", [None])[0]
+
     args = {}
 
     if matched_role:
@@ -104,19 +130,46 @@ def extract_job_search_tool(prompt: str) -> Optional[Dict[str, any]]:
     if matched_company:
         args["company"] = matched_company  
 
-    for loc in LOCATION_KEYWORDS:
-        if loc in prompt_lower:
-            args["location"] = loc
-            break  
+    matched_location = hits.first("location") or fuzzy.get("location", [None])[0]
+    if matched_location:
+        args["location"] = matched_location
 
-    for date in DATE_KEYWORDS:
-        if date in prompt_lower:
-            args["date_posted"] = date
-            break  
+    matched_date = hits.first("date")
+    if matched_date:
+        args["date_posted"] = matched_date
 
-    logger.info(f"extract_job_search_tool: Detected job search with args {args} in prompt: {prompt}")
+    logger.info("extract_job_search_tool: Detected job search with args %s in prompt: %s", args, prompt)
     return {"tool": "job_search", "args": args}
 
+def plan_generation() -> tuple:
+    """
+    What a cached plan depends on besides the prompt: keyword tables, KB version, the
+    AGENT_KB_TOP_K and AGENT_FUZZY settings and registered tools, plus the jobs version when
+    fuzzy slots are resolved against the job data.
+    """
+    try:
+        kb_version = get_kb_store().snapshot().version
+    except Exception:
+        kb_version = None
+    jobs_version = None
+    if FUZZY_ENABLED:
+        try:
+            jobs_version = get_job_store().snapshot().version
+        except Exception:
+            pass
+    return (tables_fingerprint(), kb_version, jobs_version, KB_TOP_K, FUZZY_ENABLED, registry.version())
+
+def bind_plan(plan: List[Dict[str, any]], prompt_lower: str) -> List[Dict[str, any]]:
+    """Copies a cached plan, putting the current prompt into the args that carry prompt text."""
+    bound = []
+    for call in plan:
+        args = dict(call.get("args", {}))
+        spec = get_tool(call["tool"])
+        if spec is not None and spec.prompt_arg in args:
+            args[spec.prompt_arg] = prompt_lower
+        bound.append({**call, "args": args})
+    return bound
+
 def call_llm(prompt: str) -> Union[List[Dict[str, any]], str, None]:
     """
     Parses the input prompt and returns an **ordered list** of tool calls or a direct response.
@@ -126,38 +179,38 @@ def call_llm(prompt: str) -> Union[List[Dict[str, any]], str, None]:
         return []
 
     prompt_clean = prompt.strip()
-    prompt_lower = prompt.lower().strip()
+    prompt_lower = normalize_prompt(prompt)  # the plan cache key: exactly what the extractors see
+
+    generation = plan_generation()
+    cached = PLAN_CACHE.get(prompt_lower, generation)
+    if cached is not None:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("call_llm: Plan cache hit, selected tools (ordered): %s", [call['tool'] for call in cached])
+        return bind_plan(cached, prompt_lower)
 
     tool_calls: List[Dict[str, any]] = []
-    
-    calc_tool = extract_calc_tool(prompt_lower)
-    if calc_tool:
-        tool_calls.append(calc_tool)
-    
-    weather_tools = extract_weather_tool(prompt_lower)
-    if weather_tools:
-        tool_calls.extend(weather_tools)
-    
-    kb_tool = extract_kb_tool(prompt_lower)
-    if kb_tool:
-        tool_calls.append(kb_tool)
+    with span("scan"):
+        hits = scan(prompt_lower)
 
-    job_search_tool = extract_job_search_tool(prompt_lower)
-    if job_search_tool:
-        tool_calls.append(job_search_tool)
+    specs = all_tools()
+    for spec in specs:
+        with span("extract", spec.name):
+            tool_calls.extend(spec.extract(prompt_lower, hits))
 
-    TOOL_PRIORITY = {"weather": 1, "kb": 1, "calc": 2, "job_search": 2}
-    tool_calls = sorted(tool_calls, key=lambda call: TOOL_PRIORITY.get(call["tool"], 99))
+    priority = {spec.name: spec.priority for spec in specs}
+    tool_calls = sorted(tool_calls, key=lambda call: priority.get(call["tool"], 99))
 
     tools_output_str = "; ".join([
         f"{call['tool']}({', '.join(f'{k}={v}' for k, v in call.get('args', {}).items())})"
         for call in tool_calls
     ])
-
-    log_cost(prompt_clean, tools_output_str)
+    with span("log_cost"):
+        log_cost(prompt_clean, tools_output_str, [call["tool"] for call in tool_calls])
+    PLAN_CACHE.put(prompt_lower, generation, bind_plan(tool_calls, prompt_lower))
 
     if tool_calls:
-        logger.info(f"call_llm: Selected tools (ordered): {[call['tool'] for call in tool_calls]}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("call_llm: Selected tools (ordered): %s", [call['tool'] for call in tool_calls])
     else:
         logger.info("call_llm: Selected tools: none")
     
@@ -0,0 +1,177 @@
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from . import registry
+from .registry import ToolSpec, resolve
+
+MEMO_SIZE = int(os.environ.get("AGENT_MEMO_SIZE", "10000"))
+MEMO_DB = os.environ.get("AGENT_MEMO_DB")
+MEMO_ENABLED = os.environ.get("AGENT_MEMO", "1") != "0"
+
+# (result, context writes, expires at (wall clock), data version, seconds it took to compute)
+Entry = Tuple[Any, Dict[str, Any], float, Hashable, float]
+
+
+def memo_key(spec: ToolSpec, args: Dict[str, Any], context: Optional[Dict[str, Any]]) -> str:
+    """`(tool, canonical args)`, plus the context for tools that read it (calc's placeholders)."""
+    key = [spec.name, args]
+    if context and spec.reads(args):
+        key.append(sorted((k, repr(v)) for k, v in context.items()))
+    return json.dumps(key, sort_keys=True, default=repr)
+
+
+class SQLiteMemoBackend:
+    """Memo entries in a local SQLite file, so worker processes on one host share results."""
+
+    def __init__(self, path: str):
+        import sqlite3  # only processes that share a memo file pay for sqlite3 and pickle
+
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS memo (key TEXT PRIMARY KEY, expires REAL, value BLOB)")
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            row = self._conn.execute("SELECT expires, value FROM memo WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] < time.time():
+            return None
+        import pickle
+        return pickle.loads(row[1])
+
+    def set(self, key: str, entry: Entry) -> None:
+        import pickle
+        blob = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO memo (key, expires, value) VALUES (?, ?, ?)", (key, entry[2], blob))
+
+    def purge(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM memo WHERE expires < ?", (time.time(),))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class ResultMemo:
+    """
+    Memoizes cacheable tool calls. Entries live in a bounded in-process LRU and, when a
+    backend is configured, in a store shared between processes. An entry is only served while
+    its tool's `memo_ttl` has not run out and its `data_version` is unchanged. Context writes
+    made by the original call are replayed on every hit. Results and writes are stored and
+    served as deep copies, so a caller mutating an answer (a list of jobs) cannot change what
+    later hits return.
+    """
+
+    def __init__(self, maxsize: int = MEMO_SIZE, backend: Optional[SQLiteMemoBackend] = None):
+        self.maxsize = maxsize
+        self.backend = backend
+        self._entries: "OrderedDict[str, Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _count(self, tool: str, field: str, amount: float = 1) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(tool, {"hits": 0, "shared_hits": 0, "misses": 0, "saved_seconds": 0.0})
+            stats[field] += amount
+
+    def _lookup(self, key: str, version: Hashable) -> Tuple[Optional[Entry], bool]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] >= now and entry[3] == version:
+                    self._entries.move_to_end(key)
+                    return entry, False
+                del self._entries[key]
+        if self.backend is not None:
+            entry = self.backend.get(key)
+            if entry is not None and entry[3] == version:
+                self._store_local(key, entry)
+                return entry, True
+        return None, False
+
+    def _store_local(self, key: str, entry: Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _begin(self, spec: ToolSpec, args: Dict[str, Any], context: Optional[Dict[str, Any]]):
+        """Returns `(hit, result, key, version)`; `key` is None when the call must bypass the memo."""
+        try:
+            # A re-registered tool may compute different results, so the registry version counts too.
+            version = (registry.version(), resolve(spec.data_version)() if spec.data_version is not None else None)
+        except Exception:
+            return False, None, None, None  # backing data unavailable: let the tool report it, uncached
+        key = memo_key(spec, args, context)
+        entry, shared = self._lookup(key, version)
+        if entry is None:
+            self._count(spec.name, "misses")
+            return False, None, key, version
+        self._count(spec.name, "shared_hits" if shared else "hits")
+        self._count(spec.name, "saved_seconds", entry[4])
+        result, writes = copy.deepcopy((entry[0], entry[1]))  # one copy keeps a result and its write aliased
+        if context is not None:
+            context.update(writes)
+        return True, result, key, version
+
+    def _finish(self, spec: ToolSpec, key: str, version: Hashable, context: Optional[Dict[str, Any]],
+                scratch: Optional[Dict[str, Any]], result: Any, elapsed: float) -> Any:
+        writes: Dict[str, Any] = {}
+        if scratch is not None:
+            writes = {k: v for k, v in scratch.items() if k not in context or context[k] is not v}
+            context.update(writes)
+        expires = time.time() + spec.memo_ttl if spec.memo_ttl is not None else float("inf")
+        entry = (*copy.deepcopy((result, writes)), expires, version, elapsed)
+        self._store_local(key, entry)
+        if self.backend is not None:
+            self.backend.set(key, entry)
+        return result
+
+    def call(self, spec: ToolSpec, args: Dict[str, Any], context: Optional[Dict[str, Any]],
+             compute: Callable[[Optional[Dict[str, Any]]], Any]) -> Any:
+        hit, result, key, version = self._begin(spec, args, context)
+        if hit:
+            return result
+        if key is None:
+            return compute(context)
+        scratch = context.copy() if context is not None else None
+        start = time.perf_counter()
+        result = compute(scratch)
+        return self._finish(spec, key, version, context, scratch, result, time.perf_counter() - start)
+
+    async def call_async(self, spec: ToolSpec, args: Dict[str, Any], context: Optional[Dict[str, Any]],
+                         compute: Callable[[Optional[Dict[str, Any]]], Awaitable[Any]]) -> Any:
+        hit, result, key, version = self._begin(spec, args, context)
+        if hit:
+            return result
+        if key is None:
+            return await compute(context)
+        scratch = context.copy() if context is not None else None
+        start = time.perf_counter()
+        result = await compute(scratch)
+        return self._finish(spec, key, version, context, scratch, result, time.perf_counter() - start)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tool hits (local and shared), misses, hit rate and compute time saved by hits."""
+        with self._lock:
+            out: Dict[str, Any] = {"size": len(self._entries), "tools": {}}
+            for tool, s in self._stats.items():
+                total = s["hits"] + s["shared_hits"] + s["misses"]
+                out["tools"][tool] = dict(s, hit_rate=(s["hits"] + s["shared_hits"]) / total if total else 0.0)
+        return out
+
+
+MEMO = ResultMemo(backend=SQLiteMemoBackend(MEMO_DB) if MEMO_DB else None)
@@ -0,0 +1,80 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+PLAN_CACHE_SIZE = int(os.environ.get("AGENT_PLAN_CACHE_SIZE", "4096"))
+PLAN_CACHE_TTL = float(os.environ.get("AGENT_PLAN_CACHE_TTL", "300"))
+
+Plan = List[Dict[str, Any]]
+Entry = Tuple[float, Hashable, Plan]  # (expires at, generation, plan)
+
+
+def normalize_prompt(q: Any) -> Hashable:
+    """
+    Key under which two prompts count as the same question: lowercased and stripped, which is
+    exactly the text the extractors see (`call_llm`). Anything more, such as collapsing inner
+    whitespace, could merge prompts they plan differently ("ada  lovelace" matches no KB
+    name). Non-string prompts, which never plan any call, are all keyed as None.
+    """
+    if not isinstance(q, str):
+        return None
+    return q.lower().strip()
+
+
+class PlanCache:
+    """
+    Bounded LRU of tool plans with a TTL. Every entry records the `generation` it was planned
+    under (keyword tables, data versions, planner settings, tool registry); a lookup under a different generation
+    is a miss, which is how edits to constants.py, kb.json or the registry invalidate plans.
+    """
+
+    def __init__(self, maxsize: int = PLAN_CACHE_SIZE, ttl: Optional[float] = PLAN_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, generation: Hashable) -> Optional[Plan]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != generation or (self.ttl is not None and entry[0] < now):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: Hashable, generation: Hashable, plan: Plan) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._entries[key] = (expires, generation, plan)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+PLAN_CACHE = PlanCache()
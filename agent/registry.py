@@ -0,0 +1,192 @@
+import importlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Mapping, Optional, Union
+
+KeySet = FrozenSet[str]
+ALL: KeySet = frozenset({"*"})  # stands for "every context key"
+NONE: KeySet = frozenset()
+
+Target = Union[str, Callable[..., Any]]
+
+
+@lru_cache(maxsize=None)
+def _import(path: str) -> Callable[..., Any]:
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def resolve(target: Target) -> Callable[..., Any]:
+    """Turns a `"module:function"` path into the function, importing the module on first use."""
+    return _import(target) if isinstance(target, str) else target
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """
+    Everything the planner and executor need to know about a tool.
+
+    `runner`, `async_runner` and `extractor` are `"module:function"` paths (or callables),
+    resolved on first use so only the tools a process actually calls get imported.
+    With `call_style="kwargs"` the runner is called as `runner(**args, context=context)`,
+    with `"dict"` as `runner(args, context)`. The extractor is called as
+    `extractor(prompt_lower, hits)` and returns a call, a list of calls or None.
+    `prompt_arg` names an arg that carries the prompt text itself (calc's `expr`), which a
+    cached plan must take from the current prompt. `reads`/`writes` give the context keys
+    a call touches, for dependency tracking. For cacheable tools, `memo_ttl` bounds how
+    long a memoized result is served (None: until evicted) and `data_version` is a
+    function whose return value changes when the tool's backing data does.
+    `stream_runner`, if set, yields the tool's list result item by item (same call style);
+    `answer_stream` uses it when the tool produces the final answer.
+    `prefetch`, if set, is called with the args of all of a plan's calls to the tool before
+    the plan runs (when there are several), so it can load their data in one batch.
+    """
+
+    name: str
+    runner: Target
+    extractor: Target
+    priority: int = 99
+    args: Mapping[str, type] = field(default_factory=dict)
+    required: FrozenSet[str] = frozenset()
+    call_style: str = "kwargs"
+    async_runner: Optional[Target] = None
+    prompt_arg: Optional[str] = None
+    reads: Callable[[Dict[str, Any]], KeySet] = lambda args: ALL
+    writes: Callable[[Dict[str, Any]], KeySet] = lambda args: ALL
+    pure: bool = False
+    cacheable: bool = False
+    parallel_safe: bool = True
+    memo_ttl: Optional[float] = None
+    data_version: Optional[Target] = None
+    stream_runner: Optional[Target] = None
+    prefetch: Optional[Target] = None
+
+    def validate(self, args: Dict[str, Any]) -> None:
+        missing = self.required.difference(args)
+        if missing:
+            raise TypeError(f"{self.name}: missing required args {sorted(missing)}")
+        for key, value in args.items():
+            expected = self.args.get(key)
+            if expected is not None and value is not None and not isinstance(value, expected):
+                raise TypeError(f"{self.name}: arg '{key}' should be {expected.__name__}, got {type(value).__name__}")
+
+    def invoke(self, args: Dict[str, Any], context: Optional[Dict[str, Any]]) -> Any:
+        fn = resolve(self.runner)
+        if self.call_style == "dict":
+            return fn(args, context)
+        return fn(**args, context=context)
+
+    async def invoke_async(self, args: Dict[str, Any], context: Optional[Dict[str, Any]]) -> Any:
+        if self.async_runner is None:
+            return self.invoke(args, context)
+        fn = resolve(self.async_runner)
+        if self.call_style == "dict":
+            return await fn(args, context)
+        return await fn(**args, context=context)
+
+    def invoke_stream(self, args: Dict[str, Any], context: Optional[Dict[str, Any]]) -> Iterator[Any]:
+        if self.stream_runner is None:
+            result = self.invoke(args, context)
+            return iter(result if isinstance(result, list) else [result])
+        fn = resolve(self.stream_runner)
+        if self.call_style == "dict":
+            return fn(args, context)
+        return fn(**args, context=context)
+
+    def invoke_prefetch(self, calls: List[Dict[str, Any]]) -> None:
+        if self.prefetch is not None:
+            resolve(self.prefetch)(calls)
+
+    def extract(self, prompt: str, hits: Any) -> List[Dict[str, Any]]:
+        found = resolve(self.extractor)(prompt, hits)
+        if not found:
+            return []
+        return found if isinstance(found, list) else [found]
+
+
+_TOOLS: Dict[str, ToolSpec] = {}
+_version = 0
+
+
+def register(spec: ToolSpec) -> ToolSpec:
+    """Adds a tool, or replaces the one with the same name. Planning follows registration order."""
+    global _version
+    _TOOLS[spec.name] = spec
+    _version += 1
+    return spec
+
+
+def unregister(name: str) -> None:
+    global _version
+    if _TOOLS.pop(name, None) is not None:
+        _version += 1
+
+
+def version() -> int:
+    """Bumped on every register/unregister, so caches of plans know when to drop them."""
+    return _version
+
+
+def get_tool(name: str) -> Optional[ToolSpec]:
+    return _TOOLS.get(name)
+
+
+def all_tools() -> List[ToolSpec]:
+    return list(_TOOLS.values())
+
+
+register(ToolSpec(
+    name="calc",
+    runner="agent.tools:evaluate",
+    extractor="agent.llm:extract_calc_tool",
+    priority=2,
+    args={"expr": str},
+    required=frozenset({"expr"}),
+    prompt_arg="expr",
+    pure=True,
+    cacheable=True,
+))
+
+register(ToolSpec(
+    name="weather",
+    runner="agent.tools:temp",
+    async_runner="agent.async_tools:temp_async",
+    extractor="agent.llm:extract_weather_tool",
+    priority=1,
+    args={"city": str, "keyword": str},
+    required=frozenset({"city", "keyword"}),
+    reads=lambda args: NONE,
+    writes=lambda args: frozenset({(args.get("city") or "").strip().lower()}),
+    prefetch="agent.weather:prefetch_weather",
+))
+
+register(ToolSpec(
+    name="kb",
+    runner="agent.tools:kb_lookup",
+    async_runner="agent.async_tools:kb_lookup_async",
+    extractor="agent.llm:extract_kb_tool",
+    priority=1,
+    args={"q": str, "k": int},
+    required=frozenset({"q"}),
+    reads=lambda args: NONE,
+    writes=lambda args: frozenset({args.get("q")}),
+    pure=True,
+    cacheable=True,
+    data_version="agent.kb_store:kb_version",
+))
+
+register(ToolSpec(
+    name="job_search",
+    runner="agent.tools:job_search",
+    async_runner="agent.async_tools:job_search_async",
+    stream_runner="agent.job_stream:job_search_stream",
+    extractor="agent.llm:extract_job_search_tool",
+    priority=2,
+    args={"role": str, "location": str, "company": str, "date_posted": str, "limit": int, "offset": int},
+    call_style="dict",
+    reads=lambda args: NONE,
+    writes=lambda args: NONE,
+    pure=True,
+    cacheable=True,
+    data_version="agent.job_store:jobs_version",
+))
@@ -0,0 +1,120 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from constants import (
+    OP_MAP, WEATHER, WEATHER_KEYWORDS, JOB_KEYWORDS, ROLE_KEYWORDS,
+    LOCATION_KEYWORDS, DATE_KEYWORDS, COMPANY_KEYWORDS,
+)
+
+
+def keyword_tables() -> Dict[str, Sequence[str]]:
+    """The keyword tables the extractors match against, each in its priority order."""
+    return {
+        "calc": list(dict.fromkeys(list(OP_MAP.keys()) + list(OP_MAP.values()))),
+        "weather": WEATHER_KEYWORDS,
+        "city": list(WEATHER.keys()),
+        "job": JOB_KEYWORDS,
+        "role": ROLE_KEYWORDS,
+        "location": LOCATION_KEYWORDS,
+        "date": DATE_KEYWORDS,
+        "company": COMPANY_KEYWORDS,
+    }
+
+
+class Hits:
+    """Keyword hits of one prompt, per table and in table order."""
+
+    __slots__ = ("_hits",)
+
+    def __init__(self, hits: Dict[str, List[str]]):
+        self._hits = hits
+
+    def any(self, table: str) -> bool:
+        return table in self._hits
+
+    def first(self, table: str) -> Optional[str]:
+        found = self._hits.get(table)
+        return found[0] if found else None
+
+    def all(self, table: str) -> List[str]:
+        return self._hits.get(table, [])
+
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    alternatives = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+def compile_keywords(keywords: Sequence[str]) -> "re.Pattern[str]":
+    """
+    One regex over all keywords, shaped like their trie, that matches the longest keyword
+    starting at every position of the text (inside a lookahead, so matches may overlap).
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    return re.compile(f"(?=({_trie_pattern(trie)}))")
+
+
+class KeywordRouter:
+    """
+    Compiles every keyword table into one regex, so a prompt is scanned once, in C, no matter
+    how many tables or keywords there are.
+
+    The regex reports the longest keyword starting at each position; the shorter keywords
+    starting there are exactly its keyword prefixes, which are precomputed per keyword.
+    A keyword listed in several tables is reported to each of them.
+    """
+
+    def __init__(self, tables: Dict[str, Sequence[str]]):
+        owners: Dict[str, List[Tuple[str, int]]] = {}
+        for table, keywords in tables.items():
+            for rank, keyword in enumerate(keywords):
+                if keyword:
+                    owners.setdefault(keyword, []).append((table, rank))
+        self._owners = owners
+        self._prefixes = {
+            keyword: [keyword[:i] for i in range(1, len(keyword) + 1) if keyword[:i] in owners]
+            for keyword in owners
+        }
+        self._regex = compile_keywords(list(owners))
+
+    def scan(self, prompt: str) -> Hits:
+        found = set()
+        for longest in self._regex.findall(prompt):
+            if longest not in found:
+                found.update(self._prefixes[longest])
+        ranked: Dict[str, List[Tuple[int, str]]] = {}
+        for keyword in found:
+            for table, rank in self._owners[keyword]:
+                ranked.setdefault(table, []).append((rank, keyword))
+        return Hits({table: [k for _, k in sorted(hits)] for table, hits in ranked.items()})
+
+
+def tables_fingerprint() -> int:
+    """Changes whenever any keyword table in constants.py is edited, even in place."""
+    return hash((
+        tuple(OP_MAP.items()), tuple(WEATHER), tuple(WEATHER_KEYWORDS), tuple(JOB_KEYWORDS), tuple(ROLE_KEYWORDS),
+        tuple(LOCATION_KEYWORDS), tuple(DATE_KEYWORDS), tuple(COMPANY_KEYWORDS),
+    ))
+
+
+_router: Optional[Tuple[int, KeywordRouter]] = None
+
+
+def get_router() -> KeywordRouter:
+    """The router for the current keyword tables, compiled on first use and recompiled if they changed since."""
+    global _router
+    fingerprint = tables_fingerprint()
+    if _router is None or _router[0] != fingerprint:
+        _router = (fingerprint, KeywordRouter(keyword_tables()))
+    return _router[1]
+
+
+def scan(prompt: str) -> Hits:
+    return get_router().scan(prompt)
@@ -0,0 +1,360 @@
+"""
+Pre-forking answer server on a Unix socket.
+
+    python -m agent.server [--socket PATH] [--workers N] [--queue N]
+
+The parent does every one-time cost up front: imports, data stores, the planner's tables and
+a few warm-up answers. It then forks the workers, which share that state copy-on-write.
+`gc.freeze()` keeps the collector from touching the shared objects and unsharing their pages.
+
+The protocol is newline-delimited JSON. A request is `{"id": ..., "q": "question"}` (a bare
+JSON string also works). Its response is `{"id": ..., "answer": ...}` or `{"id": ..., "error": ...}`.
+The parent owns every client connection and hands requests to idle workers in arrival order.
+While all workers are busy, requests wait in a bounded queue. Once the queue is full, new
+requests are shed at once with `"error": "overloaded"` rather than letting latency grow
+without bound. `{"cmd": "stats"}` is answered by the parent with its counters.
+"""
+import argparse
+import gc
+import json
+import os
+import selectors
+import signal
+import socket
+import sys
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from logger.info_logger import info_logger
+from logger.pipeline import flush_logs, lean_records
+from .client import DEFAULT_SOCKET, OVERLOADED
+
+DEFAULT_WORKERS = int(os.environ.get("AGENT_WORKERS", "0")) or os.cpu_count() or 1
+DEFAULT_QUEUE = int(os.environ.get("AGENT_QUEUE", "256"))
+WARMUP_PROMPTS = [
+    "What is 12.5% of 243?",
+    "What's the weather in London?",
+    "Who is Ada Lovelace?",
+    "Find developer jobs in remote",
+]
+
+logger = info_logger()
+
+
+def warm_up() -> None:
+    """Loads everything a worker would otherwise load on its first request."""
+    from .agent import answer
+    from .job_store import get_job_store
+    from .kb_store import get_kb_store
+
+    get_kb_store().snapshot()
+    get_job_store().snapshot()
+    for prompt in WARMUP_PROMPTS:
+        answer(prompt)
+    flush_logs()
+    gc.collect()
+    gc.freeze()
+
+
+def worker_loop(sock: socket.socket) -> None:
+    """Answers one JSON-encoded question per line until the parent closes the socket."""
+    from .agent import answer
+
+    for line in sock.makefile("rb"):
+        try:
+            reply = json.dumps({"answer": answer(json.loads(line))}, default=str)
+        except Exception as e:
+            logger.error("worker_loop: Error answering %s: %s", line, e)
+            reply = json.dumps({"error": f"{type(e).__name__}: {e}"})
+        sock.sendall(reply.encode("utf-8") + b"\n")
+
+
+class _Client:
+    __slots__ = ("sock", "inbuf", "outbuf", "closed")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.inbuf = b""
+        self.outbuf = b""
+        self.closed = False
+
+
+class _Worker:
+    __slots__ = ("pid", "sock", "buf", "job")
+
+    def __init__(self, pid: int, sock: socket.socket):
+        self.pid = pid
+        self.sock = sock
+        self.buf = b""
+        self.job: Optional[Tuple[_Client, bytes]] = None
+
+
+class Server:
+    def __init__(self, path: str = DEFAULT_SOCKET, workers: int = DEFAULT_WORKERS, max_queue: int = DEFAULT_QUEUE):
+        self.path = path
+        self.size = workers
+        self.max_queue = max_queue
+        self.sel = selectors.DefaultSelector()
+        self.listener: Optional[socket.socket] = None
+        self.workers: List[_Worker] = []
+        self.idle: Deque[_Worker] = deque()
+        self.pending: Deque[Tuple[_Client, bytes, bytes]] = deque()
+        self.clients: Dict[int, _Client] = {}
+        self.running = False
+        self.counters = {"served": 0, "shed": 0, "errors": 0, "max_queued": 0, "respawned": 0}
+        self.started = time.time()
+
+    # -- lifecycle
+
+    def _bind(self) -> socket.socket:
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except OSError:
+                os.unlink(self.path)  # left behind by a server that did not shut down cleanly
+            else:
+                raise RuntimeError(f"a server is already listening on {self.path}")
+            finally:
+                probe.close()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        listener.listen(1024)
+        listener.setblocking(False)
+        return listener
+
+    def _spawn(self) -> _Worker:
+        parent_sock, child_sock = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                parent_sock.close()
+                self.sel.close()
+                self.listener.close()
+                for other in self.workers:
+                    other.sock.close()
+                for client in self.clients.values():
+                    client.sock.close()
+                worker_loop(child_sock)
+            except BaseException:
+                code = 1
+            finally:
+                flush_logs()
+                os._exit(code)
+        child_sock.close()
+        worker = _Worker(pid, parent_sock)
+        self.workers.append(worker)
+        self.sel.register(parent_sock, selectors.EVENT_READ, (self._on_worker, worker))
+        self._release(worker)
+        return worker
+
+    def serve_forever(self) -> None:
+        self.listener = self._bind()  # first, so a second server fails before warming up
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        self.running = True
+        try:
+            warm_up()
+            self.sel.register(self.listener, selectors.EVENT_READ, (self._on_accept, None))
+            for _ in range(self.size):
+                self._spawn()
+            logger.info("Server: Listening on %s with %s workers, queue %s", self.path, self.size, self.max_queue)
+            while self.running:
+                for key, mask in self.sel.select():
+                    handler, state = key.data
+                    handler(key.fileobj, mask, state)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        self.running = False
+        for worker in self.workers:
+            try:
+                os.kill(worker.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for worker in self.workers:
+            os.waitpid(worker.pid, 0)
+            worker.sock.close()
+        self.workers.clear()
+        for client in list(self.clients.values()):
+            self._close(client)
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+        logger.info("Server: Stopped after %s", self.counters)
+        flush_logs()
+
+    # -- clients
+
+    def _on_accept(self, listener: socket.socket, mask: int, _: Any) -> None:
+        while True:
+            try:
+                sock, _addr = listener.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            client = _Client(sock)
+            self.clients[sock.fileno()] = client
+            self.sel.register(sock, selectors.EVENT_READ, (self._on_client, client))
+
+    def _on_client(self, sock: socket.socket, mask: int, client: _Client) -> None:
+        if mask & selectors.EVENT_WRITE:
+            self._flush(client)
+        if client.closed or not mask & selectors.EVENT_READ:
+            return
+        try:
+            data = sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close(client)
+            return
+        client.inbuf += data
+        *lines, client.inbuf = client.inbuf.split(b"\n")
+        for line in lines:
+            if line.strip():
+                self._on_request(client, line)
+
+    def _on_request(self, client: _Client, line: bytes) -> None:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            self._reply(client, b"null", b'{"error": "bad request: not JSON"}')
+            return
+        if isinstance(request, dict):
+            if request.get("cmd") == "stats":
+                self._reply(client, b"null", json.dumps(self.stats()).encode("utf-8"))
+                return
+            req_id, q = json.dumps(request.get("id")).encode("utf-8"), request.get("q")
+        else:
+            req_id, q = b"null", request
+        if not isinstance(q, str):
+            self._reply(client, req_id, b'{"error": "bad request: expected a question string"}')
+            return
+        job = json.dumps(q).encode("utf-8") + b"\n"
+        if self.idle:
+            self._dispatch(self.idle.popleft(), client, req_id, job)
+        elif len(self.pending) < self.max_queue:
+            self.pending.append((client, req_id, job))
+            if len(self.pending) > self.counters["max_queued"]:
+                self.counters["max_queued"] = len(self.pending)
+        else:
+            self.counters["shed"] += 1
+            self._reply(client, req_id, b'{"error": "' + OVERLOADED.encode() + b'"}')
+
+    def _reply(self, client: _Client, req_id: bytes, payload: bytes) -> None:
+        """Queues `payload` (a JSON object) for the client with `"id"` spliced in front."""
+        if client.closed:
+            return
+        client.outbuf += b'{"id": ' + req_id + b", " + payload[1:] + b"\n"
+        self._flush(client)
+
+    def _flush(self, client: _Client) -> None:
+        try:
+            sent = client.sock.send(client.outbuf)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._close(client)
+            return
+        client.outbuf = client.outbuf[sent:]
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.outbuf else 0)
+        if self.sel.get_key(client.sock).events != events:
+            self.sel.modify(client.sock, events, (self._on_client, client))
+
+    def _close(self, client: _Client) -> None:
+        if client.closed:
+            return
+        client.closed = True
+        self.clients.pop(client.sock.fileno(), None)
+        self.sel.unregister(client.sock)
+        client.sock.close()
+
+    # -- workers
+
+    def _dispatch(self, worker: _Worker, client: _Client, req_id: bytes, job: bytes) -> None:
+        worker.job = (client, req_id)
+        worker.sock.sendall(job)
+
+    def _release(self, worker: _Worker) -> None:
+        """Gives an idle worker the oldest queued request whose client is still connected."""
+        while self.pending:
+            client, req_id, job = self.pending.popleft()
+            if not client.closed:
+                self._dispatch(worker, client, req_id, job)
+                return
+        self.idle.append(worker)
+
+    def _on_worker(self, sock: socket.socket, mask: int, worker: _Worker) -> None:
+        try:
+            data = sock.recv(1 << 20)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""  # a reset worker socket: handled like an exit
+        if not data:
+            self._replace(worker)
+            return
+        worker.buf += data
+        if not worker.buf.endswith(b"\n"):
+            return
+        payload, worker.buf = worker.buf[:-1], b""
+        client, req_id = worker.job
+        worker.job = None
+        self.counters["served"] += 1
+        if payload.startswith(b'{"error"'):
+            self.counters["errors"] += 1
+        self._reply(client, req_id, payload)
+        self._release(worker)
+
+    def _replace(self, worker: _Worker) -> None:
+        """A worker exited: fail its request and fork a replacement from the warm parent."""
+        logger.error("Server: Worker %s exited; starting a replacement", worker.pid)
+        self.sel.unregister(worker.sock)
+        worker.sock.close()
+        os.waitpid(worker.pid, 0)
+        self.workers.remove(worker)
+        if worker in self.idle:
+            self.idle.remove(worker)
+        if worker.job is not None:
+            client, req_id = worker.job
+            self.counters["errors"] += 1
+            self._reply(client, req_id, b'{"error": "worker exited"}')
+        if self.running:
+            self.counters["respawned"] += 1
+            self._spawn()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self.workers), "pids": [w.pid for w in self.workers], "idle": len(self.idle),
+            "queued": len(self.pending), "max_queue": self.max_queue, "clients": len(self.clients),
+            "uptime_s": round(time.time() - self.started, 3), **self.counters,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m agent.server")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Unix socket path (default {DEFAULT_SOCKET})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="worker processes (default: CPU count)")
+    parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE,
+                        help="requests allowed to wait for a worker before new ones are shed")
+    opts = parser.parse_args()
+    lean_records()
+    print(f"serving on {opts.socket} with {opts.workers} workers (queue {opts.queue})", file=sys.stderr)
+    Server(opts.socket, opts.workers, opts.queue).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
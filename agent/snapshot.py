@@ -0,0 +1,323 @@
+"""
+Compact binary snapshots of the KB and jobs data, memory-mapped at load time.
+
+    python -m agent.snapshot [--kb data/kb.json] [--jobs data/jobs.json]
+
+writes `data/kb.snap` and `data/jobs.snap` next to the JSON files. A store whose JSON file
+has a snapshot compiled from that exact version (same mtime and size) maps the snapshot
+instead of parsing the JSON; otherwise it falls back to the JSON file.
+
+Layout: an 8-byte magic, the offset and length of a JSON metadata block, then 8-byte
+aligned sections of native-endian arrays. Strings live in tables (an offsets array plus
+one UTF-8 blob), string keys in open-addressing hash tables over those, and posting lists
+in CSR form (one row array plus start offsets). Every section is read through a
+`memoryview` on a read-only shared mapping, so loading copies nothing and processes
+mapping the same file share its pages.
+"""
+import json
+import mmap
+import os
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from zlib import crc32
+
+MAGIC = b"AGSNAP01"
+SNAPSHOT_SUFFIX = ".snap"
+_HEADER = len(MAGIC) + 16
+_EMPTY = 0xFFFFFFFF
+
+
+class SnapshotError(Exception):
+    """The file is not a usable snapshot (bad magic, other byte order, wrong kind or stale)."""
+
+
+def snapshot_path(path: str) -> str:
+    """Where the snapshot of a JSON data file lives: `data/kb.json` -> `data/kb.snap`."""
+    return os.path.splitext(path)[0] + SNAPSHOT_SUFFIX
+
+
+def _offsets_typecode(total: int) -> str:
+    return "I" if total < 1 << 32 else "Q"
+
+
+class SnapshotWriter:
+    def __init__(self, kind: str, source_stamp: Tuple[int, int]):
+        self.kind = kind
+        self.source_stamp = source_stamp
+        self.meta: Dict[str, Any] = {}
+        self._sections: List[Tuple[str, str, bytes]] = []
+
+    def array(self, name: str, typecode: str, values: Iterable[int]) -> None:
+        data = values if isinstance(values, array) and values.typecode == typecode else array(typecode, values)
+        self._sections.append((name, typecode, data.tobytes()))
+
+    def strings(self, name: str, items: Iterable[str]) -> None:
+        encoded = [s.encode("utf-8") for s in items]
+        offsets = [0]
+        for b in encoded:
+            offsets.append(offsets[-1] + len(b))
+        self.array(f"{name}.offsets", _offsets_typecode(offsets[-1]), offsets)
+        self._sections.append((f"{name}.data", "B", b"".join(encoded)))
+
+    def keys(self, name: str, keys: Sequence[str]) -> None:
+        """A string table plus a hash table over it, so `KeyTable.find` needs no parsing."""
+        self.strings(name, keys)
+        size = 1
+        while size < 2 * len(keys):
+            size <<= 1
+        slots = array("I", [_EMPTY]) * size
+        mask = size - 1
+        for i, key in enumerate(keys):
+            h = crc32(key.encode("utf-8")) & mask
+            while slots[h] != _EMPTY:
+                h = (h + 1) & mask
+            slots[h] = i
+        self.array(f"{name}.slots", "I", slots)
+
+    def postings(self, name: str, table: Dict[str, Sequence[int]]) -> None:
+        keys = list(table)
+        self.keys(f"{name}.keys", keys)
+        starts = [0]
+        rows = array("I")
+        for key in keys:
+            rows.extend(table[key])
+            starts.append(len(rows))
+        self.array(f"{name}.starts", _offsets_typecode(len(rows)), starts)
+        self.array(f"{name}.rows", "I", rows)
+
+    def mapping(self, name: str, table: Dict[str, int]) -> None:
+        self.keys(f"{name}.keys", list(table))
+        self.array(f"{name}.values", "I", table.values())
+
+    def write(self, path: str) -> None:
+        """Writes the file under a temporary name and renames it, so readers never map a partial file."""
+        tmp = f"{path}.tmp"
+        sections: Dict[str, List[Any]] = {}
+        with open(tmp, "wb") as f:
+            f.write(b"\0" * _HEADER)
+            for name, typecode, data in self._sections:
+                f.write(b"\0" * (-f.tell() % 8))
+                sections[name] = [f.tell(), len(data), typecode]
+                f.write(data)
+            meta = json.dumps({
+                "kind": self.kind, "source_stamp": list(self.source_stamp), "byteorder": sys.byteorder,
+                "itemsizes": {c: array(c).itemsize for c in "IQ"}, "sections": sections, **self.meta,
+            }).encode("utf-8")
+            meta_offset = f.tell()
+            f.write(meta)
+            f.seek(0)
+            f.write(MAGIC + meta_offset.to_bytes(8, "little") + len(meta).to_bytes(8, "little"))
+        os.replace(tmp, path)
+
+
+class StringTable:
+    """Read-only sequence of strings decoded on access from a mapped blob."""
+
+    __slots__ = ("offsets", "data", "_mm", "_base")
+
+    def __init__(self, offsets: memoryview, data: memoryview, mm: Optional[mmap.mmap] = None, base: int = 0):
+        self.offsets = offsets
+        self.data = data
+        self._mm = mm
+        self._base = base
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, i: int) -> memoryview:
+        return self.data[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> str:
+        offsets = self.offsets
+        if i < 0:
+            i += len(offsets) - 1
+            if i < 0:
+                raise IndexError("string table index out of range")
+        return str(self.data[offsets[i]:offsets[i + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def first_containing(self, entries: Iterable[int], sub: str, limit: int) -> int:
+        """First of `entries` (ascending) below `limit` whose string contains `sub`, searched in the
+        mapped bytes without decoding any entry; -1 if none does."""
+        encoded = sub.encode("utf-8")
+        offsets = self.offsets
+        if self._mm is None:
+            data = self.data
+            for entry in entries:
+                if entry >= limit:
+                    break
+                if encoded in bytes(data[offsets[entry]:offsets[entry + 1]]):
+                    return entry
+            return -1
+        find, base = self._mm.find, self._base
+        for entry in entries:
+            if entry >= limit:
+                break
+            if find(encoded, base + offsets[entry], base + offsets[entry + 1]) != -1:
+                return entry
+        return -1
+
+
+class JsonColumn:
+    """A string table whose entries are JSON-encoded values."""
+
+    __slots__ = ("strings",)
+
+    def __init__(self, strings: StringTable):
+        self.strings = strings
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __getitem__(self, i: int) -> Any:
+        return json.loads(self.strings[i])
+
+
+class KeyTable:
+    """String keys with a mapped linear-probing hash table: key -> position, or -1."""
+
+    __slots__ = ("strings", "slots", "mask")
+
+    def __init__(self, strings: StringTable, slots: memoryview):
+        self.strings = strings
+        self.slots = slots
+        self.mask = len(slots) - 1
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def find(self, key: str) -> int:
+        b = key.encode("utf-8")
+        slots, raw, mask = self.slots, self.strings.raw, self.mask
+        h = crc32(b) & mask
+        while True:
+            i = slots[h]
+            if i == _EMPTY:
+                return -1
+            if raw(i) == b:
+                return i
+            h = (h + 1) & mask
+
+
+class PostingTable:
+    """`Dict[str, array('I')]` lookalike for mapped posting lists; `get` returns a memoryview slice."""
+
+    __slots__ = ("keys", "starts", "rows")
+
+    def __init__(self, keys: KeyTable, starts: memoryview, rows: memoryview):
+        self.keys = keys
+        self.starts = starts
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return self.keys.find(key) != -1
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys.strings)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = self.keys.find(key)
+        if i == -1:
+            return default
+        return self.rows[self.starts[i]:self.starts[i + 1]]
+
+
+class KeyMap:
+    """`Dict[str, int]` lookalike over a mapped key table and value array."""
+
+    __slots__ = ("keys", "values")
+
+    def __init__(self, keys: KeyTable, values: memoryview):
+        self.keys = keys
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = self.keys.find(key)
+        return default if i == -1 else self.values[i]
+
+
+class Snapshot:
+    """A mapped snapshot file. Sections stay valid for as long as any view of them is referenced."""
+
+    def __init__(self, path: str, kind: Optional[str] = None, source_stamp: Optional[Tuple[int, int]] = None):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER:
+                raise SnapshotError(f"{path}: too short to be a snapshot")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise SnapshotError(f"{path}: not a snapshot file")
+        meta_offset = int.from_bytes(view[len(MAGIC):len(MAGIC) + 8], "little")
+        meta_len = int.from_bytes(view[len(MAGIC) + 8:_HEADER], "little")
+        self.meta: Dict[str, Any] = json.loads(str(view[meta_offset:meta_offset + meta_len], "utf-8"))
+        if self.meta["byteorder"] != sys.byteorder or self.meta["itemsizes"] != {c: array(c).itemsize for c in "IQ"}:
+            raise SnapshotError(f"{path}: written on a platform with another byte order or word size")
+        if kind is not None and self.meta["kind"] != kind:
+            raise SnapshotError(f"{path}: holds {self.meta['kind']!r} data, not {kind!r}")
+        if source_stamp is not None and tuple(self.meta["source_stamp"]) != tuple(source_stamp):
+            raise SnapshotError(f"{path}: compiled from another version of the source file")
+        self.path = path
+        self._view = view
+        self._sections = self.meta["sections"]
+
+    def has(self, name: str) -> bool:
+        return name in self._sections
+
+    def array(self, name: str) -> memoryview:
+        offset, length, typecode = self._sections[name]
+        return self._view[offset:offset + length].cast(typecode)
+
+    def strings(self, name: str) -> StringTable:
+        base = self._sections[f"{name}.data"][0]
+        return StringTable(self.array(f"{name}.offsets"), self.array(f"{name}.data"), self._mm, base)
+
+    def keys(self, name: str) -> KeyTable:
+        return KeyTable(self.strings(name), self.array(f"{name}.slots"))
+
+    def postings(self, name: str) -> PostingTable:
+        return PostingTable(self.keys(f"{name}.keys"), self.array(f"{name}.starts"), self.array(f"{name}.rows"))
+
+    def mapping(self, name: str) -> KeyMap:
+        return KeyMap(self.keys(f"{name}.keys"), self.array(f"{name}.values"))
+
+
+def compile_snapshot(store: Any, out: Optional[str] = None) -> str:
+    """Parses the store's JSON file and writes its snapshot (next to it unless `out` is given)."""
+    stamp = store._stamp()
+    view = store._build(store._load(), stamp)
+    writer = SnapshotWriter(store.snapshot_kind, stamp)
+    view.dump(writer)
+    path = out or snapshot_path(store.path)
+    writer.write(path)
+    return path
+
+
+def main() -> None:
+    import argparse  # not at the top: stores import this module on every cold start
+
+    from .job_store import JOBS_PATH, JobStore
+    from .kb_store import KB_PATH, KBStore
+
+    parser = argparse.ArgumentParser(prog="python -m agent.snapshot")
+    parser.add_argument("--kb", default=KB_PATH, help="KB JSON file (empty to skip)")
+    parser.add_argument("--jobs", default=JOBS_PATH, help="jobs JSON file (empty to skip)")
+    opts = parser.parse_args()
+    for path, store_class in ((opts.kb, KBStore), (opts.jobs, JobStore)):
+        if path:
+            out = compile_snapshot(store_class(path))
+            print(f"{path} -> {out} ({os.path.getsize(out)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
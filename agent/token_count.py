@@ -0,0 +1,137 @@
+import base64
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Protocol, Tuple
+
+VOCAB_PATH = os.environ.get("AGENT_TOKENIZER_VOCAB") or os.path.join(os.path.dirname(__file__), "..", "data", "bpe_vocab.tiktoken")
+COUNTER_KIND = os.environ.get("AGENT_TOKEN_COUNTER", "bpe").strip().lower()  # bpe | whitespace
+CACHE_SIZE = int(os.environ.get("AGENT_TOKEN_CACHE_SIZE", "4096"))
+
+# cl100k-style pre-tokenization, with \p{L} approximated by [^\W\d_] since `re` has no
+# Unicode property classes: contractions, words with one leading non-letter, up to three
+# digits, punctuation runs, and whitespace.
+PIECE_PATTERN = re.compile(
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\w]?[^\W\d_]+|\d{1,3}| ?(?:[^\s\w]|_)+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"""
+)
+
+
+class TokenCounter(Protocol):
+    def count(self, text: str) -> int: ...
+
+
+class WhitespaceCounter:
+    """The original estimate: one token per whitespace-separated word."""
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def load_ranks(path: str) -> Dict[bytes, int]:
+    """Reads a tiktoken-format vocab: one `base64(token) rank` pair per line."""
+    ranks = {}
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+    return ranks
+
+
+def bpe_warm_state(path: str) -> Tuple[Dict[bytes, int], FrozenSet[str]]:
+    """The parsed vocab and its whole ASCII tokens, as stored in the warm-state file (agent.warm_state)."""
+    ranks = load_ranks(path)
+    return ranks, frozenset(token.decode("ascii") for token in ranks if token.isascii())
+
+
+class BPECounter:
+    """Counts byte-level BPE tokens the way tiktoken would for the same vocab and pattern.
+
+    Counts are memoized per piece (words repeat far more than prompts do) and per text in an
+    LRU. ASCII pieces that are whole tokens are answered from a str-keyed table, without
+    encoding to bytes or merging.
+    """
+
+    def __init__(self, ranks: Dict[bytes, int], cache_size: int = CACHE_SIZE, max_pieces: int = 100_000,
+                 ascii_tokens: Optional[FrozenSet[str]] = None):
+        self.ranks = ranks
+        if ascii_tokens is None:
+            ascii_tokens = frozenset(token.decode("ascii") for token in ranks if token.isascii())
+        self.ascii_tokens = ascii_tokens
+        self.max_pieces = max_pieces
+        self._pieces: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.count = lru_cache(maxsize=cache_size)(self._count)
+
+    @classmethod
+    def from_file(cls, path: str = VOCAB_PATH, **kwargs) -> "BPECounter":
+        """Reads the vocab, or takes it already parsed from the warm-state file when that is current."""
+        from .warm_state import load
+
+        warm = load("bpe", path)
+        if warm is not None:
+            ranks, ascii_tokens = warm
+            return cls(ranks, ascii_tokens=ascii_tokens, **kwargs)
+        return cls(load_ranks(path), **kwargs)
+
+    def merge_count(self, piece: bytes) -> int:
+        """Number of tokens `piece` merges down to, applying the lowest-ranked pair first."""
+        if piece in self.ranks:
+            return 1
+        ranks = self.ranks
+        parts = [piece[i:i + 1] for i in range(len(piece))]
+        while len(parts) > 1:
+            best, best_rank = -1, None
+            for i in range(len(parts) - 1):
+                rank = ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best, best_rank = i, rank
+            if best < 0:
+                break
+            parts[best:best + 2] = [parts[best] + parts[best + 1]]
+        return len(parts)
+
+    def _piece_count(self, piece: str) -> int:
+        n = self._pieces.get(piece)
+        if n is None:
+            n = self.merge_count(piece.encode("utf-8"))
+            with self._lock:
+                if len(self._pieces) >= self.max_pieces:
+                    self._pieces.clear()
+                self._pieces[piece] = n
+        return n
+
+    def _count(self, text: str) -> int:
+        if not text:
+            return 0
+        pieces = PIECE_PATTERN.findall(text)
+        if text.isascii():
+            whole = self.ascii_tokens
+            return sum(1 if piece in whole else self._piece_count(piece) for piece in pieces)
+        return sum(self._piece_count(piece) for piece in pieces)
+
+
+_counter: Optional[TokenCounter] = None
+_counter_lock = threading.Lock()
+
+
+def get_counter() -> TokenCounter:
+    """The process-wide counter, built on first use from AGENT_TOKEN_COUNTER and AGENT_TOKENIZER_VOCAB."""
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                _counter = WhitespaceCounter() if COUNTER_KIND == "whitespace" else BPECounter.from_file(VOCAB_PATH)
+    return _counter
+
+
+def set_counter(counter: Optional[TokenCounter]) -> None:
+    """Installs a different counter; None goes back to the configured default."""
+    global _counter
+    with _counter_lock:
+        _counter = counter
+
+
+def count_tokens(text: str) -> int:
+    return get_counter().count(text) if text else 0
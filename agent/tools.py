@@ -1,194 +1,135 @@
 import json
 import re
-from constants import OP_MAP, TEMPS, WEATHER
+from constants import TEMPS, WEATHER
 from logger.info_logger import info_logger
-from typing import Any, Dict, List, Optional
+from .calc import compile_expr, normalize_expr, run
+from .context_store import ContextStore
+from .job_store import get_job_store
+from .kb_store import KB_TOP_K, get_kb_store
+from .weather import get_weather_service
+from typing import Any, Dict, List, Optional, Union
 
 # Logger setup
 logger = info_logger()
 
-def normalize_expr(expr: str) -> str:
-    expr = expr.lower()
-    for k in sorted(OP_MAP.keys(), key=lambda x: -len(x)):
-        expr = re.sub(rf'\b{k}\b', OP_MAP[k], expr)
-    expr = re.sub(r'\band\b', '', expr)
-    logger.info(f"normalize_expr: Normalized expression: {expr}")
-    return expr
-
-def tokenize(expr: str) -> List[str]:
-    expr = expr.strip()
-    tokens = re.findall(r'\d+\.?\d*|[+\-*/%A()]', expr)
-    return tokens
-
-def precedence(op: str) -> int:
-    if op in ('+', '-', 'A'): return 1
-    if op in ('*', '/', '%'): return 2
-    return 0
-
-def apply_operation(a: float, b: float, op: str) -> float:
-    if op == '+': return a + b
-    if op == '-': return a - b
-    if op == '*': return a * b
-    if op == '/': return a / b if b != 0 else (float("inf") if a >= 0 else float('-inf'))
-    if op == '%': return (a / 100) * b
-    if op == 'A': return (a + b) / 2
-    raise ValueError(f"Unsupported operator {op}")
-
 def replace_context(expr: str, context: Optional[Dict[str, Any]]) -> str:
+    """Replaces every context key in `expr` by its value, longest key first, in one pass."""
     if not context:
         return expr
-    for key, value in context.items():
-        expr = expr.replace(key, str(value))
-    return expr
-
-def handle_unary_minus(values: List[float], ops: List[str]) -> bool:
-    if len(values) == 1 and ops and ops[-1] == '-':
-        values[-1] = -values[-1]
-        ops.pop()
-        return True
-    return False
+    if not isinstance(context, ContextStore):
+        context = ContextStore(context, max_keys=max(len(context), 1))
+    return context.substitute(expr)
 
 def evaluate(expr: str, context: Optional[Dict[str, Any]] = None) -> float:
     expr = replace_context(expr, context)
     expr = normalize_expr(expr)
-    tokens: List[str] = tokenize(expr)
-    values: List[float] = []
-    ops: List[str] = []
-    logger.info(f"evaluate: Evaluating expression: {expr}")
-    i = 0
-    while i < len(tokens):
-        token = tokens[i]
-        if re.match(r'^\d+\.?\d*$', token):
-            values.append(float(token))
-        elif token == '(': 
-            ops.append(token)
-        elif token == ')':
-            while ops and ops[-1] != '(': 
-                if len(values) < 2:
-                    if handle_unary_minus(values, ops):
-                        continue
-                    else:
-                        break
-                b = values.pop()
-                a = values.pop()
-                values.append(apply_operation(a, b, ops.pop()))
-            ops.pop()
-        else:
-            while ops and ops[-1] not in '(' and precedence(ops[-1]) >= precedence(token):
-                if len(values) < 2:
-                    if handle_unary_minus(values, ops):
-                        continue
-                    else:
-                        break
-                b = values.pop()
-                a = values.pop()
-                values.append(apply_operation(a, b, ops.pop()))
-            ops.append(token)
-        i += 1
-    
-    while ops:
-        if len(values) < 2:
-            if handle_unary_minus(values, ops):
-                continue
-            else:
-                break
-        b = values.pop()
-        a = values.pop()
-        values.append(apply_operation(a, b, ops.pop()))
-    
-    ans: float = values[-1] if values else 0.0
+    logger.info("evaluate: Evaluating expression: %s", expr)
+    program, numbers = compile_expr(expr)
+    ans: float = run(program, numbers)
     if context is not None:
         context[expr] = ans
-    logger.info(f"evaluate: Result for '{expr}' is {ans}")
+    logger.info("evaluate: Result for '%s' is %s", expr, ans)
     return ans
 
 def temp(city: str, keyword: str, context: Optional[Dict[str, Any]] = None) -> str:
     c: str = (city or "").strip().lower()
     k: str = (keyword or "").strip().lower()
-    logger.info(f"temp: Query for city='{c}', keyword='{k}'")
-    if k.strip().lower() in ["temperature", "temp", "humidity"]:
-        ans = TEMPS.get(c, 20)   
-    elif k.strip().lower() in ["weather", "condition"]:
-        ans = WEATHER.get(c, "clear sky")  
+    logger.info("temp: Query for city='%s', keyword='%s'", c, k)
+    try:
+        report = get_weather_service().get(c) or {}
+    except Exception as e:
+        logger.error("temp: Weather service failed for '%s', using static data: %s", c, e)
+        report = {"temp": TEMPS.get(c), "condition": WEATHER.get(c)}
+    if k in ["weather", "condition"]:
+        ans = report.get("condition")
+        if ans is None:
+            ans = "clear sky"
     else:
-        ans = TEMPS.get(c, 20)   
+        ans = report.get("temp")
+        if ans is None:
+            ans = 20
     if context is not None:
         context[c] = ans
-    logger.info(f"temp: Result for city='{c}', keyword='{k}' is '{ans}'")
+    logger.info("temp: Result for city='%s', keyword='%s' is '%s'", c, k, ans)
     return ans
 
-def kb_lookup(q: str, context: Optional[Dict[str, Any]] = None) -> str:
+def kb_ranked(kb, q: str, k: int, context: Optional[Dict[str, Any]] = None) -> Union[str, List[Dict[str, Any]]]:
+    """The `k` entries that best match `q` by BM25, best first, each with its name, summary and score."""
+    ranked = [{"name": kb.names[entry], "summary": kb.summaries[entry], "score": round(score, 4)}
+              for entry, score in kb.ranker().top_k(q, k)]
+    if not ranked:
+        logger.info("kb_lookup: No ranked entries for '%s'", q)
+        return "No entry found."
+    if context is not None:
+        context[q] = ranked
+    logger.info("kb_lookup: Ranked %s entries for '%s', best '%s'", len(ranked), q, ranked[0]["name"])
+    return ranked
+
+def kb_lookup(q: str, context: Optional[Dict[str, Any]] = None, k: Optional[int] = None) -> Union[str, List[Dict[str, Any]]]:
     try:
-        with open("data/kb.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-        q_lower = q.lower()
-
-        for item in data.get("entries", []):
-            name = item.get("name", "")
-            summary = item.get("summary", "")
-            if q_lower in name.lower():
-                ans = summary
+        kb = get_kb_store().snapshot()
+        k = KB_TOP_K if k is None else k
+        if k > 0:
+            return kb_ranked(kb, q, k, context)
+        match = kb.index.lookup(q)
+
+        if match is not None:
+            entry, by_name = match
+            name = kb.names[entry]
+            if by_name:
+                ans = kb.summaries[entry]
                 if context is not None:
                     context[q] = ans
-                logger.info(f"kb_lookup: Found summary for '{q}' by name match")
+                logger.info("kb_lookup: Found summary for '%s' by name match", q)
                 return ans
-            summary_words = re.findall(r"\w+", summary.lower())
-            if q_lower in summary_words:
-                if context is not None:
-                    context[q] = name
-                logger.info(f"kb_lookup: Found entry '{name}' for summary word match '{q}'")
-                return name
+            if context is not None:
+                context[q] = name
+            logger.info("kb_lookup: Found entry '%s' for summary word match '%s'", name, q)
+            return name
 
-        logger.info(f"kb_lookup: No entry found for '{q}'")
+        logger.info("kb_lookup: No entry found for '%s'", q)
         return "No entry found."
 
     except Exception as e:
-        logger.error(f"kb_lookup: Error for '{q}': {e}")
+        logger.error("kb_lookup: Error for '%s': %s", q, e)
         return f"KB error: {e}"
 
-def job_search(args: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-    role = args.get("role")
-    location = args.get("location")
-    date_posted = args.get("date_posted")
-    company = args.get("company")
-
-    logger.info(f"job_search: Searching jobs with args: {args}")
-    date_patterns = {
-        r"(24h|24 hours|today|recently)": "24h",
-        r"(1 week|last week|7 days)": "1w",
-        r"(1 month|last month|30 days)": "1m"
-    }
-
-    mapped_date: Optional[str] = None
+DATE_PATTERNS = [
+    (re.compile(r"(24h|24 hours|today|recently)", re.IGNORECASE), "24h"),
+    (re.compile(r"(1 week|last week|7 days)", re.IGNORECASE), "1w"),
+    (re.compile(r"(1 month|last month|30 days)", re.IGNORECASE), "1m"),
+]
+
+def map_date_posted(date_posted: Optional[str]) -> Optional[str]:
+    """Maps a natural-language date filter onto the `24h`/`1w`/`1m` values used in jobs.json."""
     if date_posted:
-        for pattern, mapped_value in date_patterns.items():
-            if re.search(pattern, date_posted, re.IGNORECASE):
-                mapped_date = mapped_value
-                break
+        for pattern, mapped_value in DATE_PATTERNS:
+            if pattern.search(date_posted):
+                return mapped_value
+    return None
+
+def job_filters(args: Dict[str, Any]) -> Dict[str, str]:
+    """The attribute filters a job_search call applies: role/location/company as given, date mapped."""
+    filters: Dict[str, str] = {}
+    for attr in ("role", "location", "company"):
+        if args.get(attr):
+            filters[attr] = args[attr]
+    mapped_date = map_date_posted(args.get("date_posted"))
+    if mapped_date:
+        filters["date_posted"] = mapped_date
+    return filters
+
+def job_search(args: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    logger.info("job_search: Searching jobs with args: %s", args)
+    filters = job_filters(args)
 
     try:
-        with open("data/jobs.json", "r", encoding="utf-8") as f:
-            jobs_data = json.load(f)
+        jobs = get_job_store().snapshot()
     except (FileNotFoundError, json.JSONDecodeError):
         logger.error("job_search: Error reading jobs.json")
         return []
 
-    jobs = jobs_data.get("jobs", [])
-    results: List[Dict[str, Any]] = []
+    results = jobs.search(filters, limit=args.get("limit"), offset=args.get("offset") or 0)
 
-    for job in jobs:
-        if role and role.lower() != job.get("role", "").lower():
-            continue
-        if location and location.lower() != job.get("location", "").lower():
-            continue
-        if company and company.lower() != job.get("company", "").lower():
-            continue
-        if mapped_date and mapped_date.lower() != job.get("date_posted", "").lower():
-            continue
-
-        results.append(job)
-
-    logger.info(f"job_search: Found {len(results)} jobs for args: {args}")
+    logger.info("job_search: Found %s jobs for args: %s", len(results), args)
     return results
-
-    
\ No newline at end of file
@@ -0,0 +1,221 @@
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+TRACE_ENABLED = os.environ.get("AGENT_TRACE", "0") == "1"
+TRACE_BUFFER = int(os.environ.get("AGENT_TRACE_BUFFER", "100000"))
+
+# perf_counter_ns is monotonic but has no epoch; exports need wall-clock times.
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+
+class Histogram:
+    """Log-linear latency histogram in nanoseconds: 16 buckets per power of two (<= 6.25% error)."""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @staticmethod
+    def bucket(ns: int) -> int:
+        if ns < 32:
+            return ns
+        shift = ns.bit_length() - 5
+        return shift * 16 + (ns >> shift)
+
+    @staticmethod
+    def lower_bound(idx: int) -> int:
+        if idx < 32:
+            return idx
+        shift = idx // 16 - 1
+        return (idx % 16 + 16) << shift
+
+    def record(self, ns: int) -> None:
+        idx = self.bucket(ns)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q: float) -> float:
+        """Midpoint of the bucket holding the q-th percentile, clamped to the observed range."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                low, high = self.lower_bound(idx), self.lower_bound(idx + 1)
+                return min(max((low + high) / 2, self.min), self.max)
+        return float(self.max)
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "trace_id", "span_id", "parent_id", "start", "end", "tid", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> "Span":
+        if not self.tracer.keep_spans:
+            # Histograms only need the duration; ids and parent links are for exported spans.
+            self._token = None
+            self.start = time.perf_counter_ns()
+            return self
+        parent = _current.get()
+        self.trace_id = parent.trace_id if parent is not None else random.getrandbits(128)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.span_id = random.getrandbits(64)
+        self.tid = threading.get_ident()
+        self._token = _current.set(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end = time.perf_counter_ns()
+        if self._token is not None:
+            _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs = {**(self.attrs or {}), "error": exc_type.__name__}
+        self.tracer._finish(self)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+_current: ContextVar[Optional[Span]] = ContextVar("agent_span", default=None)
+
+
+class Tracer:
+    """
+    Records spans into per-name latency histograms and, optionally, a bounded buffer of raw
+    spans for export. While disabled, `span()` hands back a shared no-op context manager, so
+    instrumented code pays one attribute check per span.
+    """
+
+    def __init__(self, enabled: bool = False, buffer: int = TRACE_BUFFER):
+        self.enabled = enabled
+        self.histograms: Dict[str, Histogram] = {}
+        self.spans: deque = deque(maxlen=buffer)
+        self.keep_spans = True
+        self._lock = threading.Lock()
+
+    def span(self, name: str, detail: Optional[str] = None, attrs: Optional[Dict[str, Any]] = None):
+        """A context manager timing one stage. `detail` is appended as "name.detail" (e.g. the
+        tool name) only when tracing is on, so call sites never build strings while it is off."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name if detail is None else f"{name}.{detail}", attrs)
+
+    def enable(self, keep_spans: bool = True) -> None:
+        self.keep_spans = keep_spans
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.spans.clear()
+
+    def _finish(self, span: Span) -> None:
+        ns = span.end - span.start
+        with self._lock:
+            hist = self.histograms.get(span.name)
+            if hist is None:
+                hist = self.histograms[span.name] = Histogram()
+            hist.record(ns)
+            if span._token is not None:
+                self.spans.append(span)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per span name: count, total/mean/percentiles/max in microseconds."""
+        with self._lock:
+            items = list(self.histograms.items())
+        return {
+            name: {
+                "count": h.count,
+                "total_us": h.total / 1e3,
+                "mean_us": h.total / h.count / 1e3,
+                "p50_us": h.percentile(50) / 1e3,
+                "p95_us": h.percentile(95) / 1e3,
+                "p99_us": h.percentile(99) / 1e3,
+                "max_us": h.max / 1e3,
+            }
+            for name, h in items
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Spans as Chrome trace-event JSON (load in chrome://tracing or Perfetto)."""
+        pid = os.getpid()
+        events = [{
+            "name": s.name, "cat": "agent", "ph": "X", "pid": pid, "tid": s.tid,
+            "ts": (s.start + _EPOCH_OFFSET_NS) / 1e3, "dur": (s.end - s.start) / 1e3,
+            "args": {k: str(v) for k, v in (s.attrs or {}).items()},
+        } for s in list(self.spans)]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def otel_trace(self, service: str = "ai-agent") -> Dict[str, Any]:
+        """Spans as an OTLP/JSON ExportTraceServiceRequest, the OpenTelemetry file exporter format."""
+        spans = []
+        for s in list(self.spans):
+            item = {
+                "traceId": f"{s.trace_id:032x}", "spanId": f"{s.span_id:016x}", "name": s.name, "kind": 1,
+                "startTimeUnixNano": str(s.start + _EPOCH_OFFSET_NS),
+                "endTimeUnixNano": str(s.end + _EPOCH_OFFSET_NS),
+                "attributes": [{"key": k, "value": {"stringValue": str(v)}} for k, v in (s.attrs or {}).items()],
+            }
+            if s.parent_id is not None:
+                item["parentSpanId"] = f"{s.parent_id:016x}"
+            spans.append(item)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service}}]},
+            "scopeSpans": [{"scope": {"name": "agent.tracing"}, "spans": spans}],
+        }]}
+
+    def export_chrome(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def export_otel(self, path: str) -> None:
+        """Appends one OTLP/JSON line, so repeated exports to the same file stay valid JSON Lines."""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.otel_trace(), separators=(",", ":")) + "\n")
+
+
+TRACER = Tracer(enabled=TRACE_ENABLED)
+span = TRACER.span
+
+
+def breakdown(root: str = "answer") -> List[Dict[str, Any]]:
+    """Rows of TRACER.stats() sorted by total time, each with its share of the `root` span's total."""
+    stats = TRACER.stats()
+    base = stats.get(root, {}).get("total_us") or sum(row["total_us"] for row in stats.values()) or 1.0
+    rows = [{"name": name, **row, "share": row["total_us"] / base} for name, row in stats.items()]
+    return sorted(rows, key=lambda row: -row["total_us"])
@@ -0,0 +1,114 @@
+"""
+Precompiled warm state for cold starts.
+
+    python -m agent.warm_state        # or: make warm-state
+
+writes `data/warm_state.bin`. A short-lived process (one CLI question, a serverless call)
+otherwise rebuilds derived data on its first answer, such as the BPE vocabulary that token
+counting parses from base64 text. The file holds that data as marshal sections. Each section
+is tagged with the mtime and size of the file it was derived from and is only used while
+that file is unchanged and the running Python is the one that wrote it (marshal's format is
+version-specific); otherwise the data is rebuilt from its source as before.
+
+    AGENT_WARM_STATE=0          ignore the file
+    AGENT_WARM_STATE_PATH       read and write it somewhere else
+"""
+import marshal
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+WARM_STATE_PATH = os.environ.get("AGENT_WARM_STATE_PATH") or os.path.join(
+    os.path.dirname(__file__), "..", "data", "warm_state.bin")
+USE_WARM_STATE = os.environ.get("AGENT_WARM_STATE", "1") != "0"
+MAGIC = b"AGWARM01"
+
+_state: Optional[Dict[str, Any]] = None
+_state_lock = threading.Lock()
+
+
+def source_stamp(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _sections() -> Dict[str, Tuple[str, Callable[[str], Any]]]:
+    """Section name -> (source file, builder that derives the section's data from it)."""
+    from . import token_count
+
+    return {"bpe": (token_count.VOCAB_PATH, token_count.bpe_warm_state)}
+
+
+def _read(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "rb") as f:
+            blob = f.read()
+    except OSError:
+        return {}
+    if not blob.startswith(MAGIC):
+        return {}
+    try:
+        state = marshal.loads(blob[len(MAGIC):])
+    except (EOFError, ValueError, TypeError):
+        return {}
+    if not isinstance(state, dict) or state.get("python") != sys.implementation.cache_tag:
+        return {}
+    return state.get("sections", {})
+
+
+def load(name: str, source: str) -> Optional[Any]:
+    """The section's data if the warm-state file has it for the current version of `source`, else None."""
+    global _state
+    if not USE_WARM_STATE:
+        return None
+    if _state is None:
+        with _state_lock:
+            if _state is None:
+                _state = _read(WARM_STATE_PATH)
+    section = _state.get(name)
+    if section is None:
+        return None
+    try:
+        stamp = source_stamp(source)
+    except OSError:
+        return None
+    if section["source"] != os.path.abspath(source) or tuple(section["stamp"]) != stamp:
+        return None
+    return section["data"]
+
+
+def reset() -> None:
+    """Forgets the file read so far, so the next `load` reads it again."""
+    global _state
+    with _state_lock:
+        _state = None
+
+
+def compile_warm_state(path: str = WARM_STATE_PATH) -> Dict[str, int]:
+    """Builds every section from its source and writes the file; returns the sections written with their sizes."""
+    sections, sizes = {}, {}
+    for name, (source, build) in _sections().items():
+        data = build(source)
+        sections[name] = {"source": os.path.abspath(source), "stamp": list(source_stamp(source)), "data": data}
+        sizes[name] = len(marshal.dumps(data))
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + marshal.dumps({"python": sys.implementation.cache_tag, "sections": sections}))
+    os.replace(tmp, path)
+    reset()
+    return sizes
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m agent.warm_state")
+    parser.add_argument("--out", default=WARM_STATE_PATH)
+    opts = parser.parse_args()
+    sizes = compile_warm_state(opts.out)
+    print(f"{opts.out}: " + ", ".join(f"{name} ({size} bytes)" for name, size in sizes.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+Weather data for `tools.temp`, behind a provider abstraction.
+
+`StaticProvider` serves the `TEMPS`/`WEATHER` tables from constants.py (the default).
+`HTTPProvider` calls a weather service: `GET <url>/weather?cities=paris,london` answers
+`{"cities": {"paris": {"temp": 18, "condition": "mild cloudy"}, ...}}` and leaves out
+cities it does not know. `benchmarks.weather_stub` is a local server speaking this protocol.
+
+`WeatherService` sits in front of a provider. It keeps a short-TTL cache per city (unknown
+cities included) and collapses concurrent requests for a city into one in-flight fetch.
+It fetches all the cities of a multi-city plan in one bulk request (`prefetch_weather`,
+the weather tool's prefetch hook).
+
+    AGENT_WEATHER_URL       service base URL; unset means the static tables
+    AGENT_WEATHER_TTL       seconds a fetched city is served from cache (default 60, 0 = off)
+    AGENT_WEATHER_POOL      idle keep-alive connections kept per process (default 8, 0 = one per request)
+    AGENT_WEATHER_TIMEOUT   socket timeout in seconds (default 2)
+    AGENT_WEATHER_COALESCE  0 disables collapsing concurrent fetches of a city
+    AGENT_WEATHER_BULK      0 disables fetching a plan's cities in one request
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from constants import TEMPS, WEATHER
+from logger.info_logger import info_logger
+
+WEATHER_URL = os.environ.get("AGENT_WEATHER_URL", "")
+WEATHER_TTL = float(os.environ.get("AGENT_WEATHER_TTL", "60"))
+WEATHER_POOL = int(os.environ.get("AGENT_WEATHER_POOL", "8"))
+WEATHER_TIMEOUT = float(os.environ.get("AGENT_WEATHER_TIMEOUT", "2"))
+WEATHER_COALESCE = os.environ.get("AGENT_WEATHER_COALESCE", "1") != "0"
+WEATHER_BULK = os.environ.get("AGENT_WEATHER_BULK", "1") != "0"
+CACHE_LIMIT = 10_000
+
+Report = Dict[str, Any]  # {"temp": ..., "condition": ...}
+
+logger = info_logger()
+
+
+class WeatherError(Exception):
+    """The weather service failed or answered something unusable."""
+
+
+class WeatherProvider:
+    def fetch(self, cities: Sequence[str]) -> Dict[str, Report]:
+        """Reports for the given lowercase cities; cities the provider does not know are left out."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def after_fork_in_child(self) -> None:
+        pass
+
+
+class StaticProvider(WeatherProvider):
+    def __init__(self, temps: Optional[Dict[str, Any]] = None, conditions: Optional[Dict[str, str]] = None):
+        self.temps = TEMPS if temps is None else temps
+        self.conditions = WEATHER if conditions is None else conditions
+
+    def fetch(self, cities: Sequence[str]) -> Dict[str, Report]:
+        out = {}
+        for city in cities:
+            if city in self.temps or city in self.conditions:
+                out[city] = {"temp": self.temps.get(city), "condition": self.conditions.get(city)}
+        return out
+
+
+class HTTPProvider(WeatherProvider):
+    """
+    Weather service client with a pool of keep-alive connections. A request reuses the most
+    recently returned idle connection, or opens a new one when none is idle, so concurrency is
+    never capped by the pool; up to `pool_size` connections are kept open between requests.
+    A request on a reused connection that the server has meanwhile closed is retried once on
+    a new one. With `pool_size=0` every request opens its own connection.
+    """
+
+    def __init__(self, url: str, pool_size: int = WEATHER_POOL, timeout: float = WEATHER_TIMEOUT):
+        # Imported here: http.client costs more to import than a cold answer, and only a
+        # configured weather service needs it.
+        import http.client
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.base = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keep_alive = pool_size > 0
+        self._idle: List[Any] = []
+        self._retryable = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "connections": 0}
+
+    def _acquire(self) -> Tuple[Any, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), False
+            self.stats["connections"] += 1
+        return self.connection_class(self.host, self.port, timeout=self.timeout), True
+
+    def _release(self, conn: Any, reusable: bool) -> None:
+        if reusable and self.keep_alive:
+            with self._lock:
+                if len(self._idle) < self.pool_size:
+                    self._idle.append(conn)
+                    return
+        conn.close()
+
+    def fetch(self, cities: Sequence[str]) -> Dict[str, Report]:
+        from urllib.parse import urlencode
+
+        target = f"{self.base}/weather?{urlencode({'cities': ','.join(cities)})}"
+        headers = {"Accept": "application/json"}
+        if not self.keep_alive:
+            headers["Connection"] = "close"
+        for attempt in range(2):
+            conn, fresh = self._acquire()
+            try:
+                conn.request("GET", target, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except self._retryable:
+                self._release(conn, False)
+                if fresh or attempt:
+                    raise
+                continue
+            except BaseException:
+                self._release(conn, False)
+                raise
+            with self._lock:
+                self.stats["requests"] += 1
+            self._release(conn, not response.will_close)
+            if response.status != 200:
+                raise WeatherError(f"weather service answered HTTP {response.status}")
+            try:
+                return json.loads(body)["cities"]
+            except (ValueError, KeyError, TypeError) as e:
+                raise WeatherError(f"unreadable weather response: {e}") from e
+        raise WeatherError("unreachable")  # the loop either returns or raises
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def after_fork_in_child(self) -> None:
+        """Drops the connections inherited from the parent; sharing them would interleave responses."""
+        self._lock = threading.Lock()
+        self.close()
+
+
+class WeatherService:
+    """TTL cache, single-flight and bulk fetching in front of a `WeatherProvider`."""
+
+    def __init__(self, provider: WeatherProvider, ttl: float = WEATHER_TTL,
+                 coalesce: bool = WEATHER_COALESCE, bulk: bool = WEATHER_BULK):
+        self.provider = provider
+        self.ttl = ttl
+        self.coalesce = coalesce
+        self.bulk = bulk
+        self._cache: Dict[str, Tuple[float, Optional[Report]]] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "coalesced": 0, "fetches": 0, "cities_fetched": 0}
+
+    def fresh(self, city: str) -> bool:
+        entry = self._cache.get(city)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def get(self, city: str) -> Optional[Report]:
+        return self.get_many([city])[city]
+
+    def get_many(self, cities: Iterable[str]) -> Dict[str, Optional[Report]]:
+        """Reports for lowercase cities (None where unknown); the misses are fetched in one request."""
+        out: Dict[str, Optional[Report]] = {}
+        waiting: Dict[str, Future] = {}
+        mine: List[str] = []
+        now = time.monotonic()
+        with self._lock:
+            for city in dict.fromkeys(cities):
+                entry = self._cache.get(city)
+                if entry is not None and entry[0] > now:
+                    out[city] = entry[1]
+                    self.stats["hits"] += 1
+                    continue
+                future = self._inflight.get(city) if self.coalesce else None
+                if future is not None:
+                    self.stats["coalesced"] += 1
+                else:
+                    future = Future()
+                    mine.append(city)
+                    if self.coalesce:
+                        self._inflight[city] = future
+                waiting[city] = future
+        if mine:
+            self._fetch(mine, waiting)
+        for city, future in waiting.items():
+            out[city] = future.result()
+        return out
+
+    def _fetch(self, cities: List[str], futures: Dict[str, Future]) -> None:
+        try:
+            reports, error = self.provider.fetch(cities), None
+        except Exception as e:
+            reports, error = {}, e
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            self.stats["fetches"] += 1
+            self.stats["cities_fetched"] += len(cities)
+            if error is None and self.ttl > 0:
+                if len(self._cache) >= CACHE_LIMIT:
+                    now = time.monotonic()
+                    self._cache = {c: e for c, e in self._cache.items() if e[0] > now}
+                for city in cities:
+                    self._cache[city] = (expires, reports.get(city))
+            for city in cities:
+                if self.coalesce:
+                    self._inflight.pop(city, None)
+        for city in cities:
+            if error is None:
+                futures[city].set_result(reports.get(city))
+            else:
+                futures[city].set_exception(error)
+
+    def prefetch(self, cities: Iterable[str]) -> None:
+        """Fetches the cities that are not cached or in flight in one request (a no-op with bulk off)."""
+        if self.bulk:
+            self.get_many(cities)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        self.provider.close()
+
+    def after_fork_in_child(self) -> None:
+        """Keeps the cache of a forked child but not fetches in flight in other parent threads."""
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.provider.after_fork_in_child()
+
+
+_service: Optional[WeatherService] = None
+_service_lock = threading.Lock()
+
+
+def get_weather_service() -> WeatherService:
+    """The process-wide service, built from the AGENT_WEATHER_* settings on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                provider = HTTPProvider(WEATHER_URL) if WEATHER_URL else StaticProvider()
+                _service = WeatherService(provider)
+    return _service
+
+
+def set_weather_service(service: Optional[WeatherService]) -> Optional[WeatherService]:
+    """Installs `service` (None: rebuild from the environment on next use) and returns the old one."""
+    global _service
+    with _service_lock:
+        old, _service = _service, service
+    return old
+
+
+def _after_fork_in_child() -> None:
+    global _service_lock
+    _service_lock = threading.Lock()
+    if _service is not None:
+        _service.after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def prefetch_weather(calls: List[Dict[str, Any]]) -> None:
+    """The weather tool's prefetch hook: one bulk fetch for every city in a plan."""
+    cities = [(args.get("city") or "").strip().lower() for args in calls]
+    try:
+        get_weather_service().prefetch(cities)
+    except Exception as e:
+        logger.error("prefetch_weather: Bulk fetch of %s failed: %s", cities, e)
@@ -0,0 +1,83 @@
+"""
+answer_async under load against a local stub backend, pinned to a single core.
+
+The weather tool is pointed at an asyncio TCP stub that answers after a fixed delay, standing
+in for a real weather service. Throughput should grow with concurrency until the core is
+saturated, since waiting on the backend no longer blocks other requests.
+
+Run from the repository root:  python -m benchmarks.bench_async_load [requests]
+"""
+import asyncio
+import dataclasses
+import logging
+import os
+import statistics
+import sys
+import time
+
+import agent.async_agent as async_agent
+from agent import registry
+from agent.async_agent import answer_async
+
+BACKEND_DELAY = 0.02
+PROMPTS = ["temperature in london", "weather in paris and dhaka", "add 10 to the average temperature in paris and london"]
+
+
+async def stub_backend(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    while await reader.readline():
+        await asyncio.sleep(BACKEND_DELAY)
+        writer.write(b"17\n")
+        await writer.drain()
+    writer.close()
+
+
+def stub_weather(port: int):
+    async def call(city, keyword, context):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(city.encode() + b"\n")
+        value = float(await reader.readline())
+        writer.close()
+        context[city] = value
+        return value
+    return call
+
+
+async def run_level(concurrency: int, total: int) -> tuple:
+    async_agent._limiters.clear()
+    latencies = []
+    queue = iter(range(total))
+
+    async def worker():
+        for i in queue:
+            start = time.perf_counter()
+            await answer_async(PROMPTS[i % len(PROMPTS)])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return total / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+async def main_async(total: int) -> None:
+    server = await asyncio.start_server(stub_backend, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    registry.register(dataclasses.replace(registry.get_tool("weather"), async_runner=stub_weather(port)))
+    print(f"{total} requests per level, backend delay {BACKEND_DELAY * 1000:.0f} ms")
+    for concurrency in (1, 10, 100, 500):
+        qps, p50, p99 = await run_level(concurrency, total)
+        print(f"  concurrency={concurrency:<4} {qps:8.0f} req/s   p50 {p50 * 1000:7.1f} ms   p99 {p99 * 1000:7.1f} ms")
+    server.close()
+
+
+def main() -> None:
+    logging.getLogger("info_logger").disabled = True
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    asyncio.run(main_async(total))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Per-expression latency of tools.evaluate: the old per-call normalize + stack evaluator vs
+the compiled engine, cold (cache cleared every call) and warm (cached parse).
+
+Run from the repository root:  python -m benchmarks.bench_calc
+"""
+import logging
+import re
+
+from agent.calc import apply_operation, compile_expr, precedence
+from agent.tools import evaluate
+from benchmarks.common import per_call_us, print_table
+from constants import OP_MAP
+
+EXPRESSIONS = [
+    "what is 12.5 percent of 243?",
+    "what is the average of 10 and 20, plus 5% of 200?",
+    "what is (2 plus 3) times 4 minus 7 divided by 2?",
+    " + ".join(["1"] * 200),
+]
+
+
+def legacy_evaluate(expr: str) -> float:
+    expr = expr.lower()
+    for k in sorted(OP_MAP.keys(), key=lambda x: -len(x)):
+        expr = re.sub(rf'\b{k}\b', OP_MAP[k], expr)
+    expr = re.sub(r'\band\b', '', expr)
+    values, ops = [], []
+
+    def reduce() -> bool:
+        if len(values) < 2:
+            if len(values) == 1 and ops and ops[-1] == '-':
+                values[-1] = -values[-1]
+                ops.pop()
+                return True
+            return False
+        b, a = values.pop(), values.pop()
+        values.append(apply_operation(a, b, ops.pop()))
+        return True
+
+    for token in re.findall(r'\d+\.?\d*|[+\-*/%A()]', expr.strip()):
+        if re.match(r'^\d+\.?\d*$', token):
+            values.append(float(token))
+        elif token == '(':
+            ops.append(token)
+        elif token == ')':
+            while ops and ops[-1] != '(' and reduce():
+                pass
+            ops.pop()
+        else:
+            while ops and ops[-1] not in '(' and precedence(ops[-1]) >= precedence(token) and reduce():
+                pass
+            ops.append(token)
+    while ops and reduce():
+        pass
+    return values[-1] if values else 0.0
+
+
+def cold_evaluate(expr: str) -> float:
+    compile_expr.cache_clear()
+    return evaluate(expr)
+
+
+def main() -> None:
+    logging.getLogger("info_logger").disabled = True
+    rows = {}
+    for i, expr in enumerate(EXPRESSIONS):
+        rows[f"expr {i}  legacy"] = per_call_us(lambda: legacy_evaluate(expr), 2_000)
+        rows[f"expr {i}  compiled, cold"] = per_call_us(lambda: cold_evaluate(expr), 2_000)
+        rows[f"expr {i}  compiled, cached"] = per_call_us(lambda: evaluate(expr), 2_000)
+    print_table("tools.evaluate per expression", rows)
+
+
+if __name__ == "__main__":
+    main()
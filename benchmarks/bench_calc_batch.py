@@ -0,0 +1,53 @@
+"""
+Throughput of evaluate_batch vs a Python loop over tools.evaluate.
+
+Run from the repository root:  python -m benchmarks.bench_calc_batch [rows]
+"""
+import logging
+import random
+import sys
+import time
+
+from agent.calc_batch import evaluate_batch
+from agent.tools import evaluate
+
+TEMPLATES = [
+    "what is {} plus {}?",
+    "what is {} percent of {}?",
+    "what is the average of {} and {}?",
+    "what is ({} plus {}) times {}?",
+    "{} divided by {} minus {}",
+    "-{} + {} * {} / {}",
+]
+
+
+def workload(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        template = rng.choice(TEMPLATES)
+        out.append(template.format(*(rng.randint(0, 1000) for _ in range(template.count("{}")))))
+    return out
+
+
+def main() -> None:
+    logging.getLogger("info_logger").disabled = True
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    exprs = workload(n)
+
+    start = time.perf_counter()
+    for expr in exprs:
+        evaluate(expr)
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    evaluate_batch(exprs)
+    batch = time.perf_counter() - start
+
+    print(f"{n} expressions, {len(TEMPLATES)} shapes")
+    print(f"  loop over evaluate  {n / loop:12.0f} expr/s")
+    print(f"  evaluate_batch      {n / batch:12.0f} expr/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Context substitution in tools.evaluate: the old loop of str.replace over every context key
+vs ContextStore's single pass over the expression, as the context grows, and over a long
+plan that writes a key and substitutes into an expression at every step.
+
+Run from the repository root:  python -m benchmarks.bench_context
+"""
+import time
+from typing import Any, Dict
+
+from agent.context_store import ContextStore
+from benchmarks.common import per_call_us, print_table
+
+EXPRESSION = "what is the average of paris and london, plus 5% of the sum of 12 and 30?"
+
+
+def legacy_replace(expr: str, context: Dict[str, Any]) -> str:
+    for key, value in context.items():
+        expr = expr.replace(key, str(value))
+    return expr
+
+
+def filler(n: int) -> Dict[str, Any]:
+    """n context keys shaped like the ones tools write (cities and normalized expressions)."""
+    return {(f"city{i}" if i % 2 else f"{i} + {i * 3} * 2"): i for i in range(n)}
+
+
+def long_plan(steps: int, substitute) -> float:
+    """Seconds for `steps` rounds of writing one key and substituting into the expression."""
+    context: Dict[str, Any] = {"paris": 18, "london": 17}
+    store = ContextStore(context)
+    start = time.perf_counter()
+    for i in range(steps):
+        context[f"step {i}"] = i
+        store[f"step {i}"] = i
+        substitute(context, store)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    rows = {}
+    for n in (2, 16, 128, 1024):
+        context = dict(filler(n - 2), paris=18, london=17)
+        store = ContextStore(context)
+        assert store.substitute(EXPRESSION) == legacy_replace(EXPRESSION, context)
+        rows[f"{n:>5} keys  str.replace loop"] = per_call_us(lambda: legacy_replace(EXPRESSION, context), 2_000)
+        rows[f"{n:>5} keys  ContextStore"] = per_call_us(lambda: store.substitute(EXPRESSION), 2_000)
+    print_table("substitution per expression", rows)
+
+    plan_rows = {}
+    for steps in (100, 1000):
+        plan_rows[f"{steps:>5} steps  str.replace loop"] = long_plan(steps, lambda c, s: legacy_replace(EXPRESSION, c)) * 1e3
+        plan_rows[f"{steps:>5} steps  ContextStore"] = long_plan(steps, lambda c, s: s.substitute(EXPRESSION)) * 1e3
+    print_table("long plan (write + substitute per step)", plan_rows, unit="ms total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Fuzzy entity lookup as the vocabulary grows: a linear scan computing the edit distance to
+every term vs the deletion dictionary of agent.entity_index, for exact and misspelled queries,
+plus the cost the planner pays per prompt with and without a typo.
+
+Run from the repository root:  python -m benchmarks.bench_entity_index
+"""
+import logging
+import random
+import string
+import time
+
+from agent.entity_index import EntityIndex, edit_distance, max_distance
+from agent.llm import extract_job_search_tool, extract_weather_tool
+from agent.router import scan
+from benchmarks.common import per_call_us, print_table
+
+PROMPTS = {
+    "weather, exact": "what's the weather in london",
+    "weather, typo": "what's the weather in londn",
+    "jobs, exact": "software engineer jobs at google in california",
+    "jobs, typo": "sofware engineer jobs at gogle in californa",
+}
+
+
+def vocabulary(size: int, rng: random.Random) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 14))))
+    return sorted(words)
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+
+
+def linear_lookup(vocab: list, query: str) -> list:
+    out = []
+    for term in vocab:
+        limit = max_distance(len(term))
+        d = edit_distance(query, term, limit)
+        if d <= limit:
+            out.append((d, term))
+    return sorted(out)
+
+
+def main() -> None:
+    logging.getLogger("info_logger").disabled = True
+    rng = random.Random(1)
+    rows = {}
+    for size in (1_000, 10_000, 50_000):
+        vocab = vocabulary(size, rng)
+        start = time.perf_counter()
+        index = EntityIndex({"term": vocab})
+        rows[f"{size:>6} terms  build (ms)"] = (time.perf_counter() - start) * 1e3
+        exact = rng.choice(vocab)
+        typos = [misspell(rng.choice(vocab), rng) for _ in range(200)]
+        for query in typos[:20]:
+            assert [t for _, _, _, t in index.lookup(query)] == [t for _, t in linear_lookup(vocab, query)]
+        queries = iter(typos * 1_000)
+        rows[f"{size:>6} terms  exact, index"] = per_call_us(lambda: index.lookup(exact), 2_000)
+        rows[f"{size:>6} terms  typo, index"] = per_call_us(lambda: index.lookup(next(queries)), 2_000)
+        rows[f"{size:>6} terms  typo, linear scan"] = per_call_us(lambda: linear_lookup(vocab, next(queries)), 5)
+    print_table("entity lookup (us/call unless noted)", rows, unit="")
+
+    planner = {}
+    for label, prompt in PROMPTS.items():
+        hits = scan(prompt)
+        extract = extract_weather_tool if label.startswith("weather") else extract_job_search_tool
+        planner[label] = per_call_us(lambda: extract(prompt, hits), 2_000)
+    print_table("extractor per prompt", planner)
+
+
+if __name__ == "__main__":
+    main()
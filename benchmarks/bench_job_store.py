@@ -0,0 +1,55 @@
+"""
+job_search filtering on a synthetic feed: linear scan over dicts vs the indexed job store.
+
+Run from the repository root:  python -m benchmarks.bench_job_store [rows]
+"""
+import random
+import sys
+import time
+
+from agent.job_store import JobSnapshot
+from benchmarks.common import per_call_us, print_table
+from constants import COMPANY_KEYWORDS, LOCATION_KEYWORDS, ROLE_KEYWORDS
+
+QUERIES = [
+    {"role": "software engineer", "location": "dhaka"},
+    {"company": "google", "date_posted": "1w"},
+    {"role": "swe", "location": "remote", "company": "meta", "date_posted": "24h"},
+    {"location": "germany"},
+]
+
+
+def synthetic_jobs(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "company": rng.choice(COMPANY_KEYWORDS).title(),
+            "date_posted": rng.choice(["24h", "1w", "1m"]),
+            "location": rng.choice(LOCATION_KEYWORDS),
+            "role": rng.choice(ROLE_KEYWORDS),
+            "url": f"jobs.example.com/{i}",
+        }
+        for i in range(n)
+    ]
+
+
+def linear(jobs: list, filters: dict) -> list:
+    return [j for j in jobs if all(v.lower() == j.get(a, "").lower() for a, v in filters.items())]
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    jobs = synthetic_jobs(n)
+    start = time.perf_counter()
+    snap = JobSnapshot(jobs, (0, 0))
+    rows = {"store build (once)": (time.perf_counter() - start) * 1e6}
+    for q in QUERIES:
+        label = ",".join(q)
+        rows[f"linear  {label}"] = per_call_us(lambda: linear(jobs, q), 3)
+        rows[f"store   {label}"] = per_call_us(lambda: snap.search(q), 3)
+        rows[f"store   {label} limit=20"] = per_call_us(lambda: snap.search(q, limit=20), 100)
+    print_table(f"job filtering over {n} postings", rows, unit="us")
+
+
+if __name__ == "__main__":
+    main()
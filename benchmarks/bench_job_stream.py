@@ -0,0 +1,57 @@
+"""
+job_search over growing feeds: the indexed store (json.load + snapshot) vs the streaming
+parser. Reports time to the first match, time to drain every match and peak RSS, each mode
+in its own interpreter so memory is not shared between them.
+
+Run from the repository root:  python -m benchmarks.bench_job_stream [sizes]   (default 10000,100000,1000000)
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.suite import peak_rss_mb
+from benchmarks.workload import write_fixtures
+
+QUERY = {"role": "developer", "location": "remote"}
+
+
+def worker(mode: str) -> None:
+    start = time.perf_counter()
+    if mode == "store":
+        from agent.tools import job_search
+        results = iter(job_search(dict(QUERY)))
+    else:
+        from agent.job_stream import job_search_stream
+        results = job_search_stream(dict(QUERY))
+    first = next(results, None)
+    first_ms = (time.perf_counter() - start) * 1e3
+    count = (first is not None) + sum(1 for _ in results)
+    print(json.dumps({"first_ms": first_ms, "total_ms": (time.perf_counter() - start) * 1e3,
+                      "matches": count, "peak_rss_mb": peak_rss_mb()}))
+
+
+def run(mode: str, jobs_path: str) -> dict:
+    env = dict(os.environ, AGENT_JOBS_PATH=jobs_path, AGENT_LOG_MODE="off", AGENT_MEMO="0")
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_job_stream", "--worker", mode],
+                         env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    sizes = [int(s) for s in (sys.argv[1] if len(sys.argv) > 1 else "10000,100000,1000000").split(",")]
+    print(f"{'feed':>9} {'mode':<7} {'first ms':>9} {'total ms':>9} {'matches':>8} {'rss MB':>8}")
+    for size in sizes:
+        path = write_fixtures(size)["jobs"]
+        for mode in ("store", "stream"):
+            row = run(mode, path)
+            print(f"{size:>9} {mode:<7} {row['first_ms']:>9.1f} {row['total_ms']:>9.1f} "
+                  f"{row['matches']:>8} {row['peak_rss_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,71 @@
+"""
+KB planner + lookup latency on synthetic kb.json files of growing size.
+
+Run from the repository root:  python -m benchmarks.bench_kb_index [max_entries]
+"""
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+from agent.kb_store import KBStore
+from benchmarks.common import per_call_us, print_table
+
+SYLLABLES = ["ka", "lo", "mi", "ra", "to", "ve", "su", "ne", "di", "po", "zu", "ar", "el", "in", "or"]
+PROMPTS = [
+    "who was the father of artificial intelligence?",
+    "tell me about {name}",
+    "what is the capital of nowhere in particular",
+]
+
+
+def word(rng: random.Random, n: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(n))
+
+
+def synthetic_kb(n: int, seed: int = 0) -> dict:
+    """`n` entries with two-word names and 20-word summaries drawn from a ~10k word vocabulary."""
+    rng = random.Random(seed)
+    vocab = [word(rng, rng.randint(2, 4)) for _ in range(10_000)]
+    entries = []
+    for _ in range(n):
+        name = f"{word(rng, 2).title()} {word(rng, 3).title()}"
+        summary = " ".join(rng.choice(vocab) for _ in range(20))
+        entries.append({"name": name, "summary": f"{name} is {summary}."})
+    return {"entries": entries}
+
+
+def main() -> None:
+    logging.getLogger("info_logger").disabled = True
+    max_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        n = 1_000
+        while n <= max_entries:
+            data = synthetic_kb(n)
+            path = os.path.join(tmp, f"kb_{n}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            store = KBStore(path)
+            start = time.perf_counter()
+            kb = store.snapshot()
+            rows[f"build        n={n}"] = (time.perf_counter() - start) * 1e6
+            prompts = [p.format(name=data["entries"][-1]["name"].lower()) for p in PROMPTS]
+
+            def plan_and_lookup() -> None:
+                for prompt in prompts:
+                    match = kb.index.match_prompt(prompt)
+                    if match is not None:
+                        entry, word_hit = match
+                        kb.index.lookup(word_hit or kb.names[entry])
+
+            rows[f"3 prompts    n={n}"] = per_call_us(plan_and_lookup, 2_000)
+            n *= 10
+    print_table("KB index on synthetic kb.json", rows, unit="us")
+
+
+if __name__ == "__main__":
+    main()
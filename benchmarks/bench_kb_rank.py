@@ -0,0 +1,109 @@
+"""
+Ranked KB retrieval (agent.kb_rank) on synthetic KBs of growing size: build time, size of the
+BM25 matrix and top-k query latency for queries of 1, 3 and 6 terms of varying frequency.
+
+    python -m benchmarks.bench_kb_rank [--entries 10000,100000,1000000] [--k 10] [--budget-ms 5]
+
+Summaries are 10 to 40 words drawn from a 50k-word vocabulary with a Zipf distribution. The
+first STOP_RANKS ranks are left out, as the tokenizer drops stop words, so the most common
+terms still occur in a large share of the entries. The exit status is 1 when the p99 of any
+query kind at the largest size is over the budget.
+"""
+import argparse
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from agent.kb_rank import BM25Index
+from benchmarks.bench_kb_index import SYLLABLES
+
+VOCAB = 50_000
+STOP_RANKS = 100
+QUERIES = 200
+
+
+def vocabulary(rng: np.random.Generator) -> List[str]:
+    words = set()
+    while len(words) < VOCAB:
+        n = int(rng.integers(2, 5))
+        words.add("".join(SYLLABLES[int(i)] for i in rng.integers(0, len(SYLLABLES), n)))
+    return sorted(words, key=lambda w: (len(w), w))
+
+
+def synthetic_kb(n: int, vocab: List[str], rng: np.random.Generator) -> Tuple[List[str], List[str]]:
+    lengths = rng.integers(10, 41, n)
+    ranks = np.empty(0, dtype=np.int64)
+    while len(ranks) < lengths.sum():
+        drawn = rng.zipf(1.1, size=int(lengths.sum()))
+        drawn = drawn[drawn > STOP_RANKS] - STOP_RANKS - 1
+        ranks = np.concatenate([ranks, np.minimum(drawn, VOCAB - 1)])
+    ranks = ranks.tolist()
+    names = [f"Entry {i}" for i in range(n)]
+    summaries = []
+    start = 0
+    for length in lengths.tolist():
+        summaries.append(" ".join(vocab[r] for r in ranks[start:start + length]))
+        start += length
+    return names, summaries
+
+
+def query_kinds(vocab: List[str], rng: np.random.Generator) -> Dict[str, List[str]]:
+    def words(lo: int, hi: int, n: int) -> List[str]:
+        return [" ".join(vocab[int(r)] for r in rng.integers(lo, hi, n)) for _ in range(QUERIES)]
+
+    return {
+        "1 rare term": words(1_000, VOCAB, 1),
+        "3 mixed terms": [f"{a} {b}" for a, b in zip(words(0, 100, 1), words(100, VOCAB, 2))],
+        "6 mixed terms": [f"{a} {b}" for a, b in zip(words(0, 100, 2), words(100, VOCAB, 4))],
+        "3 common terms": words(0, 20, 3),
+    }
+
+
+def latencies_ms(index: BM25Index, queries: List[str], k: int) -> List[float]:
+    times = []
+    for q in queries:
+        start = time.perf_counter()
+        index.top_k(q, k)
+        times.append((time.perf_counter() - start) * 1e3)
+    return sorted(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_kb_rank")
+    parser.add_argument("--entries", default="10000,100000,1000000")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=5.0, help="p99 limit at the largest size")
+    opts = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vocab = vocabulary(rng)
+    sizes = [int(n) for n in opts.entries.split(",")]
+    over = []
+    print(f"top-{opts.k} BM25, {QUERIES} queries per kind")
+    print(f"{'entries':>9} {'query':<15} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for n in sizes:
+        names, summaries = synthetic_kb(n, vocab, rng)
+        start = time.perf_counter()
+        index = BM25Index.build(names, summaries)
+        built = time.perf_counter() - start
+        del names, summaries
+        size_mb = (index.starts.nbytes + index.docs.nbytes + index.weights.nbytes) / 1e6
+        print(f"{n:>9} built in {built:.1f}s, {len(index.weights):,} postings, {size_mb:.0f} MB")
+        for kind, queries in query_kinds(vocab, rng).items():
+            index.top_k(queries[0], opts.k)
+            times = latencies_ms(index, queries, opts.k)
+            p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+            print(f"{n:>9} {kind:<15} {statistics.median(times):>8.2f} {p99:>8.2f} {times[-1]:>8.2f}")
+            if n == sizes[-1] and p99 > opts.budget_ms:
+                over.append(f"{kind}: p99 {p99:.2f} ms")
+    if over:
+        print(f"\nover the {opts.budget_ms} ms budget at {sizes[-1]} entries: " + "; ".join(over))
+        sys.exit(1)
+    print(f"\nall p99 within {opts.budget_ms} ms at {sizes[-1]} entries")
+
+
+if __name__ == "__main__":
+    main()
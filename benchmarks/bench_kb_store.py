@@ -0,0 +1,49 @@
+"""
+Per-query cost of the KB path (planner + tool) as the number of queries grows.
+
+Run from the repository root:  python -m benchmarks.bench_kb_store
+"""
+import json
+import logging
+import re
+import string
+
+from agent.kb_index import STOP_WORDS
+from agent.llm import extract_kb_tool
+from agent.tools import kb_lookup
+from benchmarks.common import per_call_us, print_table
+
+PROMPT = "who was the father of artificial intelligence."
+
+
+def legacy_kb_path() -> None:
+    # What every query paid before the store: two reads + parses of kb.json and a
+    # re-tokenization of every summary.
+    with open("data/kb.json", "r", encoding="utf-8") as f:
+        kb = json.load(f)
+    words = re.sub(f"[{re.escape(string.punctuation)}]", " ", PROMPT).split()
+    for entry in kb["entries"]:
+        summary = set(re.sub(f"[{re.escape(string.punctuation)}]", " ", entry["summary"].lower()).split())
+        if any(w not in STOP_WORDS and w in summary for w in words):
+            break
+    with open("data/kb.json", "r", encoding="utf-8") as f:
+        json.load(f)
+
+
+def kb_path() -> None:
+    call = extract_kb_tool(PROMPT)
+    kb_lookup(call["args"]["q"])
+
+
+def main() -> None:
+    # Measure the data path, not the file logger.
+    logging.getLogger("info_logger").disabled = True
+    rows = {}
+    for n in (1_000, 10_000, 100_000):
+        rows[f"legacy  n={n}"] = per_call_us(legacy_kb_path, n // 10)
+        rows[f"store   n={n}"] = per_call_us(kb_path, n)
+    print_table("KB planner + lookup, per query", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+End-to-end answer() latency under each logging mode.
+
+Each mode runs in a fresh interpreter, since handlers are configured once per process from
+AGENT_LOG_MODE / AGENT_LOG_LEVEL. Logs go to a temporary directory; the best of three rounds is reported. Tool memoization is turned
+off so every question runs its tools and emits their log lines.
+
+Run from the repository root:  python -m benchmarks.bench_logging [questions]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROMPTS = [
+    "What is 12.5% of 243?",
+    "temperature in london",
+    "Who is Ada Lovelace?",
+    "add 10 to the average temperature in paris and london",
+    "find remote python developer jobs posted this week",
+]
+MODES = [("sync", "INFO"), ("queue", "INFO"), ("queue", "WARNING"), ("off", "INFO")]
+
+
+def worker(n: int) -> None:
+    from agent.agent import answer
+    from logger.pipeline import flush_logs
+
+    for prompt in PROMPTS:
+        answer(prompt)
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for i in range(n):
+            answer(PROMPTS[i % len(PROMPTS)])
+        enqueued = time.perf_counter() - start
+        flush_logs()
+        drained = time.perf_counter() - start
+        best = min(best or (enqueued, drained), (enqueued, drained))
+    print(f"{best[0] / n * 1e6:.2f} {best[1] / n * 1e6:.2f}")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"answer() over {n} questions")
+    with tempfile.TemporaryDirectory() as log_dir:
+        for mode, level in MODES:
+            env = dict(os.environ, AGENT_LOG_MODE=mode, AGENT_LOG_LEVEL=level, AGENT_LOG_DIR=log_dir, AGENT_MEMO="0")
+            out = subprocess.run([sys.executable, "-m", "benchmarks.bench_logging", "--worker", str(n)],
+                                 env=env, capture_output=True, text=True, check=True).stdout.split()
+            label = f"{mode}/{level}"
+            print(f"  {label:<14} {float(out[0]):8.2f} us/answer   {float(out[1]):8.2f} us/answer incl. drain")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--worker":
+        worker(int(sys.argv[2]))
+    else:
+        main()
@@ -0,0 +1,39 @@
+"""
+Keyword scanning cost as the keyword tables grow: one `any(k in prompt)` pass per table
+vs the single-pass router.
+
+Run from the repository root:  python -m benchmarks.bench_router
+"""
+import random
+
+from agent.router import KeywordRouter, keyword_tables
+from benchmarks.common import per_call_us, print_table
+
+PROMPT = "find software engineer jobs in dhaka posted last week and the average temperature in london"
+
+
+def grown_tables(extra: int) -> dict:
+    rng = random.Random(extra)
+    tables = {name: list(words) for name, words in keyword_tables().items()}
+    for name in tables:
+        tables[name] += ["".join(rng.choice("qxzjvk") for _ in range(8)) for _ in range(extra // len(tables))]
+    return tables
+
+
+def naive_scan(tables: dict, prompt: str) -> dict:
+    return {name: [k for k in words if k in prompt] for name, words in tables.items()}
+
+
+def main() -> None:
+    rows = {}
+    for extra in (0, 1_000, 10_000):
+        tables = grown_tables(extra)
+        size = sum(len(t) for t in tables.values())
+        router = KeywordRouter(tables)
+        rows[f"per-table scans  keywords={size}"] = per_call_us(lambda: naive_scan(tables, PROMPT), 200)
+        rows[f"router           keywords={size}"] = per_call_us(lambda: router.scan(PROMPT), 2_000)
+    print_table("keyword scan per prompt", rows)
+
+
+if __name__ == "__main__":
+    main()
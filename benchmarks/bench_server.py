@@ -0,0 +1,118 @@
+"""
+Load generator for the answer server (agent.server): sustained QPS and latency per worker count.
+
+    python -m benchmarks.bench_server [--workers 1,2,4] [--clients 16] [--seconds 5] [--queue 256]
+
+For each worker count it starts a server on a scratch socket. It then runs `--clients`
+closed-loop client processes for `--seconds`, each sending the benchmark prompt mix over its
+own connection. It reports completed QPS, p50/p99 latency and how many requests were shed.
+Logging and the answer memo are off in the server unless --with-logging / --memo are given,
+so the numbers are the cost of answering, not of cache hits. The last table compares one
+`python main.py "..."` invocation answered in-process with the same invocation through the server.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from agent.client import Client, Overloaded
+from benchmarks.workload import generate_prompts
+
+CLI_PROMPT = "What is 12.5% of 243?"
+
+
+def wait_for(path: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            Client(path).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def client_run(path: str, seconds: float, seed: int) -> Dict[str, List[int]]:
+    prompts = generate_prompts(1000, seed=seed)
+    latencies, shed = [], 0
+    with Client(path) as client:
+        clock = time.perf_counter_ns
+        deadline = clock() + int(seconds * 1e9)
+        i = 0
+        while clock() < deadline:
+            t0 = clock()
+            try:
+                client.ask(prompts[i % len(prompts)])
+                latencies.append(clock() - t0)
+            except Overloaded:
+                shed += 1
+            i += 1
+    return {"latencies": latencies, "shed": shed}
+
+
+def start_server(path: str, workers: int, queue: int, memo: bool, with_logging: bool) -> subprocess.Popen:
+    env = dict(os.environ, AGENT_MEMO="1" if memo else "0")
+    if not with_logging:
+        env["AGENT_LOG_MODE"] = "off"
+    proc = subprocess.Popen([sys.executable, "-m", "agent.server", "--socket", path, "--workers", str(workers),
+                             "--queue", str(queue)], env=env, stderr=subprocess.DEVNULL)
+    wait_for(path)
+    return proc
+
+
+def cli_ms(env: Dict[str, str], runs: int = 5) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", CLI_PROMPT], env=env, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1e3)
+    return sorted(times)[len(times) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_server")
+    cores = os.cpu_count() or 1
+    parser.add_argument("--workers", default=",".join(str(w) for w in sorted({1, max(1, cores // 2), cores})))
+    parser.add_argument("--clients", type=int, default=2 * cores)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--queue", type=int, default=256)
+    parser.add_argument("--memo", action="store_true", help="leave the answer memo on in the server")
+    parser.add_argument("--with-logging", action="store_true")
+    opts = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.sock")
+    print(f"{cores} cores, {opts.clients} clients, {opts.seconds:.0f}s per run, queue {opts.queue}")
+    print(f"{'workers':>7} {'qps':>9} {'p50 ms':>8} {'p99 ms':>8} {'shed':>7}")
+    with ProcessPoolExecutor(opts.clients) as pool:
+        for workers in (int(w) for w in opts.workers.split(",")):
+            server = start_server(path, workers, opts.queue, opts.memo, opts.with_logging)
+            try:
+                runs = list(pool.map(client_run, [path] * opts.clients, [opts.seconds] * opts.clients,
+                                     range(opts.clients)))
+            finally:
+                server.terminate()
+                server.wait()
+            latencies = sorted(ns for run in runs for ns in run["latencies"])
+            shed = sum(run["shed"] for run in runs)
+            p50 = latencies[len(latencies) // 2] / 1e6 if latencies else 0.0
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1e6 if latencies else 0.0
+            print(f"{workers:>7} {len(latencies) / opts.seconds:>9.0f} {p50:>8.2f} {p99:>8.2f} {shed:>7}")
+
+    env = dict(os.environ, AGENT_LOG_MODE="off", AGENT_SOCKET=path)
+    local = cli_ms(dict(env, AGENT_SERVER="0"))
+    server = start_server(path, 1, opts.queue, opts.memo, opts.with_logging)
+    try:
+        served = cli_ms(dict(env, AGENT_SERVER="1"))
+    finally:
+        server.terminate()
+        server.wait()
+    print(f"\nmain.py one question: in-process {local:.0f} ms, via server {served:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
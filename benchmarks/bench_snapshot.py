@@ -0,0 +1,81 @@
+"""
+Cold start and memory of the KB and job stores: parsing the JSON files vs mapping their
+compiled binary snapshots. Each (size, mode) loads both stores in a fresh interpreter and
+then times a batch of lookups, so the lookup cost of reading through the mapping shows too.
+"Private MB" is memory only this process holds; mapped snapshot pages are shared page cache
+that every worker mapping the same file reuses.
+
+Run from the repository root:  python -m benchmarks.bench_snapshot [sizes]   (default 10000,100000,1000000)
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.suite import peak_rss_mb
+from benchmarks.workload import kb_name, write_fixtures
+
+
+def private_mb() -> float:
+    """Private (unshared) resident memory of this process, from smaps_rollup; 0 where unavailable."""
+    try:
+        with open("/proc/self/smaps_rollup", "r", encoding="ascii") as f:
+            return sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean", "Private_Dirty"))) / 1024
+    except OSError:
+        return 0.0
+
+
+def worker(size: int) -> None:
+    start = time.perf_counter()
+    from agent.job_store import get_job_store
+    from agent.kb_store import get_kb_store
+    kb = get_kb_store().snapshot()
+    jobs = get_job_store().snapshot()
+    load_ms = (time.perf_counter() - start) * 1e3
+    rng = random.Random(0)
+    names = [kb_name(rng.randrange(size)).lower() for _ in range(2000)]
+    start = time.perf_counter()
+    for name in names:
+        kb.index.lookup(name)
+        kb.index.match_prompt(f"who is {name}?")
+    kb_us = (time.perf_counter() - start) / len(names) * 1e6
+    start = time.perf_counter()
+    for _ in range(200):
+        jobs.search({"role": "developer", "location": "remote"}, limit=20)
+    jobs_us = (time.perf_counter() - start) / 200 * 1e6
+    print(json.dumps({"load_ms": load_ms, "kb_us": kb_us, "jobs_us": jobs_us,
+                      "rss_mb": peak_rss_mb(), "private_mb": private_mb()}))
+
+
+def run(size: int, mode: str, paths: dict) -> dict:
+    env = dict(os.environ, AGENT_KB_PATH=paths["kb"], AGENT_JOBS_PATH=paths["jobs"],
+               AGENT_LOG_MODE="off", AGENT_SNAPSHOTS="1" if mode == "snapshot" else "0")
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_snapshot", "--worker", str(size)],
+                         env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    from agent.job_store import JobStore
+    from agent.kb_store import KBStore
+    from agent.snapshot import compile_snapshot
+
+    sizes = [int(s) for s in (sys.argv[1] if len(sys.argv) > 1 else "10000,100000,1000000").split(",")]
+    print(f"{'size':>8} {'mode':<9} {'load ms':>9} {'kb us':>7} {'jobs us':>8} {'rss MB':>8} {'private MB':>11}")
+    for size in sizes:
+        paths = write_fixtures(size)
+        compile_snapshot(KBStore(paths["kb"]))
+        compile_snapshot(JobStore(paths["jobs"]))
+        for mode in ("json", "snapshot"):
+            row = run(size, mode, paths)
+            print(f"{size:>8} {mode:<9} {row['load_ms']:>9.1f} {row['kb_us']:>7.1f} {row['jobs_us']:>8.1f} "
+                  f"{row['rss_mb']:>8.1f} {row['private_mb']:>11.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(int(sys.argv[2]))
+    else:
+        main()
@@ -0,0 +1,139 @@
+"""
+Cold start: time to first answer of `python main.py "..."`, and where import time goes.
+
+    python -m benchmarks.bench_startup [--runs 15] [--top 15]
+    python -m benchmarks.bench_startup --save benchmarks/startup_baseline.json
+    python -m benchmarks.bench_startup --baseline benchmarks/startup_baseline.json [--threshold 0.25]
+
+Every run is a fresh interpreter answering one question in-process (AGENT_SERVER=0), with
+logging on as in normal use. Each prompt kind is timed with and without a warm-state file
+(agent.warm_state), which is compiled to a scratch path for the run. `python -c pass` is
+the floor that no change to the agent can go below. The import breakdown comes from
+`python -X importtime -c "import agent.agent"`, taking the median self time per module over the runs.
+The agent's bytecode is compiled first, as an install would, so that the numbers do not
+depend on PYTHONDONTWRITEBYTECODE or on which modules changed since the last run.
+With --baseline, the exit status is 1 when any median grows by more than the threshold.
+"""
+import argparse
+import compileall
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.suite import compare
+
+PROMPTS = {
+    "calc": "What is 12.5% of 243?",
+    "weather": "What's the weather in London?",
+    "kb": "Who is Ada Lovelace?",
+    "job": "Find developer jobs in remote",
+}
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def wall_us(cmd: List[str], env: Dict[str, str], runs: int) -> List[float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1e6)
+    return sorted(times)
+
+
+def import_breakdown(env: Dict[str, str], runs: int) -> Dict[str, Dict[str, float]]:
+    """Median self and cumulative import time (us) per module of `import agent.agent`."""
+    samples: Dict[str, List[List[int]]] = {}
+    for _ in range(runs):
+        err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import agent.agent"], env=env, cwd=ROOT,
+                             check=True, capture_output=True, text=True).stderr
+        seen = set()
+        after_site = False  # site's own imports (sitecustomize, .pth hooks) are not the agent's
+        for line in err.splitlines():
+            m = _IMPORTTIME.match(line)
+            if m and not after_site:
+                after_site = m.group(4) == "site" and not m.group(3)
+            elif m:
+                name = m.group(4)
+                seen.add(name)
+                samples.setdefault(name, []).append([int(m.group(1)), int(m.group(2))])
+        for name in list(samples):
+            if name not in seen:
+                samples[name].append([0, 0])
+    return {name: {"self": statistics.median(s[0] for s in values), "cumulative": statistics.median(s[1] for s in values)}
+            for name, values in samples.items()}
+
+
+def row(times: List[float]) -> Dict[str, float]:
+    return {"p50_us": statistics.median(times), "p90_us": times[min(len(times) - 1, int(len(times) * 0.9))]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_startup")
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--top", type=int, default=15, help="modules listed in the import breakdown")
+    parser.add_argument("--save", metavar="FILE.json", help="write the results as a baseline")
+    parser.add_argument("--baseline", metavar="FILE.json", help="compare against a baseline and gate on it")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    opts = parser.parse_args()
+
+    for package in ("agent", "logger"):
+        compileall.compile_dir(os.path.join(ROOT, package), quiet=1)
+    compileall.compile_file(os.path.join(ROOT, "constants.py"), quiet=1)
+    from agent.warm_state import compile_warm_state
+
+    scratch = tempfile.mkdtemp()
+    warm_path = os.path.join(scratch, "warm_state.bin")
+    compile_warm_state(warm_path)
+    env = dict(os.environ, AGENT_SERVER="0", AGENT_LOG_DIR=os.path.join(scratch, "logs"))
+    configs = {"cold": dict(env, AGENT_WARM_STATE="0"), "warm": dict(env, AGENT_WARM_STATE_PATH=warm_path)}
+
+    results: Dict[str, Dict[str, float]] = {"interpreter": row(wall_us([sys.executable, "-c", "pass"], env, opts.runs))}
+    for kind, prompt in PROMPTS.items():
+        for config, config_env in configs.items():
+            results[f"main.py {kind} ({config})"] = row(wall_us([sys.executable, "main.py", prompt], config_env, opts.runs))
+    modules = import_breakdown(env, opts.runs)
+    results["import agent.agent"] = {"p50_us": modules.get("agent.agent", {}).get("cumulative", 0.0)}
+
+    baseline: Optional[Dict[str, Dict[str, float]]] = None
+    if opts.baseline and os.path.exists(opts.baseline):
+        with open(opts.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print(f"{opts.runs} runs each, medians")
+    width = max(len(k) for k in results)
+    print(f"{'':<{width}} {'p50 ms':>8} {'p90 ms':>8}" + ("  baseline p50" if baseline else ""))
+    for key, r in results.items():
+        line = f"{key:<{width}} {r['p50_us'] / 1e3:>8.1f} " + (f"{r['p90_us'] / 1e3:>8.1f}" if "p90_us" in r else f"{'':>8}")
+        base = (baseline or {}).get(key)
+        if base:
+            line += f"  {base['p50_us'] / 1e3:>8.1f}"
+        print(line)
+
+    print(f"\nslowest imports under agent.agent (self / cumulative ms):")
+    ranked = sorted(modules.items(), key=lambda item: item[1]["self"], reverse=True)[:opts.top]
+    for name, t in ranked:
+        print(f"  {name:<40} {t['self'] / 1e3:>7.2f} {t['cumulative'] / 1e3:>8.2f}")
+
+    if opts.save:
+        with open(opts.save, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"\nbaseline written to {opts.save}")
+    if baseline is not None:
+        regressions = compare(results, baseline, opts.threshold)
+        for line in regressions:
+            print(f"  {line}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {opts.threshold:.0%}")
+            sys.exit(1)
+        print(f"\nno regressions beyond {opts.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Token counting throughput for log_cost: the whitespace estimate vs the bundled BPE vocab.
+
+"cold" clears both caches before every count so each piece is merged; "new prompts" sees unseen
+prompts made of already-seen words (the per-piece cache); "repeated" cycles through 1,000
+prompts that fit in the per-text LRU. If tiktoken is installed it is timed on the same vocab for reference.
+
+Run from the repository root:  python -m benchmarks.bench_token_count
+"""
+import random
+import time
+
+from agent.token_count import VOCAB_PATH, BPECounter, PIECE_PATTERN, WhitespaceCounter, load_ranks
+
+WORDS = ("what is the average temperature in paris and london plus 12.5% of 243 find remote python "
+         "developer jobs posted this week who wrote the first compiler Ada Lovelace Grace Hopper").split()
+TOOL_OUTPUTS = ["calc(expr=what is 12.5% of 243?)", "weather(city=paris, keyword=temperature); weather(city=london, keyword=temperature)"]
+
+
+def prompts(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 14))) + "?" for _ in range(n)]
+
+
+def per_sec(fn, texts) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    ranks = load_ranks(VOCAB_PATH)
+    first, second = prompts(20_000, 1), prompts(20_000, 2)
+    outputs = TOOL_OUTPUTS * 5_000
+    rows = {"whitespace": per_sec(WhitespaceCounter().count, first)}
+    counter = BPECounter(ranks)
+
+    def cold(text: str) -> int:
+        counter._pieces.clear()
+        counter.count.cache_clear()
+        return counter.count(text)
+
+    rows["bpe, cold"] = per_sec(cold, first[:2_000])
+    per_sec(counter.count, first)
+    rows["bpe, new prompts"] = per_sec(counter.count, second)
+    per_sec(counter.count, second[:1_000])
+    rows["bpe, repeated prompts"] = per_sec(counter.count, second[:1_000] * 20)
+    rows["bpe, tool outputs"] = per_sec(counter.count, outputs)
+    rows["bpe, non-ascii"] = per_sec(counter.count, [p.replace("paris", "münchen") for p in prompts(20_000, 3)])
+    try:
+        import tiktoken
+        enc = tiktoken.Encoding("bundled", pat_str=PIECE_PATTERN.pattern, mergeable_ranks=ranks, special_tokens={})
+        rows["tiktoken (reference)"] = per_sec(lambda t: len(enc.encode_ordinary(t)), second)
+    except ImportError:
+        pass
+    print("token counts per second")
+    width = max(len(k) for k in rows)
+    for label, value in rows.items():
+        print(f"  {label:<{width}}  {value:12,.0f} counts/s")
+
+
+if __name__ == "__main__":
+    main()
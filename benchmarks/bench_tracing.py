@@ -0,0 +1,49 @@
+"""
+Overhead of span instrumentation on answer(): tracing off, histograms only, and histograms
+plus the raw span buffer used for Chrome/OTel export. Also the bare cost of one span.
+
+Run from the repository root:  python -m benchmarks.bench_tracing
+"""
+import logging
+
+from agent.agent import answer
+from agent.tracing import TRACER, span
+from benchmarks.common import per_call_us, print_table
+
+PROMPTS = [
+    "What is 12.5% of 243?",
+    "temperature in london",
+    "Who is Ada Lovelace?",
+    "add 10 to the average temperature in paris and london",
+]
+
+
+def run_prompts() -> None:
+    for prompt in PROMPTS:
+        answer(prompt)
+
+
+def empty_span() -> None:
+    with span("bench", "x"):
+        pass
+
+
+def main() -> None:
+    logging.getLogger("info_logger").disabled = True
+    logging.getLogger("llm_cost_logger").disabled = True
+    run_prompts()
+    rows = {}
+    TRACER.disable()
+    rows["span, tracing off"] = per_call_us(empty_span, 200_000)
+    rows["answer, tracing off"] = per_call_us(run_prompts, 5_000) / len(PROMPTS)
+    TRACER.enable(keep_spans=False)
+    rows["span, histograms"] = per_call_us(empty_span, 200_000)
+    rows["answer, histograms"] = per_call_us(run_prompts, 5_000) / len(PROMPTS)
+    TRACER.enable(keep_spans=True)
+    rows["answer, histograms + spans"] = per_call_us(run_prompts, 5_000) / len(PROMPTS)
+    TRACER.disable()
+    print_table("tracing overhead", rows)
+
+
+if __name__ == "__main__":
+    main()
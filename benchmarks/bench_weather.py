@@ -0,0 +1,111 @@
+"""
+Weather lookups against a remote service: backend round trips and answer latency under
+concurrent load, with the `agent.weather` optimizations switched on one at a time.
+
+    python -m benchmarks.bench_weather [--threads 64] [--per-thread 40] [--latency-ms 10]
+
+A stub weather service (benchmarks.weather_stub) runs in its own process with `--latency-ms` added
+to each request. For every stage a fresh worker process answers weather and multi-city
+prompts from `--threads` threads. Each stage reports the requests and connections the stub
+saw, the cities it was asked for, throughput and p50/p99 answer latency. The answer memo and
+logging are off, so every weather call reaches the weather client.
+
+    naive       new connection per request, no coalescing, one request per city, no cache
+    keep-alive  pooled keep-alive connections
+    coalesce    concurrent fetches of a city share one request
+    bulk        a multi-city plan fetches its cities in one request
+    ttl         fetched cities are served from cache for AGENT_WEATHER_TTL seconds (the default setup)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from typing import Dict, List
+
+STAGES: Dict[str, Dict[str, str]] = {
+    "naive": {"AGENT_WEATHER_POOL": "0", "AGENT_WEATHER_COALESCE": "0", "AGENT_WEATHER_BULK": "0",
+              "AGENT_WEATHER_TTL": "0"},
+    "keep-alive": {"AGENT_WEATHER_COALESCE": "0", "AGENT_WEATHER_BULK": "0", "AGENT_WEATHER_TTL": "0"},
+    "coalesce": {"AGENT_WEATHER_BULK": "0", "AGENT_WEATHER_TTL": "0"},
+    "bulk": {"AGENT_WEATHER_TTL": "0"},
+    "ttl": {},
+}
+MIX = {"weather": 1, "multi": 2}
+
+
+def worker(threads: int, per_thread: int) -> None:
+    from agent.agent import answer
+    from benchmarks.workload import generate_prompts
+
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def run(seed: int) -> None:
+        mine = []
+        for prompt in generate_prompts(per_thread, MIX, seed=seed):
+            t0 = time.perf_counter()
+            answer(prompt)
+            mine.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(mine)
+
+    pool = [threading.Thread(target=run, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(json.dumps({
+        "qps": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1e3,
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3,
+    }))
+
+
+def stub_call(url: str, path: str, method: str = "GET") -> Dict[str, int]:
+    with urllib.request.urlopen(urllib.request.Request(url + path, method=method)) as response:
+        return json.loads(response.read())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_weather")
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--per-thread", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    opts = parser.parse_args()
+    if opts.worker:
+        worker(opts.threads, opts.per_thread)
+        return
+
+    stub = subprocess.Popen([sys.executable, "-m", "benchmarks.weather_stub", "--port", "0",
+                             "--latency-ms", str(opts.latency_ms)],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        url = stub.stdout.readline().strip()
+        print(f"{opts.threads} threads x {opts.per_thread} prompts, backend latency {opts.latency_ms:g} ms")
+        print(f"{'stage':<11} {'requests':>9} {'conns':>7} {'cities':>7} {'qps':>7} {'p50 ms':>8} {'p99 ms':>8}")
+        for stage in opts.stages.split(","):
+            env = dict(os.environ, AGENT_LOG_MODE="off", AGENT_MEMO="0", AGENT_WEATHER_URL=url, **STAGES[stage])
+            stub_call(url, "/reset", "POST")
+            out = subprocess.run([sys.executable, "-m", "benchmarks.bench_weather", "--worker",
+                                  "--threads", str(opts.threads), "--per-thread", str(opts.per_thread)],
+                                 env=env, check=True, capture_output=True, text=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            counts = stub_call(url, "/stats")
+            print(f"{stage:<11} {counts['requests']:>9} {counts['connections']:>7} {counts['cities']:>7} "
+                  f"{result['qps']:>7.0f} {result['p50']:>8.1f} {result['p99']:>8.1f}")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+import time
+from typing import Any, Callable, Dict
+
+
+def per_call_us(fn: Callable[[], Any], n: int) -> float:
+    """Runs `fn` n times and returns the mean wall time of one call in microseconds."""
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def print_table(title: str, rows: Dict[str, float], unit: str = "us/call") -> None:
+    print(title)
+    width = max(len(k) for k in rows)
+    for label, value in rows.items():
+        print(f"  {label:<{width}}  {value:10.2f} {unit}")
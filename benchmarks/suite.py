@@ -0,0 +1,207 @@
+"""
+Benchmark suite: p50/p99 latency, throughput and peak memory per component and fixture size,
+with JSON baselines and a regression gate.
+
+    python -m benchmarks.suite                                  # report only
+    python -m benchmarks.suite --save benchmarks/baseline.json  # record a baseline
+    python -m benchmarks.suite --baseline benchmarks/baseline.json [--threshold 0.25]
+
+Every (component, size) runs in a fresh interpreter pointed at generated fixtures through
+AGENT_KB_PATH / AGENT_JOBS_PATH, so peak RSS is per component and no cache leaks between runs.
+Logging is off unless --with-logging is given. With --baseline, the exit status is 1 when
+any p50 or peak memory grows, or any throughput drops, by more than the threshold.
+Baselines are machine-specific: record and compare them on the same host.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.workload import calc_prompt, generate_prompts, job_prompt, kb_name, write_fixtures
+
+DEFAULT_SIZES = [10, 1_000, 100_000]
+SIZED = ("answer", "call_llm", "kb", "job_search")
+COMPONENTS = ("answer", "call_llm", "calc", "weather", "kb", "job_search")
+GATED = (("p50_us", "higher"), ("throughput", "lower"), ("peak_rss_mb", "higher"))
+
+
+def _percentile(sorted_values: List[int], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process. VmHWM resets on exec; ru_maxrss on Linux keeps the
+    parent's high-water mark across fork/exec, so it is only the fallback."""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def measure(fn: Callable[[Any], Any], inputs: List[Any], seconds: float) -> Dict[str, float]:
+    """Times fn over inputs (cycling) until every input ran once and `seconds` passed, or 20x the inputs."""
+    start = time.perf_counter_ns()
+    fn(inputs[0])
+    setup_ms = (time.perf_counter_ns() - start) / 1e6
+    durations = []
+    clock = time.perf_counter_ns
+    deadline = clock() + int(seconds * 1e9)
+    i = 0
+    while i < len(inputs) or (clock() < deadline and i < 20 * len(inputs)):
+        item = inputs[i % len(inputs)]
+        t0 = clock()
+        fn(item)
+        durations.append(clock() - t0)
+        i += 1
+    durations.sort()
+    return {
+        "calls": len(durations),
+        "setup_ms": setup_ms,
+        "p50_us": _percentile(durations, 50) / 1e3,
+        "p99_us": _percentile(durations, 99) / 1e3,
+        "throughput": len(durations) / (sum(durations) / 1e9),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def workload(component: str, size: int, n: int):
+    """The function under test and its inputs; imports happen here, after the env is set."""
+    import random
+
+    rng = random.Random(size)
+    if component == "answer":
+        from agent.agent import answer
+        return answer, generate_prompts(n, kb_size=size, seed=1)
+    if component == "call_llm":
+        from agent.llm import call_llm
+        return call_llm, generate_prompts(n, kb_size=size, seed=1)
+    if component == "calc":
+        from agent.tools import evaluate
+        return evaluate, [calc_prompt(rng).lower() for _ in range(n)]
+    if component == "weather":
+        from agent.tools import temp
+        from constants import TEMPS, WEATHER_KEYWORDS
+        return (lambda args: temp(*args)), [(rng.choice(list(TEMPS)), rng.choice(WEATHER_KEYWORDS)) for _ in range(n)]
+    if component == "kb":
+        from agent.tools import kb_lookup
+        return kb_lookup, [kb_name(rng.randrange(size)).lower() for _ in range(n)]
+    if component == "job_search":
+        from agent.llm import extract_job_search_tool
+        from agent.tools import job_search
+        calls = [extract_job_search_tool(job_prompt(rng).lower()) for _ in range(n)]
+        return job_search, [dict(call["args"], limit=50) for call in calls if call]
+    raise ValueError(f"unknown component {component!r}")
+
+
+def worker(component: str, size: int, n: int, seconds: float) -> None:
+    fn, inputs = workload(component, size, n)
+    print(json.dumps(measure(fn, inputs, seconds)))
+
+
+def run_one(component: str, size: Optional[int], n: int, seconds: float, with_logging: bool) -> Dict[str, float]:
+    env = dict(os.environ, AGENT_MEMO="0")
+    if not with_logging:
+        env["AGENT_LOG_MODE"] = "off"
+    if component == "call_llm":
+        env["AGENT_PLAN_CACHE_SIZE"] = "0"  # time planning, not cache hits
+    if size is not None:
+        paths = write_fixtures(size)
+        env["AGENT_KB_PATH"], env["AGENT_JOBS_PATH"] = paths["kb"], paths["jobs"]
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--worker", component, str(size or 0), str(n), str(seconds)],
+        env=env, capture_output=True, text=True,
+    )
+    if out.returncode != 0:
+        raise RuntimeError(f"{component}@{size} failed:\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """One line per metric that moved the wrong way by more than `threshold` (a fraction)."""
+    regressions = []
+    for key, row in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for metric, worse in GATED:
+            old, new = base.get(metric), row.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old if worse == "higher" else (old - new) / old
+            if change > threshold:
+                regressions.append(f"{key} {metric}: {old:.1f} -> {new:.1f} ({change:+.0%} worse)")
+    return regressions
+
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]]) -> None:
+    width = max(len(k) for k in results)
+    print(f"{'component':<{width}} {'calls':>7} {'p50 us':>9} {'p99 us':>9} {'ops/s':>10} {'rss MB':>8} {'setup ms':>9}"
+          + ("  vs baseline p50 / ops/s" if baseline else ""))
+    for key, row in results.items():
+        line = (f"{key:<{width}} {row['calls']:>7} {row['p50_us']:>9.1f} {row['p99_us']:>9.1f} "
+                f"{row['throughput']:>10.0f} {row['peak_rss_mb']:>8.1f} {row['setup_ms']:>9.1f}")
+        base = (baseline or {}).get(key)
+        if base:
+            line += f"  {row['p50_us'] / base['p50_us'] - 1:+7.1%} / {row['throughput'] / base['throughput'] - 1:+7.1%}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--components", default=",".join(COMPONENTS))
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="fixture sizes for kb/job/answer/call_llm, e.g. 10,1000,100000,1000000")
+    parser.add_argument("-n", type=int, default=2_000, help="distinct inputs per component")
+    parser.add_argument("--seconds", type=float, default=1.0, help="minimum timed duration per component")
+    parser.add_argument("--with-logging", action="store_true")
+    parser.add_argument("--save", metavar="FILE.json", help="write the results as a baseline")
+    parser.add_argument("--baseline", metavar="FILE.json", help="compare against a baseline and gate on it")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression as a fraction (default 0.25)")
+    opts = parser.parse_args()
+
+    sizes = [int(s) for s in opts.sizes.split(",")]
+    results: Dict[str, Dict[str, float]] = {}
+    for component in opts.components.split(","):
+        for size in (sizes if component in SIZED else [None]):
+            key = component if size is None else f"{component}@{size}"
+            results[key] = run_one(component, size, opts.n, opts.seconds, opts.with_logging)
+
+    baseline = None
+    if opts.baseline and os.path.exists(opts.baseline):
+        with open(opts.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if opts.save:
+        meta = {"python": platform.python_version(), "machine": platform.machine(), "node": platform.node(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "n": opts.n, "with_logging": opts.with_logging}
+        with open(opts.save, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"baseline written to {opts.save}")
+    if baseline is not None:
+        regressions = compare(results, baseline, opts.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {opts.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nno regressions beyond {opts.threshold:.0%}")
+    elif opts.baseline:
+        print(f"\nbaseline {opts.baseline} not found; run with --save to create it")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), float(sys.argv[5]))
+    else:
+        main()
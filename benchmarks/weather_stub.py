@@ -0,0 +1,125 @@
+"""
+Local stand-in for the weather service, for tests and benchmarks.
+
+    python -m benchmarks.weather_stub [--port 8089] [--latency-ms 20]
+
+Serves `GET /weather?cities=a,b` from the static tables (see agent.weather) over HTTP/1.1
+keep-alive. `--latency-ms` is added to every request to imitate a remote service.
+`GET /stats` returns the connections accepted, requests served and cities asked for,
+and `POST /reset` zeroes them.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from agent.weather import StaticProvider
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out in two writes on a kept-alive connection
+    server: "WeatherStub"
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/stats":
+            self._send(200, self.server.snapshot_counters())
+            return
+        if url.path != "/weather":
+            self._send(404, {"error": "not found"})
+            return
+        cities = [c for c in ",".join(parse_qs(url.query).get("cities", [])).split(",") if c]
+        self.server.count(requests=1, cities=len(cities))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self._send(200, {"cities": self.server.provider.fetch(cities)})
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path == "/reset":
+            self.server.reset()
+            self._send(200, {"ok": True})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class WeatherStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        super().__init__((host, port), _Handler)
+        self.provider = StaticProvider()
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.reset()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                self.counters[name] += delta
+
+    def snapshot_counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters = {"connections": 0, "requests": 0, "cities": 0}
+
+    def process_request(self, request, client_address) -> None:
+        self.count(connections=1)
+        super().process_request(request, client_address)
+
+    def start(self) -> "WeatherStub":
+        """Serves from a daemon thread; returns self so tests can write `WeatherStub().start()`."""
+        self._thread = threading.Thread(target=self.serve_forever, name="weather-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.weather_stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089, help="0 picks a free port")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every weather request")
+    opts = parser.parse_args()
+    stub = WeatherStub(opts.host, opts.port, opts.latency_ms / 1000)
+    print(stub.url, flush=True)  # first line of output, so a parent process can read the port
+    print(f"weather stub on {stub.url} (latency {opts.latency_ms} ms)", file=sys.stderr)
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Synthetic workloads for the benchmark suite: prompt mixes and scaled kb.json/jobs.json fixtures.
+
+    python -m benchmarks.workload prompts 1000 [--mix calc=3,weather=2,kb=2,job=2,multi=1]
+    python -m benchmarks.workload fixtures 10,1000,100000 [--out benchmarks/.fixtures]
+
+Prompts are phrased the way the planner's keyword tables expect, so every category actually
+exercises its tool; KB and job prompts are drawn from the fixture they will run against.
+"""
+import argparse
+import json
+import os
+import random
+from typing import Dict, List, Optional
+
+from constants import COMPANY_KEYWORDS, LOCATION_KEYWORDS, ROLE_KEYWORDS, TEMPS, WEATHER_KEYWORDS
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), ".fixtures")
+DEFAULT_MIX = {"calc": 3, "weather": 2, "kb": 2, "job": 2, "multi": 1}
+
+FIRST = ["ada", "alan", "grace", "edsger", "barbara", "donald", "john", "claude", "margaret", "ken",
+         "dennis", "linus", "guido", "frances", "katherine", "tim", "vint", "radia", "niklaus", "leslie"]
+LAST = ["lovelace", "turing", "hopper", "dijkstra", "liskov", "knuth", "mccarthy", "shannon", "hamilton",
+        "thompson", "ritchie", "torvalds", "rossum", "allen", "johnson", "berners", "cerf", "perlman",
+        "wirth", "lamport"]
+TOPICS = ["compiler", "operating system", "relational database", "packet switching", "type theory",
+          "garbage collection", "distributed consensus", "cryptography", "information theory", "hypertext",
+          "structured programming", "spanning tree", "formal verification", "virtual memory", "search engine"]
+DATE_PHRASES = ["posted in the last 24 hours", "posted last week", "from the last 30 days", "posted recently", ""]
+OPS = ["plus", "minus", "times", "divided by"]
+
+
+def kb_name(i: int) -> str:
+    """Name of the i-th synthetic KB entry: `First Last`, plus a number past the first 400."""
+    first, last = FIRST[i % len(FIRST)], LAST[(i // len(FIRST)) % len(LAST)]
+    suffix = "" if i < len(FIRST) * len(LAST) else f" {i}"
+    return f"{first.title()} {last.title()}{suffix}"
+
+
+def kb_entries(n: int, seed: int = 0) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    entries = []
+    for i in range(n):
+        name = kb_name(i)
+        topic = rng.choice(TOPICS)
+        summary = f"{name} is known for early work on {topic} and later contributions to {rng.choice(TOPICS)}."
+        entries.append({"name": name, "summary": summary})
+    return entries
+
+
+def job_rows(n: int, seed: int = 0) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "company": rng.choice(COMPANY_KEYWORDS).title(),
+            "date_posted": rng.choice(["24h", "1w", "1m"]),
+            "location": rng.choice(LOCATION_KEYWORDS),
+            "role": rng.choice(ROLE_KEYWORDS),
+            "url": f"jobs.example.com/{i}",
+        }
+        for i in range(n)
+    ]
+
+
+def write_fixtures(size: int, out: str = FIXTURE_DIR) -> Dict[str, str]:
+    """Writes kb-<size>.json and jobs-<size>.json (once; existing files are reused)."""
+    os.makedirs(out, exist_ok=True)
+    paths = {"kb": os.path.join(out, f"kb-{size}.json"), "jobs": os.path.join(out, f"jobs-{size}.json")}
+    if not os.path.exists(paths["kb"]):
+        with open(paths["kb"] + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"entries": kb_entries(size)}, f)
+        os.replace(paths["kb"] + ".tmp", paths["kb"])
+    if not os.path.exists(paths["jobs"]):
+        with open(paths["jobs"] + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"jobs": job_rows(size)}, f)
+        os.replace(paths["jobs"] + ".tmp", paths["jobs"])
+    return paths
+
+
+def calc_prompt(rng: random.Random) -> str:
+    kind = rng.randrange(3)
+    a, b, c = rng.randint(1, 999), rng.randint(1, 999), rng.randint(2, 50)
+    if kind == 0:
+        return f"What is {a} {rng.choice(OPS)} {b} {rng.choice(OPS)} {c}?"
+    if kind == 1:
+        return f"What is {c} percent of {a}?"
+    return f"What is the average of {a} and {b}, plus {c}?"
+
+
+def weather_prompt(rng: random.Random) -> str:
+    city = rng.choice(list(TEMPS))
+    return f"What's the {rng.choice(WEATHER_KEYWORDS)} in {city.title()}?"
+
+
+def kb_prompt(rng: random.Random, kb_size: int) -> str:
+    name = kb_name(rng.randrange(max(1, kb_size)))
+    return rng.choice([f"Who is {name}?", f"Tell me about {name}"])
+
+
+def job_prompt(rng: random.Random) -> str:
+    parts = [f"Find {rng.choice(ROLE_KEYWORDS)} jobs in {rng.choice(LOCATION_KEYWORDS)}"]
+    if rng.random() < 0.3:
+        parts.append(f"at {rng.choice(COMPANY_KEYWORDS)}")
+    parts.append(rng.choice(DATE_PHRASES))
+    return " ".join(p for p in parts if p)
+
+
+def multi_prompt(rng: random.Random) -> str:
+    a, b = rng.sample(list(TEMPS), 2)
+    return rng.choice([
+        f"Add {rng.randint(1, 20)} to the average temperature in {a.title()} and {b.title()}",
+        f"Calculate {rng.randint(2, 9)} * {rng.randint(2, 9)} and check {a.title()} weather",
+        f"What is the temperature in {a.title()} plus the temperature in {b.title()}?",
+    ])
+
+
+def generate_prompts(n: int, mix: Optional[Dict[str, int]] = None, kb_size: int = 2, seed: int = 0) -> List[str]:
+    """`n` prompts drawn from the weighted category mix, reproducible for a given seed."""
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    makers = {
+        "calc": calc_prompt,
+        "weather": weather_prompt,
+        "kb": lambda r: kb_prompt(r, kb_size),
+        "job": job_prompt,
+        "multi": multi_prompt,
+    }
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=n)
+    return [makers[kind](rng) for kind in kinds]
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        mix[kind.strip()] = int(weight or 1)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.workload")
+    sub = parser.add_subparsers(dest="command", required=True)
+    prompts = sub.add_parser("prompts", help="print a prompt mix as JSONL")
+    prompts.add_argument("n", type=int)
+    prompts.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    prompts.add_argument("--seed", type=int, default=0)
+    fixtures = sub.add_parser("fixtures", help="write scaled kb/jobs fixtures")
+    fixtures.add_argument("sizes", help="comma-separated entry counts, e.g. 10,1000,1000000")
+    fixtures.add_argument("--out", default=FIXTURE_DIR)
+    opts = parser.parse_args()
+
+    if opts.command == "prompts":
+        for prompt in generate_prompts(opts.n, opts.mix, seed=opts.seed):
+            print(json.dumps(prompt))
+    else:
+        for size in (int(s) for s in opts.sizes.split(",")):
+            print(json.dumps({"size": size, **write_fixtures(size, opts.out)}))
+
+
+if __name__ == "__main__":
+    main()
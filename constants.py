@@ -30,6 +30,10 @@ WEATHER = {
     "amsterdam": "cloudy"
 }
 
+WEATHER_KEYWORDS = [
+    "weather", "temperature", "condition", "temp", "humidity"
+]
+
 JOB_KEYWORDS = [
     "job", "position", "career", "hiring", "vacancy"
 ]
@@ -0,0 +1,231 @@
+import glob
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .pipeline import BufferedFileHandler
+
+LEDGER_FILE = "llm_cost_ledger.jsonl"
+MAX_BYTES = int(os.environ.get("AGENT_COST_LEDGER_MAX_BYTES", str(64 * 1024 * 1024)))
+MAX_AGE = float(os.environ.get("AGENT_COST_LEDGER_MAX_AGE", "86400"))
+SYSTEM_PROMPT_TOKENS = 812
+COST_PER_TOKEN = 1 / 1_000_000  # 1M tokens = $1
+NO_TOOL = "(none)"
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def make_record(prompt: str, prompt_tokens: int, output_tokens: int, tools: Sequence[str],
+                ts: Optional[float] = None) -> Dict[str, object]:
+    """Builds one ledger record. The prompt itself is not stored, only its hash."""
+    total = SYSTEM_PROMPT_TOKENS + prompt_tokens + output_tokens
+    return {
+        "ts": round(time.time() if ts is None else ts, 3),
+        "prompt_hash": prompt_hash(prompt),
+        "system_tokens": SYSTEM_PROMPT_TOKENS,
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": total,
+        "cost": round(total * COST_PER_TOKEN, 9),
+        "tools": list(tools),
+    }
+
+
+class LedgerFormatter(logging.Formatter):
+    """Renders the record's `ledger` dict as one compact JSON line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.ledger, separators=(",", ":"))
+
+
+class RotatingLedgerHandler(BufferedFileHandler):
+    """Appends ledger lines and rolls the file over once it is too large or too old.
+
+    Rolled files keep the ledger name with the time of their first record, e.g.
+    llm_cost_ledger.20250824-171742.jsonl, and are never deleted.
+    """
+
+    def __init__(self, path: str, autoflush: bool = False, max_bytes: int = MAX_BYTES, max_age: float = MAX_AGE):
+        super().__init__(path, autoflush)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._size = 0
+        self._started: Optional[float] = None
+
+    def _open_ledger(self) -> None:
+        self.stream = self._open()
+        self._size = os.fstat(self.stream.fileno()).st_size
+        self._started = None
+        if self._size:
+            with open(self.baseFilename, "rb") as f:
+                try:
+                    self._started = float(json.loads(f.readline())["ts"])
+                except (ValueError, KeyError, TypeError):
+                    self._started = os.path.getmtime(self.baseFilename)
+
+    def rollover_path(self) -> str:
+        root, ext = os.path.splitext(self.baseFilename)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started or time.time()))
+        candidate = f"{root}.{stamp}{ext}"
+        n = 1
+        while os.path.exists(candidate):
+            candidate = f"{root}.{stamp}-{n}{ext}"
+            n += 1
+        return candidate
+
+    def rollover(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename):
+            os.rename(self.baseFilename, self.rollover_path())
+        self._open_ledger()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record) + self.terminator
+            if self.stream is None:
+                self._open_ledger()
+            if self._size and (self._size + len(line) > self.max_bytes
+                               or (self._started is not None and record.created - self._started >= self.max_age)):
+                self.rollover()
+            if self._started is None:
+                self._started = record.created
+            self.stream.write(line)
+            self._size += len(line)
+            if self.autoflush:
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+
+def _percentile(hist: Counter, q: float) -> int:
+    """Nearest-rank percentile of a value -> count histogram."""
+    total = sum(hist.values())
+    if not total:
+        return 0
+    rank = max(1, math.ceil(q * total / 100))
+    seen = 0
+    for value in sorted(hist):
+        seen += hist[value]
+        if seen >= rank:
+            return value
+    return max(hist)
+
+
+class CostAggregator:
+    """Running spend totals per tool and per time window, with token-count percentiles.
+
+    Token counts are small integers, so each tool keeps an exact value -> count histogram rather
+    than the records themselves; memory grows with distinct counts, not with the number of
+    prompts. A prompt is attributed to every distinct tool it planned, so per-tool totals can
+    add up to more than the overall total.
+    """
+
+    def __init__(self, window: float = 60.0, max_windows: Optional[int] = 1440):
+        self.window = window
+        self.max_windows = max_windows
+        self.totals: Dict[str, List[float]] = {}
+        self.histograms: Dict[str, Counter] = {}
+        self.windows: "OrderedDict[float, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, record: Dict[str, object]) -> None:
+        self.add_group(record["tools"], record["total_tokens"], record["ts"], 1, record["cost"])
+
+    def add_group(self, tools: Sequence[str], tokens: int, ts: float, count: int, cost: float) -> None:
+        """Adds `count` prompts that share tools, token count and window, costing `cost` in total."""
+        keys = ["*"] + (sorted(set(tools)) or [NO_TOOL])
+        start = ts // self.window * self.window
+        with self._lock:
+            for key in keys:
+                totals = self.totals.get(key)
+                if totals is None:
+                    totals = self.totals[key] = [0, 0, 0.0]
+                    self.histograms[key] = Counter()
+                totals[0] += count
+                totals[1] += tokens * count
+                totals[2] += cost
+                self.histograms[key][tokens] += count
+            bucket = self.windows.get(start)
+            if bucket is None:
+                bucket = self.windows[start] = [0, 0, 0.0]
+                if self.max_windows is not None and len(self.windows) > self.max_windows:
+                    self.windows.popitem(last=False)
+            bucket[0] += count
+            bucket[1] += tokens * count
+            bucket[2] += cost
+
+    def summary(self, percentiles: Sequence[float] = (50, 90, 99)) -> Dict[str, object]:
+        with self._lock:
+            tools = {}
+            for key, (count, tokens, cost) in self.totals.items():
+                hist = self.histograms[key]
+                tools[key] = {
+                    "prompts": count,
+                    "tokens": tokens,
+                    "cost": cost,
+                    "tokens_p": {f"p{q:g}": _percentile(hist, q) for q in percentiles},
+                }
+            windows = [{"start": start, "prompts": c, "tokens": t, "cost": s}
+                       for start, (c, t, s) in sorted(self.windows.items())]
+        total = tools.pop("*", {"prompts": 0, "tokens": 0, "cost": 0.0, "tokens_p": {}})
+        return {"total": total, "tools": tools, "windows": windows, "window_seconds": self.window}
+
+    def clear(self) -> None:
+        with self._lock:
+            self.totals.clear()
+            self.histograms.clear()
+            self.windows.clear()
+
+
+def ledger_files(directory: str) -> List[str]:
+    """The live ledger and its rolled-over files, oldest first."""
+    root, ext = os.path.splitext(LEDGER_FILE)
+    rolled = sorted(glob.glob(os.path.join(directory, f"{root}.*{ext}")))
+    live = os.path.join(directory, LEDGER_FILE)
+    return rolled + ([live] if os.path.exists(live) else [])
+
+
+def read_ledger(paths: Iterable[str], since: Optional[float] = None, until: Optional[float] = None,
+                errors: Optional[Counter] = None) -> Iterator[Dict[str, object]]:
+    """Streams records from ledger files one line at a time, so file size does not matter.
+
+    Lines that are not ledger records (e.g. partial writes) are skipped and counted in `errors`.
+    Records written by RotatingLedgerHandler start with their timestamp, which lets the time
+    filter reject most lines before they are JSON-decoded.
+    """
+    decode = json.JSONDecoder().raw_decode
+    prefix = '{"ts":'
+    filtered = since is not None or until is not None
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if filtered and line.startswith(prefix):
+                    try:
+                        ts = float(line[len(prefix):line.index(",")])
+                    except ValueError:
+                        ts = None
+                    if ts is not None and ((since is not None and ts < since) or (until is not None and ts >= until)):
+                        continue
+                try:
+                    record = decode(line)[0]
+                    ts = float(record["ts"])
+                except (ValueError, KeyError, TypeError):
+                    if errors is not None and line.strip():
+                        errors["skipped"] += 1
+                    continue
+                if filtered and ((since is not None and ts < since) or (until is not None and ts >= until)):
+                    continue
+                yield record
+
+
+COST_AGGREGATOR = CostAggregator()
@@ -0,0 +1,94 @@
+"""
+Summarize LLM spend from the cost ledger.
+
+Streams the live ledger and its rolled-over files (or the files given) record by record, so
+multi-GB ledgers are summarized in constant memory.
+
+    python -m logger.cost_query [FILES...] [--dir logs] [--since 2025-08-24] [--until ...]
+                                [--window 3600] [--tool calc] [--json]
+"""
+import argparse
+import json
+import sys
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+
+from .cost_ledger import CostAggregator, ledger_files, read_ledger
+from .pipeline import LOG_DIR
+
+
+def parse_time(value: str) -> float:
+    """Accepts epoch seconds or an ISO date/datetime (local time)."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def summarize(paths: List[str], since: Optional[float] = None, until: Optional[float] = None,
+              window: float = 3600.0, tool: Optional[str] = None) -> dict:
+    # Records are grouped by (tools, tokens, window) first: far fewer distinct groups than lines.
+    groups = {}
+    errors = Counter()
+    for record in read_ledger(paths, since, until, errors):
+        tools = record["tools"]
+        if tool is not None and tool not in tools:
+            continue
+        key = (tuple(tools), record["total_tokens"], record["ts"] // window)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [1, record["cost"]]
+        else:
+            group[0] += 1
+            group[1] += record["cost"]
+    aggregator = CostAggregator(window=window, max_windows=None)
+    for (tools, tokens, slot), (count, cost) in sorted(groups.items(), key=lambda item: item[0][2]):
+        aggregator.add_group(tools, tokens, slot * window, count, cost)
+    summary = aggregator.summary()
+    summary["files"] = len(paths)
+    summary["skipped_lines"] = errors["skipped"]
+    return summary
+
+
+def print_summary(summary: dict) -> None:
+    total = summary["total"]
+    print(f"{summary['files']} file(s), {total['prompts']} prompts, {total['tokens']} tokens, ${total['cost']:.6f}"
+          + (f" ({summary['skipped_lines']} unreadable lines skipped)" if summary["skipped_lines"] else ""))
+    if summary["tools"]:
+        print(f"\n{'tool':<12} {'prompts':>9} {'tokens':>12} {'cost':>12} {'p50':>6} {'p90':>6} {'p99':>6}")
+        for name, row in sorted(summary["tools"].items(), key=lambda item: -item[1]["cost"]):
+            p = row["tokens_p"]
+            print(f"{name:<12} {row['prompts']:>9} {row['tokens']:>12} {row['cost']:>12.6f} "
+                  f"{p['p50']:>6} {p['p90']:>6} {p['p99']:>6}")
+    if summary["windows"]:
+        print(f"\n{'window start':<20} {'prompts':>9} {'tokens':>12} {'cost':>12}")
+        for row in summary["windows"]:
+            start = datetime.fromtimestamp(row["start"]).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{start:<20} {row['prompts']:>9} {row['tokens']:>12} {row['cost']:>12.6f}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m logger.cost_query", description="Summarize the LLM cost ledger.")
+    parser.add_argument("files", nargs="*", help="ledger files (default: every ledger file in --dir)")
+    parser.add_argument("--dir", default=LOG_DIR, help="directory holding the ledger")
+    parser.add_argument("--since", type=parse_time, help="epoch seconds or ISO date/time, inclusive")
+    parser.add_argument("--until", type=parse_time, help="epoch seconds or ISO date/time, exclusive")
+    parser.add_argument("--window", type=float, default=3600.0, help="window size in seconds (default 3600)")
+    parser.add_argument("--tool", help="only count prompts that planned this tool")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    opts = parser.parse_args(argv)
+
+    paths = opts.files or ledger_files(opts.dir)
+    if not paths:
+        print(f"No ledger files found in {opts.dir}", file=sys.stderr)
+        sys.exit(1)
+    summary = summarize(paths, opts.since, opts.until, opts.window, opts.tool)
+    if opts.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
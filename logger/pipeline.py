@@ -0,0 +1,245 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional, Type, Union
+
+LOG_DIR = os.environ.get("AGENT_LOG_DIR") or os.path.join(os.path.dirname(__file__), '..', 'logs')
+# queue: records go through a QueueHandler to one background writer (default).
+# sync:  every record is written and flushed on the calling thread.
+# off:   loggers are silenced and no handlers are attached.
+LOG_MODE = os.environ.get("AGENT_LOG_MODE", "queue").strip().lower()
+# The writer sleeps this long after waking so records accumulate into one write and flush.
+FLUSH_INTERVAL = float(os.environ.get("AGENT_LOG_FLUSH_MS", "20")) / 1000
+
+
+def _parse_level(name: str) -> int:
+    level = logging.getLevelName(name.strip().upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+LOG_LEVEL = logging.CRITICAL + 1 if LOG_MODE == "off" else _parse_level(os.environ.get("AGENT_LOG_LEVEL", "INFO"))
+
+
+def lean_records() -> None:
+    """Leaves the thread and process fields out of every log record in this process.
+
+    The agent's log formats only use time, level and message, and skipping these fields (the
+    optimization the logging docs recommend) cuts the cost of a record by about a third. The
+    flags are process-wide, so only the agent's own entry points (main.py, agent.server) call
+    this; importing the agent into another application leaves its log records untouched.
+    """
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders the date and time part of %(asctime)s once per second."""
+
+    def __init__(self, fmt: str):
+        super().__init__(fmt)
+        self._second = None
+        self._prefix = ""
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        second = int(record.created)
+        if second != self._second:
+            self._prefix = time.strftime(self.default_time_format, self.converter(record.created))
+            self._second = second
+        return self.default_msec_format % (self._prefix, record.msecs)
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler whose emit leaves flushing to the caller, so a batch costs one flush.
+
+    With autoflush it behaves like a plain FileHandler and flushes after every record.
+    """
+
+    def __init__(self, path: str, autoflush: bool = False):
+        super().__init__(path, delay=True)
+        self.autoflush = autoflush
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            if self.autoflush:
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+
+class RecordQueueHandler(logging.Handler):
+    """Like logging.handlers.QueueHandler, but renders the message in place instead of copying the record.
+
+    The message is still rendered on the calling thread so that later mutation of the arguments
+    cannot change what is logged; timestamps and the line layout are formatted by the writer.
+    (Not a QueueHandler subclass: logging.handlers alone costs more to import than the agent's first answer.)
+    """
+
+    def __init__(self, queue: "queue.SimpleQueue"):
+        super().__init__()
+        self.queue = queue
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class BatchWriter:
+    """Background thread draining the log queue and routing records to file handlers by logger name."""
+
+    _STOP = object()
+
+    def __init__(self, interval: float = FLUSH_INTERVAL):
+        self.queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.interval = interval
+        self.handlers: Dict[str, logging.Handler] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def route(self, name: str, handler: logging.Handler) -> None:
+        self.handlers[name] = handler
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        q = self.queue
+        while True:
+            batch = [q.get()]
+            if self.interval > 0:
+                time.sleep(self.interval)
+            while True:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            waiters = []
+            touched = set()
+            for record in batch:
+                if record is self._STOP:
+                    stop = True
+                elif isinstance(record, threading.Event):
+                    waiters.append(record)
+                else:
+                    handler = self.handlers.get(record.name)
+                    if handler is not None:
+                        handler.handle(record)
+                        touched.add(handler)
+            for handler in touched:
+                handler.flush()
+            for event in waiters:
+                event.set()
+            if stop:
+                return
+
+    def flush(self) -> None:
+        """Blocks until every record queued so far is written."""
+        if self._thread is not None and self._thread.is_alive():
+            done = threading.Event()
+            self.queue.put(done)
+            done.wait()
+
+    def after_fork_in_child(self) -> None:
+        """Restarts the writer in a forked child, where only the forking thread survives.
+
+        Records still queued or buffered at fork time are inherited by both processes, so
+        forking code should `flush_logs()` first.
+        """
+        if self._thread is not None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.put(self._STOP)
+            self._thread.join()
+        for handler in self.handlers.values():
+            handler.close()
+
+
+WRITER = BatchWriter()
+_configured = set()
+_lock = threading.Lock()
+
+
+class _DeferredHandler(logging.Handler):
+    """Stands in for a logger's handler until its first record, so that importing a module that
+    creates a logger makes no log directory, opens no file and starts no writer thread."""
+
+    def __init__(self, setup: Callable[[], logging.Handler]):
+        super().__init__()
+        self.setup = setup
+        self.target: Optional[logging.Handler] = None
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        target = self.target
+        if target is None:
+            with _lock:
+                if self.target is None:
+                    self.target = self.setup()
+            target = self.target
+        return target.handle(record)
+
+
+def _attach(logger: logging.Logger, name: str, filename: str, formatter: Union[str, logging.Formatter],
+            handler_class: Type[BufferedFileHandler]) -> logging.Handler:
+    """Creates the logger's file handler (behind the writer queue unless in sync mode) and installs it."""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    path = os.path.join(LOG_DIR, filename)
+    handler = handler_class(path, autoflush=LOG_MODE == "sync")
+    handler.setFormatter(CachedTimeFormatter(formatter) if isinstance(formatter, str) else formatter)
+    if LOG_MODE == "sync":
+        front: logging.Handler = handler
+    else:
+        WRITER.route(name, handler)
+        front = RecordQueueHandler(WRITER.queue)
+    # One list assignment, so a thread logging meanwhile sees either the placeholder or the handler.
+    logger.handlers = [h for h in logger.handlers if not isinstance(h, _DeferredHandler)] + [front]
+    return front
+
+
+def get_logger(name: str, filename: str, formatter: Union[str, logging.Formatter],
+               handler_class: Type[BufferedFileHandler] = BufferedFileHandler) -> logging.Logger:
+    """Returns the named logger, attaching its file handler the first time it is requested in this process.
+
+    `formatter` is a format string or a ready Formatter; `handler_class` lets a logger write
+    through a subclass such as the rotating cost ledger handler. The handler, the log directory
+    and the writer thread are only created when the logger emits its first record.
+    """
+    logger = logging.getLogger(name)
+    if name in _configured:
+        return logger
+    with _lock:
+        if name in _configured:
+            return logger
+        logger.setLevel(LOG_LEVEL)
+        if LOG_MODE != "off" and not logger.handlers:
+            logger.addHandler(_DeferredHandler(lambda: _attach(logger, name, filename, formatter, handler_class)))
+        _configured.add(name)
+    return logger
+
+
+def flush_logs() -> None:
+    """Waits for the background writer to drain; a no-op in sync and off modes."""
+    WRITER.flush()
+
+
+atexit.register(WRITER.stop)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=WRITER.after_fork_in_child)
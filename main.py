@@ -1,13 +1,137 @@
+import json
+import os
 import sys
-from agent.agent import answer
+from collections import deque
+from typing import Any, Optional, Tuple
+
+# The agent is imported lazily: a question answered by a running server (agent.server)
+# only needs the thin client.
+
+def read_questions(path: str):
+    """Yields questions from a JSONL file: one JSON string or {"question": ...} object per line."""
+    with (sys.stdin if path == "-" else open(path, "r", encoding="utf-8")) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            yield item.get("question") if isinstance(item, dict) else item
+
+def ask_server(q: str) -> Tuple[bool, Any]:
+    """(True, answer) from the server on AGENT_SOCKET, else (False, None).
+
+    Only with AGENT_SERVER=1. Any failure (no server, another user's socket, no answer within
+    AGENT_SERVER_TIMEOUT seconds, an overloaded or failing server) falls back to answering
+    in-process."""
+    if os.environ.get("AGENT_SERVER", "0") != "1":
+        return False, None
+    from agent.client import DEFAULT_SOCKET, ServerError, ask
+    if not os.path.exists(DEFAULT_SOCKET):
+        return False, None
+    try:
+        return True, ask(q, DEFAULT_SOCKET, timeout=float(os.environ.get("AGENT_SERVER_TIMEOUT", "5")))
+    except (ServerError, OSError, ValueError):  # socket.timeout is an OSError
+        return False, None
+
+def answer_question(q: str) -> Any:
+    served, out = ask_server(q)
+    if served:
+        return out
+    from logger.pipeline import lean_records
+    lean_records()
+    from agent.agent import answer
+    return answer(q)
+
+def run_batch(path: str, chunk_size: Optional[int]) -> None:
+    """Answers a JSONL file in input order. A line whose question is not a string gets an error line."""
+    from agent.agent import DEFAULT_CHUNK_SIZE, answer_many
+    questions = read_questions(path)
+    pending = deque()  # (question, accepted) in input order
+
+    def accepted():
+        for q in questions:
+            ok = isinstance(q, str)
+            pending.append((q, ok))
+            if ok:
+                yield q
+
+    def reject_pending():
+        while pending and not pending[0][1]:
+            q = pending.popleft()[0]
+            print(json.dumps({"question": q, "error": "question must be a string"}, default=str))
+
+    for out in answer_many(accepted(), chunk_size=DEFAULT_CHUNK_SIZE if chunk_size is None else chunk_size):
+        reject_pending()
+        q = pending.popleft()[0]
+        print(json.dumps({"question": q, "answer": out}, default=str))
+    reject_pending()
+
+def print_profile(out=sys.stderr) -> None:
+    """Per-stage latency table from the tracing histograms, as a share of total `answer` time."""
+    from agent.tracing import breakdown
+    rows = breakdown("answer")
+    if not rows:
+        print("No spans recorded.", file=out)
+        return
+    width = max(len(row["name"]) for row in rows)
+    print(f"{'stage':<{width}} {'count':>7} {'total ms':>10} {'mean us':>9} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'share':>7}", file=out)
+    for row in rows:
+        print(f"{row['name']:<{width}} {row['count']:>7} {row['total_us'] / 1e3:>10.2f} {row['mean_us']:>9.1f} "
+              f"{row['p50_us']:>9.1f} {row['p95_us']:>9.1f} {row['p99_us']:>9.1f} {row['share']:>7.1%}", file=out)
 
 def main():
-    if len(sys.argv) < 2:
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("--"):
+        # Plain question: keep it verbatim, even if it contains things like "-5".
+        print(answer_question(" ".join(sys.argv[1:])))
+        return
+
+    import argparse
+
+    def chunk_size(text: str) -> int:
+        value = int(text)
+        if value < 1:
+            raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+        return value
+
+    parser = argparse.ArgumentParser(usage="python main.py \"your question here\" | [--profile] [--batch FILE.jsonl | [--stream | --page N] \"question\"]")
+    parser.add_argument("question", nargs="*", help="question to answer")
+    parser.add_argument("--batch", metavar="FILE.jsonl", help="answer every question in a JSONL file ('-' for stdin)")
+    parser.add_argument("--chunk-size", type=chunk_size, help="questions planned together, sharing identical calls (default 1000)")
+    parser.add_argument("--stream", action="store_true", help="print list answers (job search) one JSON line per item as found")
+    parser.add_argument("--page", type=int, help="print only this page (1-based) of a list answer; implies --stream")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--profile", action="store_true", help="print a per-stage latency breakdown to stderr")
+    parser.add_argument("--trace-chrome", metavar="FILE.json", help="write the spans as a Chrome trace")
+    parser.add_argument("--trace-otel", metavar="FILE.jsonl", help="append the spans as OTLP/JSON")
+    opts = parser.parse_args()
+
+    from logger.pipeline import lean_records
+    lean_records()
+    from agent.tracing import TRACER
+    if opts.profile or opts.trace_chrome or opts.trace_otel:
+        TRACER.enable(keep_spans=bool(opts.trace_chrome or opts.trace_otel))
+    if opts.batch:
+        run_batch(opts.batch, opts.chunk_size)
+    elif opts.question and (opts.stream or opts.page):
+        offset, limit = ((opts.page - 1) * opts.page_size, opts.page_size) if opts.page else (0, None)
+        from agent.agent import answer_stream
+        for item in answer_stream(" ".join(opts.question), offset=offset, limit=limit):
+            print(json.dumps(item, default=str), flush=True)
+    elif opts.question and not (opts.profile or opts.trace_chrome or opts.trace_otel):
+        print(answer_question(" ".join(opts.question)))
+    elif opts.question:
+        from agent.agent import answer
+        print(answer(" ".join(opts.question)))
+    else:
         print("Usage: python main.py \"your question here\"")
         sys.exit(1)
-    q = " ".join(sys.argv[1:])
-    out = answer(q)
-    print(out)
+
+    if opts.profile:
+        print_profile()
+    if opts.trace_chrome:
+        TRACER.export_chrome(opts.trace_chrome)
+    if opts.trace_otel:
+        TRACER.export_otel(opts.trace_otel)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,70 @@
+import ast
+import asyncio
+import dataclasses
+import os
+import pytest
+from agent import registry
+from agent.agent import answer
+from agent.async_agent import Limiter, Overloaded, answer_async
+
+QUESTIONS = [
+    "add 10 to the average temperature in paris and london right now",
+    "Who is Ada Lovelace?",
+    "Find software engineer jobs in Dhaka",
+    "What is 5 times 5 and find software engineer jobs in Dhaka?",
+    "who was the father of artificial intelligence.",
+    "Unknown query",
+    None,
+]
+
+def test_answer_async_matches_answer():
+    async def run():
+        return await asyncio.gather(*(answer_async(q) for q in QUESTIONS))
+    assert asyncio.run(run()) == [answer(q) for q in QUESTIONS]
+
+def smoke_prompts():
+    """Every prompt `tests/test_smoke.py` passes to `answer`."""
+    with open(os.path.join(os.path.dirname(__file__), "test_smoke.py")) as f:
+        tree = ast.parse(f.read())
+    return [node.args[0].value for node in ast.walk(tree)
+            if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "answer"
+            and node.args and isinstance(node.args[0], ast.Constant)]
+
+def test_answer_async_matches_answer_on_the_smoke_corpus():
+    prompts = smoke_prompts()
+    assert len(prompts) > 20
+
+    async def run():
+        return [await answer_async(q) for q in prompts]
+    assert asyncio.run(run()) == [answer(q) for q in prompts]
+
+def test_answer_async_times_out():
+    async def stuck(city, keyword, context):
+        await asyncio.sleep(10)
+    weather = registry.get_tool("weather")
+    registry.register(dataclasses.replace(weather, async_runner=stuck))
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(answer_async("weather in london", timeout=0.05))
+    finally:
+        registry.register(weather)
+
+def test_limiter_sheds_load_when_queue_is_full():
+    async def run():
+        limiter = Limiter(concurrency=1, max_pending=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter:
+                await release.wait()
+
+        first = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        second = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            async with limiter:
+                pass
+        release.set()
+        await asyncio.gather(first, second)
+    asyncio.run(run())
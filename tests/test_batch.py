@@ -0,0 +1,67 @@
+import json
+import subprocess
+import sys
+import pytest
+import agent.agent as agent_module
+from agent.agent import NO_ANSWER, answer, answer_many, normalize_prompt
+
+QUESTIONS = [
+    "What is 1 + 1?",
+    "what is  1 + 1",
+    "add 10 to the average temperature in paris and london right now",
+    "What's the temperature in London?",
+    "Who is Ada Lovelace?",
+    "Find software engineer jobs in Dhaka",
+    None,
+    "",
+    "Unknown query",
+    "What's the weather in London?",
+]
+
+def test_answer_many_matches_answer_in_order():
+    assert list(answer_many(QUESTIONS, chunk_size=3)) == [answer(q) for q in QUESTIONS]
+
+def test_answer_many_runs_identical_calls_once(monkeypatch):
+    monkeypatch.setattr(agent_module, "MEMO_ENABLED", False)
+    questions = ["temperature in london", " Temperature in London", "london temperature", "temp in london",
+                 "add 10 to the average temperature in paris and london right now"]
+    expected = [answer(q) for q in questions]
+    calls = []
+    run_tool = agent_module.run_tool
+    monkeypatch.setattr(agent_module, "run_tool", lambda t, c: calls.append(t["args"]) or run_tool(t, c))
+    assert list(answer_many(questions)) == expected
+    # Four distinct questions plan five london calls with two distinct (city, keyword) args.
+    london = [args for args in calls if args.get("city") == "london"]
+    assert london == [{"city": "london", "keyword": "temperature"}, {"city": "london", "keyword": "temp"}]
+
+def test_answer_many_runs_plans_through_the_executor(monkeypatch):
+    plans = []
+    execute_plan = agent_module.execute_plan
+    monkeypatch.setattr(agent_module, "execute_plan",
+                        lambda tasks, *rest, **kw: plans.append(len(tasks)) or execute_plan(tasks, *rest, **kw))
+    list(answer_many(["add 10 to the average temperature in paris and london right now", "What is 1 + 1?", " what is 1 + 1? "]))
+    assert plans == [3, 1]
+
+def test_answer_many_answers_unhashable_questions():
+    assert list(answer_many([["x"], {"q": 1}, "What is 1 + 1?"])) == [NO_ANSWER, NO_ANSWER, 2.0]
+
+def test_normalize_prompt():
+    assert normalize_prompt("  What is\t1 + 1 ?! ") == "what is\t1 + 1 ?!"
+    assert normalize_prompt(None) is None
+
+def test_answer_many_rejects_bad_chunk_size():
+    with pytest.raises(ValueError):
+        list(answer_many(["x"], chunk_size=0))
+
+def test_batch_cli_rejects_bad_lines_and_chunk_sizes(tmp_path):
+    path = tmp_path / "q.jsonl"
+    path.write_text('"What is 1 + 1?"\n{"question": ["x"]}\n{"question": "temp in london"}\n', encoding="utf-8")
+    run = lambda *extra: subprocess.run([sys.executable, "main.py", "--batch", str(path), *extra],
+                                        capture_output=True, text=True)
+    out = run()
+    assert [json.loads(line) for line in out.stdout.splitlines()] == [
+        {"question": "What is 1 + 1?", "answer": 2.0},
+        {"question": ["x"], "error": "question must be a string"},
+        {"question": "temp in london", "answer": 17.0},
+    ]
+    assert run("--chunk-size", "0").returncode == 2
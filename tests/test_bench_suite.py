@@ -0,0 +1,35 @@
+from agent.job_store import get_job_store
+from agent.kb_store import get_kb_store
+from agent.llm import call_llm
+from benchmarks.suite import compare
+from benchmarks.workload import generate_prompts, kb_name, write_fixtures
+
+EXPECTED_TOOL = {"calc": "calc", "weather": "weather", "kb": "kb", "job": "job_search"}
+
+
+def test_each_prompt_category_reaches_its_tool():
+    for kind, tool in EXPECTED_TOOL.items():
+        for prompt in generate_prompts(30, {kind: 1}, seed=5):
+            assert tool in [call["tool"] for call in call_llm(prompt)], prompt
+    for prompt in generate_prompts(30, {"multi": 1}, seed=5):
+        assert len(call_llm(prompt)) >= 2, prompt
+
+
+def test_prompts_are_reproducible():
+    assert generate_prompts(50, seed=9) == generate_prompts(50, seed=9)
+
+
+def test_fixtures_load_through_the_stores(tmp_path):
+    paths = write_fixtures(500, str(tmp_path))
+    kb = get_kb_store(paths["kb"]).snapshot()
+    assert len(kb.names) == 500 and kb.names[450] == kb_name(450)
+    assert len(kb.names_lower) == len(set(kb.names_lower))
+    assert len(list(get_job_store(paths["jobs"]).snapshot().match({}))) == 500
+
+
+def test_compare_flags_only_regressions_past_the_threshold():
+    base = {"kb@10": {"p50_us": 10.0, "throughput": 1000.0, "peak_rss_mb": 20.0}}
+    same = {"kb@10": {"p50_us": 11.0, "throughput": 900.0, "peak_rss_mb": 21.0}}
+    assert compare(same, base, 0.25) == []
+    worse = {"kb@10": {"p50_us": 20.0, "throughput": 500.0, "peak_rss_mb": 20.0}, "new": {"p50_us": 1.0}}
+    assert [line.split(":")[0] for line in compare(worse, base, 0.25)] == ["kb@10 p50_us", "kb@10 throughput"]
@@ -0,0 +1,89 @@
+import math
+import random
+import re
+from constants import OP_MAP
+from agent.calc import apply_operation, compile_expr, normalize_expr, run, tokenize
+
+# The stack evaluator tools.evaluate used before expressions were parsed once and cached.
+
+def legacy_normalize(expr):
+    expr = expr.lower()
+    for k in sorted(OP_MAP.keys(), key=lambda x: -len(x)):
+        expr = re.sub(rf'\b{k}\b', OP_MAP[k], expr)
+    return re.sub(r'\band\b', '', expr)
+
+def legacy_evaluate(expr):
+    def precedence(op):
+        return 1 if op in ('+', '-', 'A') else 2 if op in ('*', '/', '%') else 0
+
+    def unary(values, ops):
+        if len(values) == 1 and ops and ops[-1] == '-':
+            values[-1] = -values[-1]
+            ops.pop()
+            return True
+        return False
+
+    def reduce(values, ops):
+        if len(values) < 2:
+            return unary(values, ops)
+        b = values.pop()
+        a = values.pop()
+        values.append(apply_operation(a, b, ops.pop()))
+        return True
+
+    values, ops = [], []
+    for token in re.findall(r'\d+\.?\d*|[+\-*/%A()]', expr.strip()):
+        if re.match(r'^\d+\.?\d*$', token):
+            values.append(float(token))
+        elif token == '(':
+            ops.append(token)
+        elif token == ')':
+            while ops and ops[-1] != '(':
+                if not reduce(values, ops):
+                    break
+            ops.pop()
+        else:
+            while ops and ops[-1] not in '(' and precedence(ops[-1]) >= precedence(token):
+                if not reduce(values, ops):
+                    break
+            ops.append(token)
+    while ops:
+        if not reduce(values, ops):
+            break
+    return values[-1] if values else 0.0
+
+def outcome(fn, expr):
+    try:
+        return fn(expr)
+    except Exception as e:
+        return type(e)
+
+def new_evaluate(expr):
+    return run(*compile_expr(expr))
+
+def same(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a):
+        return math.isnan(b)
+    return a == b
+
+def test_normalize_matches_per_key_substitution():
+    rng = random.Random(1)
+    words = list(OP_MAP) + ["and", "band", "of", "10", "what is", "averages", "(", ")", "plus5"]
+    for _ in range(1000):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 8)))
+        assert normalize_expr(text) == legacy_normalize(text), text
+
+def test_compiled_evaluation_matches_stack_evaluator():
+    rng = random.Random(2)
+    tokens = ["1", "2", "0", "12.5", "3.", "+", "-", "*", "/", "%", "A", "(", ")"]
+    for _ in range(5000):
+        expr = " ".join(rng.choice(tokens) for _ in range(rng.randint(0, 9)))
+        assert same(outcome(new_evaluate, expr), outcome(legacy_evaluate, expr)), expr
+
+def test_compiled_expressions_are_cached():
+    compile_expr.cache_clear()
+    for _ in range(3):
+        assert new_evaluate("2 + 3 * 4") == 14
+    info = compile_expr.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+    assert tokenize(" 10 % 50 ") == ["10", "%", "50"]
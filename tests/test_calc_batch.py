@@ -0,0 +1,26 @@
+import math
+import random
+from agent.calc import compile_expr, normalize, run
+from agent.calc_batch import evaluate_batch
+
+def scalar(expr):
+    try:
+        return run(*compile_expr(normalize(expr)))
+    except Exception as e:
+        return type(e)
+
+def test_evaluate_batch_matches_scalar_evaluation():
+    rng = random.Random(5)
+    tokens = ["1", "2", "0", "12.5", "7", "+", "-", "*", "/", "%", "A", "(", ")", "plus", "average of"]
+    exprs = [" ".join(rng.choice(tokens) for _ in range(rng.randint(0, 7))) for _ in range(3000)]
+    exprs += ["10 divided by 0", "-10 / 0", "0 / 0", "1e308 * 10", "what is 10 percent of 50?"]
+    for expr, got in zip(exprs, evaluate_batch(exprs)):
+        want = scalar(expr)
+        got = type(got) if isinstance(got, Exception) else got
+        assert got == want or (math.isnan(got) and math.isnan(want)), expr
+
+def test_evaluate_batch_keeps_bad_rows_local():
+    out = evaluate_batch(["2 + 2", "2 )", None, "average of 4 and 6"])
+    assert out[0] == 4 and out[3] == 5
+    assert isinstance(out[1], IndexError)
+    assert isinstance(out[2], AttributeError)
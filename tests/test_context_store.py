@@ -0,0 +1,79 @@
+import random
+from agent.context_store import ContextStore
+from agent.tools import evaluate, replace_context
+
+def legacy_replace(expr, context):
+    for key, value in context.items():
+        expr = expr.replace(key, str(value))
+    return expr
+
+def test_matches_legacy_replace_when_no_key_overlaps_another():
+    rng = random.Random(7)
+    words = ["paris", "london", "dhaka", "tokyo", "2 + 3", "A(1,2)", "x"]
+    for _ in range(300):
+        keys = rng.sample(words, rng.randint(1, len(words)))
+        context = {k: rng.randint(0, 99) for k in keys}
+        expr = " plus ".join(rng.choice(words + ["7", "and"]) for _ in range(rng.randint(1, 8)))
+        store = ContextStore(context)
+        overlap = any(a != b and a in b for a in keys for b in keys) or any(str(v) in expr for v in context.values())
+        if not overlap:
+            assert store.substitute(expr) == legacy_replace(expr, context)
+        assert replace_context(expr, context) == store.substitute(expr)
+
+def test_longest_key_wins_regardless_of_write_order():
+    for order in (["new york", "york"], ["york", "new york"]):
+        store = ContextStore()
+        for key in order:
+            store[key] = {"york": 1, "new york": 2}[key]
+        assert store.substitute("new york and york") == "2 and 1"
+
+def test_values_are_not_rescanned():
+    store = ContextStore({"paris": 18, "18": 99})
+    assert store.substitute("paris plus 18") == "18 plus 99"
+
+def test_delete_and_overwrite_update_the_matcher():
+    store = ContextStore({"ab": 1, "abc": 2, "b": 3})
+    del store["abc"]
+    assert store.substitute("abc") == "1c"
+    store["ab"] = "x"
+    assert store.substitute("abc b") == "xc 3"
+    del store["ab"]
+    assert store.substitute("abc") == "a3c"
+    assert store._root.keys() == {"b"}
+
+def test_size_bound_drops_least_recently_written_keys():
+    store = ContextStore(max_keys=3)
+    for i, key in enumerate(["a", "b", "c"]):
+        store[key] = i
+    store["a"] = 10  # rewriting refreshes the key
+    store["d"] = 3
+    assert list(store) == ["c", "a", "d"] and store.evictions == 1
+    assert store.substitute("a b c d") == "10 b 2 3"
+
+def test_copies_are_isolated():
+    store = ContextStore({"paris": 18})
+    scratch = store.copy()
+    scratch["london"] = 17
+    del scratch["paris"]
+    assert store.substitute("paris london") == "18 london"
+    assert scratch.substitute("paris london") == "paris 17"
+    store["dhaka"] = 30
+    assert "dhaka" not in scratch and scratch.substitute("dhaka") == "dhaka"
+
+def test_evaluate_reads_and_writes_the_store():
+    store = ContextStore({"paris": 18, "london": 17})
+    assert evaluate("average of paris and london", store) == 17.5
+    written = [k for k, v in store.items() if v == 17.5]
+    assert len(written) == 1
+    assert store.substitute(written[0] + " plus 1") == "17.5 plus 1"
+
+def test_long_keys_are_stored_but_not_indexed():
+    long_expr = "1 + " * 2000 + "1"
+    store = ContextStore({long_expr: 2001, "paris": 18})
+    assert store[long_expr] == 2001 and store._root.keys() == {"p"}
+    assert store.substitute(long_expr + " plus paris") == long_expr + " plus 18"
+    del store[long_expr]
+    deep = ContextStore({"x" * 5000: 1}, max_key_length=10_000)  # deeper than the recursion limit
+    scratch = deep.copy()
+    scratch["y"] = 2
+    assert scratch.substitute("x" * 5000 + "y") == "12" and deep.substitute("y") == "y"
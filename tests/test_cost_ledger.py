@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+from logger.cost_ledger import (CostAggregator, LEDGER_FILE, LedgerFormatter, RotatingLedgerHandler,
+                                ledger_files, make_record, read_ledger)
+from logger.cost_query import summarize
+
+
+def emit(handler, record, created):
+    log_record = logging.LogRecord("llm_cost_logger", logging.INFO, "", 0, "ledger", None, None)
+    log_record.created = created
+    log_record.ledger = record
+    handler.handle(log_record)
+
+
+def make_handler(tmp_path, **kwargs):
+    handler = RotatingLedgerHandler(str(tmp_path / LEDGER_FILE), autoflush=True, **kwargs)
+    handler.setFormatter(LedgerFormatter())
+    return handler
+
+
+def test_record_fields():
+    record = make_record("What is 2 plus 2?", 4, 3, ["calc"], ts=100.0)
+    assert record["total_tokens"] == 812 + 4 + 3
+    assert record["cost"] == 819 / 1_000_000
+    assert record["tools"] == ["calc"] and len(record["prompt_hash"]) == 16
+    assert "What" not in json.dumps(record)
+
+
+def test_ledger_rotates_by_size_and_age(tmp_path):
+    handler = make_handler(tmp_path, max_bytes=600, max_age=3600)
+    for i in range(10):
+        emit(handler, make_record(f"q{i}", 3, 0, ["kb"], ts=1000.0 + i), 1000.0 + i)
+    emit(handler, make_record("late", 3, 0, ["kb"], ts=9000.0), 9000.0)
+    handler.close()
+    files = ledger_files(str(tmp_path))
+    assert len(files) >= 3 and files[-1].endswith(LEDGER_FILE)
+    assert all(os.path.getsize(path) <= 600 for path in files)
+    records = list(read_ledger(files))
+    assert [r["ts"] for r in records] == [1000.0 + i for i in range(10)] + [9000.0]
+    assert [r["ts"] for r in read_ledger([files[-1]])] == [9000.0]
+
+
+def test_reopened_ledger_keeps_its_age(tmp_path):
+    handler = make_handler(tmp_path, max_age=60)
+    emit(handler, make_record("a", 3, 0, [], ts=1000.0), 1000.0)
+    handler.close()
+    handler = make_handler(tmp_path, max_age=60)
+    emit(handler, make_record("b", 3, 0, [], ts=1100.0), 1100.0)
+    handler.close()
+    assert len(ledger_files(str(tmp_path))) == 2
+
+
+def test_aggregator_totals_percentiles_and_windows():
+    agg = CostAggregator(window=60)
+    for i, tools in enumerate([["calc"], ["weather", "weather"], ["weather", "calc"], []]):
+        agg.add(make_record(str(i), 10 * (i + 1), 0, tools, ts=30.0 * i))
+    summary = agg.summary()
+    assert summary["total"]["prompts"] == 4
+    assert summary["tools"]["weather"]["prompts"] == 2
+    assert summary["tools"]["(none)"]["tokens"] == 852
+    assert summary["total"]["tokens_p"] == {"p50": 832, "p90": 852, "p99": 852}
+    assert [w["prompts"] for w in summary["windows"]] == [2, 2]
+
+
+def test_query_skips_bad_lines_and_filters(tmp_path):
+    path = tmp_path / LEDGER_FILE
+    lines = [json.dumps(make_record(str(i), 5, 0, ["kb" if i % 2 else "calc"], ts=float(i * 100))) for i in range(10)]
+    path.write_text("\n".join(lines[:5] + ['{"ts":300.0,"trunc'] + lines[5:]) + "\n")
+    summary = summarize([str(path)], since=200, until=700, window=3600, tool="kb")
+    assert summary["total"]["prompts"] == 2 and summary["skipped_lines"] == 1
+    assert summary["tools"].keys() == {"kb"}
+
+
+def test_call_llm_feeds_the_aggregator():
+    from agent.llm import call_llm
+    from agent.plan_cache import PLAN_CACHE
+    from logger.cost_ledger import COST_AGGREGATOR
+    PLAN_CACHE.clear()
+    before = COST_AGGREGATOR.summary()["tools"].get("calc", {}).get("prompts", 0)
+    call_llm("what is 17 plus 25?")
+    assert COST_AGGREGATOR.summary()["tools"]["calc"]["prompts"] == before + 1
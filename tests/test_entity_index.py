@@ -0,0 +1,95 @@
+import random
+import string
+import pytest
+from agent import entity_index, llm
+from agent.entity_index import EntityIndex, edit_distance, max_distance
+from agent.kb_store import KBSnapshot
+from agent.llm import _fuzzy_kb_call, call_llm
+from agent.plan_cache import PLAN_CACHE
+from agent.router import scan
+
+@pytest.fixture
+def fuzzy(monkeypatch):
+    monkeypatch.setattr(entity_index, "FUZZY_ENABLED", True)
+    monkeypatch.setattr(llm, "FUZZY_ENABLED", True)
+    PLAN_CACHE.clear()
+    yield
+    PLAN_CACHE.clear()
+
+def reference_distance(a, b):
+    d = [[max(i, j) if i == 0 or j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+def typo(rng, word):
+    i = rng.randrange(len(word))
+    kind = rng.choice("dist")
+    if kind == "d":
+        return word[:i] + word[i + 1:]
+    if kind == "i":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    if kind == "s":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    return word[:i] + word[i + 1:i + 2] + word[i] + word[i + 2:] if i < len(word) - 1 else word
+
+def test_edit_distance_matches_reference_within_limit():
+    rng = random.Random(5)
+    for _ in range(2000):
+        a = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 8)))
+        b = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 8)))
+        limit = rng.randint(0, 3)
+        assert edit_distance(a, b, limit) == min(reference_distance(a, b), limit + 1), (a, b, limit)
+
+def test_lookup_matches_a_linear_scan():
+    rng = random.Random(11)
+    vocab = sorted({"".join(rng.choice("abcdef") for _ in range(rng.randint(3, 14))) for _ in range(300)})
+    index = EntityIndex({"t": vocab})
+    for _ in range(120):
+        query = typo(rng, typo(rng, rng.choice(vocab)))
+        expected = sorted((d, "t", rank, term) for rank, term in enumerate(vocab) if abs(len(term) - len(query)) <= 2
+                          for d in [reference_distance(query, term)] if d <= max_distance(len(term)))
+        if len(query) < 4 or query in vocab:  # exact hits skip the fuzzy search
+            expected = [m for m in expected if m[0] == 0]
+        assert index.lookup(query) == expected, query
+
+def test_resolve_prefers_closer_and_longer_spans_and_uses_each_once():
+    index = EntityIndex({"city": ["paris", "london"], "location": ["new york", "york", "london"]})
+    assert index.resolve("londn or parsi", ["city"]) == {"city": ["paris", "london"]}
+    assert index.resolve("jobs in new yrok", ["location"]) == {"location": ["new york"]}
+    assert index.resolve("londn", ["city", "location"]) == {"city": ["london"]}
+    assert index.resolve("weather in berlin", ["city"]) == {}
+    assert index.resolve("londn or parsi", ["city"], known={"londn"}) == {"city": ["paris"]}
+
+def test_misspelled_slots_are_filled_only_for_triggered_tools(fuzzy):
+    assert call_llm("londn weather") == [{"tool": "weather", "args": {"city": "london", "keyword": "weather"}}]
+    assert call_llm("sofware engineer jobs at gogle in californa") == [
+        {"tool": "job_search", "args": {"role": "software engineer", "company": "google", "location": "california"}}]
+    assert call_llm("londn") == []  # no weather keyword: nothing to fill
+    assert call_llm("weather in berlin") == [{"tool": "weather", "args": {"city": "paris", "keyword": "weather"}}]
+
+def test_job_slots_resolve_to_values_of_the_loaded_jobs(fuzzy):
+    # data/jobs.json spells the company "Optimizly": the exact data value is kept, not "corrected".
+    assert call_llm("Find jobs at optimizly") == [{"tool": "job_search", "args": {"company": "optimizly"}}]
+    assert call_llm("Find jobs at optimizely") == [{"tool": "job_search", "args": {"company": "optimizely"}}]
+    assert call_llm("find jobs at delivery hreo") == [{"tool": "job_search", "args": {"company": "delivery hero"}}]
+    # "remove" is one edit from the "remote" location, but an ordinary word is never corrected.
+    assert call_llm("Find developer jobs so I can remove bugs") == [
+        {"tool": "job_search", "args": {"role": "developer"}}]
+
+def test_fuzzy_resolution_is_opt_in():
+    PLAN_CACHE.clear()
+    assert not entity_index.FUZZY_ENABLED
+    assert call_llm("londn weather") == [{"tool": "weather", "args": {"city": "paris", "keyword": "weather"}}]
+    assert call_llm("Find developer jobs so I can remove bugs") == [
+        {"tool": "job_search", "args": {"role": "developer"}}]
+
+def test_misspelled_kb_names_resolve_unless_another_tool_claims_the_prompt(fuzzy):
+    kb = KBSnapshot([{"name": "Grace Hopper", "summary": "Compiler pioneer."}], (0, 0))
+    prompt = "tell me about grace hoper"
+    assert _fuzzy_kb_call(kb, prompt, scan(prompt)) == {"tool": "kb", "args": {"q": "Grace Hopper"}}
+    prompt = "grace hoper jobs"
+    assert _fuzzy_kb_call(kb, prompt, scan(prompt)) is None
@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+import pytest
+from agent import executor
+from agent.agent import run_tool
+from agent.executor import execute_plan, plan_levels
+from agent.llm import call_llm
+
+PROMPTS = [
+    "add 10 to the average temperature in paris and london right now",
+    "The average temperature in Paris and London add the temperature in Dhaka?",
+    "What is 5 times 5 and find software engineer jobs in Dhaka?",
+    "What is 2 plus 2 and who is Ada Lovelace?",
+    "weather in paris, london, dhaka and amsterdam",
+]
+
+def sequential(tasks):
+    context = {}
+    return [run_tool(t, context) for t in tasks], context
+
+def test_parallel_execution_matches_sequential():
+    for prompt in PROMPTS:
+        tasks = call_llm(prompt)
+        results, context = sequential(tasks)
+        parallel_context = {}
+        assert execute_plan(tasks, parallel_context, run_tool) == results
+        assert list(parallel_context.items()) == list(context.items())
+
+def test_plan_levels_join_before_calc():
+    tasks = call_llm("add 10 to the average temperature in paris and london right now")
+    assert [t["tool"] for t in tasks] == ["weather", "weather", "calc"]
+    assert plan_levels(tasks) == [[0, 1], [2]]
+    tasks = call_llm("What is 5 times 5 and find software engineer jobs in Dhaka?")
+    assert plan_levels(tasks) == [[0, 1]]
+
+def test_independent_calls_run_concurrently():
+    started = threading.Barrier(3, timeout=2)
+
+    def slow(call, context):
+        started.wait()
+        context[call["args"]["city"]] = call["args"]["city"].upper()
+        return call["args"]["city"]
+
+    tasks = [{"tool": "weather", "args": {"city": c, "keyword": "temp"}} for c in ("paris", "london", "dhaka")]
+    context = {}
+    start = time.perf_counter()
+    assert execute_plan(tasks, context, slow) == ["paris", "london", "dhaka"]
+    assert time.perf_counter() - start < 2
+    assert list(context) == ["paris", "london", "dhaka"]
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_builds_its_own_pool():
+    executor._get_pool()
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if executor._pool is None else 1)
+    assert os.waitpid(pid, 0)[1] == 0
@@ -0,0 +1,35 @@
+import itertools
+import json
+from agent.job_store import FILTER_ATTRS, JobSnapshot
+from agent.tools import job_search
+
+JOBS = json.load(open("data/jobs.json", encoding="utf-8"))["jobs"] + [
+    {"company": "GOOGLE", "role": "Developer", "url": "x/1"},
+    {"role": "developer", "location": "Remote", "date_posted": "24H", "url": "x/2", "salary": 10},
+]
+
+def legacy_filter(jobs, filters):
+    return [
+        job for job in jobs
+        if all(value.lower() == job.get(attr, "").lower() for attr, value in filters.items())
+    ]
+
+def test_job_snapshot_matches_linear_filter():
+    snap = JobSnapshot(JOBS, (0, 0))
+    choices = {attr: {job.get(attr, "x") for job in JOBS} | {"missing"} for attr in FILTER_ATTRS}
+    for attrs in itertools.chain.from_iterable(itertools.combinations(FILTER_ATTRS, r) for r in range(3)):
+        for values in itertools.product(*(sorted(choices[a]) for a in attrs)):
+            filters = {a: v.upper() for a, v in zip(attrs, values)}
+            assert snap.search(filters) == legacy_filter(JOBS, filters), filters
+
+def test_job_snapshot_rebuilds_rows_exactly():
+    snap = JobSnapshot(JOBS, (0, 0))
+    rows = [snap.row(i) for i in range(snap.count)]
+    assert rows == JOBS
+    assert [list(r) for r in rows] == [list(j) for j in JOBS]
+
+def test_job_search_limit_and_offset():
+    everything = job_search({})
+    assert job_search({"limit": 3}) == everything[:3]
+    assert job_search({"offset": 2, "limit": 2}) == everything[2:4]
+    assert job_search({"date_posted": "last week"}) == [j for j in everything if j["date_posted"] == "1w"]
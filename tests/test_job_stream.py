@@ -0,0 +1,78 @@
+import io
+import json
+import itertools
+from agent import job_stream
+from agent.agent import answer, answer_stream
+from agent.job_store import JobStore
+from agent.job_stream import iter_json_array, iter_jobs, job_search_stream
+from agent.snapshot import compile_snapshot, snapshot_path
+from agent.tools import job_search
+
+DOC = {
+    "meta": {"note": "keys before the array are skipped", "n": [1, 2.5e3, {"x": "]"}]},
+    "jobs": [
+        {"company": "Google", "role": "developer", "url": "a\"]}", "salary": -12.75},
+        {"role": "Developer", "location": "Remote", "tags": ["x", {"y": None}], "remote": True},
+        {"company": "ÜberCorp", "role": "designer", "url": "é/ü/😀"},
+        123456789,
+    ],
+    "after": "never read",
+}
+
+def test_iter_json_array_matches_json_loads_for_any_chunk_size():
+    text = json.dumps(DOC, indent=1, ensure_ascii=False)
+    for size in itertools.chain(range(1, 40), (64, 1000, 1 << 16)):
+        assert list(iter_json_array(io.StringIO(text), "jobs", chunk_size=size)) == DOC["jobs"], size
+    assert list(iter_json_array(io.StringIO('{"jobs": []}'))) == []
+    assert list(iter_json_array(io.StringIO('{"other": 1}'))) == []
+
+def test_iter_jobs_reads_jsonl(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    path.write_text("".join(json.dumps(j) + "\n\n" for j in DOC["jobs"][:3]), encoding="utf-8")
+    assert list(iter_jobs(str(path))) == DOC["jobs"][:3]
+
+def test_stream_matches_job_search():
+    for args in ({}, {"role": "developer"}, {"role": "DEVELOPER", "location": "remote"},
+                 {"company": "google", "date_posted": "last week"}, {"role": "nobody"},
+                 {"role": "developer", "offset": 2, "limit": 3}, {"limit": 0}):
+        assert list(job_search_stream(dict(args))) == job_search(dict(args)), args
+
+def test_first_result_arrives_before_the_file_is_read(tmp_path, monkeypatch):
+    path = tmp_path / "jobs.json"
+    rows = [{"role": "developer", "url": f"x/{i}"} for i in range(20_000)]
+    path.write_text(json.dumps({"jobs": rows}), encoding="utf-8")
+    reads = []
+    real = job_stream._Reader.fill
+    def counting_fill(self):
+        reads.append(1)
+        return real(self)
+    monkeypatch.setattr(job_stream._Reader, "fill", counting_fill)
+    stream = job_search_stream({"role": "developer"}, path=str(path))
+    assert next(stream) == rows[0]
+    assert len(reads) == 1
+    assert sum(1 for _ in stream) == len(rows) - 1
+
+def test_answer_stream_pages_and_falls_back():
+    q = "find developer jobs"
+    everything = answer(q)
+    assert list(answer_stream(q)) == everything
+    assert list(answer_stream(q, offset=1, limit=2)) == everything[1:3]
+    assert list(answer_stream("what is 2 plus 2")) == [answer("what is 2 plus 2")]
+
+def test_stream_and_store_agree_on_non_string_values(tmp_path):
+    path = tmp_path / "jobs.json"
+    jobs = [{"role": "dev", "location": 123}, {"role": "dev", "location": None}, {"role": "dev"},
+            {"role": 7, "location": "123"}, {"role": "DEV", "location": "Remote"}]
+    path.write_text(json.dumps({"jobs": jobs}), encoding="utf-8")
+    store = JobStore(str(path)).snapshot()
+    for filters in ({}, {"role": "dev"}, {"location": "123"}, {"role": "7"}, {"location": "remote"}, {"location": "none"}):
+        assert list(job_search_stream(dict(filters), path=str(path))) == store.search(filters), filters
+
+def test_stream_reads_a_snapshot_path(tmp_path):
+    path = tmp_path / "jobs.json"
+    jobs = [{"role": "developer", "company": "Acme", "url": f"x/{i}"} for i in range(5)] + [{"role": "designer"}]
+    path.write_text(json.dumps({"jobs": jobs}), encoding="utf-8")
+    compile_snapshot(JobStore(str(path)))
+    snap = snapshot_path(str(path))
+    assert list(job_search_stream({"role": "developer", "offset": 1, "limit": 2}, path=snap)) == jobs[1:3]
+    assert list(job_search_stream({"role": "designer"}, path=snap)) == jobs[5:]
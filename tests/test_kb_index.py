@@ -0,0 +1,48 @@
+import random
+import re
+from agent.kb_index import STOP_WORDS, KBIndex, tokenize
+
+NAMES = ["Ada Lovelace", "Alan Turing", "Al", "Grace Hopper", "Ada", "Turing Award", ""]
+SUMMARIES = [
+    "Ada Lovelace was an early computing pioneer for her work on the Analytical Engine.",
+    "Alan Turing was the father of theoretical computer science and artificial intelligence.",
+    "Al is a short name.",
+    "Grace Hopper wrote one of the first compilers; she popularized machine-independent languages.",
+    "A programming language named after Ada Lovelace.",
+    "The Turing Award is the highest distinction in computer science.",
+    "An entry with no name about snake_case identifiers.",
+]
+
+def legacy_match_prompt(prompt):
+    prompt_words = tokenize(prompt)
+    for i, (name, summary) in enumerate(zip(NAMES, SUMMARIES)):
+        if name.lower() in prompt.lower():
+            return i, None
+        summary_words = set(tokenize(summary))
+        for word in prompt_words:
+            if word not in STOP_WORDS and word in summary_words:
+                return i, word
+    return None
+
+def legacy_lookup(q):
+    for i, (name, summary) in enumerate(zip(NAMES, SUMMARIES)):
+        if q.lower() in name.lower():
+            return i, True
+        if q.lower() in re.findall(r"\w+", summary.lower()):
+            return i, False
+    return None
+
+def test_kb_index_matches_linear_scan():
+    rng = random.Random(7)
+    vocab = " ".join(SUMMARIES + NAMES).lower().replace(";", " ").split() + ["zzz", "the", "of", "snake_case"]
+    index = KBIndex([n.lower() for n in NAMES], SUMMARIES)
+    for _ in range(500):
+        prompt = " ".join(rng.choice(vocab) for _ in range(rng.randint(0, 6)))
+        assert index.match_prompt(prompt) == legacy_match_prompt(prompt), prompt
+        q = rng.choice(vocab + ["ri", "a", "", "hop", "ada l"])
+        assert index.lookup(q) == legacy_lookup(q), q
+
+def test_kb_index_name_beats_later_summary_word():
+    index = KBIndex([n.lower() for n in NAMES[:2]], SUMMARIES[:2])
+    assert index.match_prompt("alan turing computing") == (0, "computing")
+    assert index.match_prompt("is alan turing the father?") == (1, None)
@@ -0,0 +1,97 @@
+import json
+import math
+import random
+from collections import Counter
+from agent import data_store, kb_rank, llm
+from agent.kb_rank import BM25Index, terms
+from agent.kb_store import KBSnapshot, KBStore
+from agent.router import scan
+from agent.snapshot import compile_snapshot
+from agent.tools import kb_lookup
+
+WORDS = ["engine", "compiler", "graph", "paths", "notes", "program", "machine", "logic", "proof", "code"]
+
+def reference_top_k(names, summaries, query, k):
+    docs = [Counter(terms(f"{n} {s}")) for n, s in zip(names, summaries)]
+    avg = sum(sum(d.values()) for d in docs) / len(docs)
+    df = Counter(word for d in docs for word in d)
+    scores = []
+    for entry, doc in enumerate(docs):
+        score = 0.0
+        for word in dict.fromkeys(terms(query)):
+            if word in doc:
+                idf = math.log(1 + (len(docs) - df[word] + 0.5) / (df[word] + 0.5))
+                tf = doc[word]
+                score += idf * tf * (kb_rank.K1 + 1) / (tf + kb_rank.K1 * (1 - kb_rank.B + kb_rank.B * sum(doc.values()) / avg))
+        if score > 0:
+            scores.append((-score, entry))
+    return [(entry, -score) for score, entry in sorted(scores)[:k]]
+
+def random_kb(rng, n):
+    names = [f"{rng.choice(WORDS).title()} {i}" for i in range(n)]
+    summaries = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12))) for _ in range(n)]
+    return names, summaries
+
+def assert_same_ranking(got, expected, reference_scores):
+    # Weights are float32, so entries whose scores tie to ~1e-7 may swap places, nothing else.
+    assert len(got) == len(expected)
+    for (entry, score), (_, want) in zip(got, expected):
+        assert math.isclose(score, want, rel_tol=1e-5)
+        assert math.isclose(reference_scores[entry], want, rel_tol=1e-5)
+
+def test_top_k_matches_reference_bm25_on_both_merge_paths(monkeypatch):
+    rng = random.Random(4)
+    names, summaries = random_kb(rng, 300)
+    index = BM25Index.build(names, summaries)
+    queries = [" ".join(rng.sample(WORDS, rng.randint(1, 4))) for _ in range(40)] + ["the", "nothing here", ""]
+    for query in queries:
+        expected = reference_top_k(names, summaries, query, len(names))
+        for fraction in (0, 10**9):  # always sparse, always dense
+            monkeypatch.setattr(kb_rank, "SPARSE_FRACTION", fraction)
+            for k in (1, 5, 400):
+                assert_same_ranking(index.top_k(query, k), expected[:k], dict(expected))
+
+def test_shortcuts_return_the_same_top_k_as_a_full_merge(monkeypatch):
+    rng = random.Random(6)
+    names = [f"n{i}" for i in range(3000)]
+    # Few distinct words and lengths, so most scores tie at the single-term and floor cut-offs.
+    summaries = [" ".join(rng.choice(WORDS[:4] + WORDS[:1] * 3) for _ in range(rng.randint(1, 3))) for _ in names]
+    index = BM25Index.build(names, summaries)
+    queries = WORDS[:5] + [" ".join(rng.sample(WORDS[:5], rng.randint(2, 3))) for _ in range(30)]
+    monkeypatch.setattr(kb_rank, "SPARSE_FRACTION", 10**9)  # always the dense path with its floor
+    for query in queries:
+        for k in (1, 3, 10, 100, 5000):
+            assert index.top_k(query, k) == kb_rank._select(*index.scores(query), k), (query, k)
+
+def test_equal_scores_keep_file_order():
+    index = BM25Index.build(["a", "b", "c", "d"], ["graph", "graph", "other", "graph"])
+    assert [e for e, _ in index.top_k("graph", 2)] == [0, 1]
+
+def test_mapped_snapshot_ranks_like_the_built_index(tmp_path, monkeypatch):
+    rng = random.Random(8)
+    names, summaries = random_kb(rng, 200)
+    path = tmp_path / "kb.json"
+    path.write_text(json.dumps({"entries": [{"name": n, "summary": s} for n, s in zip(names, summaries)]}))
+    compile_snapshot(KBStore(str(path)))
+    mapped = KBStore(str(path)).snapshot()
+    assert mapped._snap is not None and mapped._snap.has("bm25.docs")
+    monkeypatch.setattr(data_store, "USE_SNAPSHOTS", False)
+    built = KBStore(str(path)).snapshot()
+    for query in ["engine code", "proof", "graph paths logic", "unknown"]:
+        assert mapped.ranker().top_k(query, 7) == built.ranker().top_k(query, 7)
+
+def test_kb_lookup_returns_ranked_entries_with_scores():
+    ranked = kb_lookup("who was alan turing", k=2)
+    assert ranked[0]["name"] == "Alan Turing"
+    assert all(set(r) == {"name", "summary", "score"} for r in ranked)
+    assert [r["score"] for r in ranked] == sorted((r["score"] for r in ranked), reverse=True)
+    assert kb_lookup("zzzz qqqq", k=3) == "No entry found."
+    assert kb_lookup("Alan Turing") == kb_lookup("Alan Turing", k=0)  # first-match mode unchanged
+
+def test_ranked_mode_passes_k_for_exact_and_misspelled_names(monkeypatch):
+    monkeypatch.setattr(llm, "KB_TOP_K", 3)
+    monkeypatch.setattr(llm, "FUZZY_ENABLED", True)
+    assert llm.extract_kb_tool("who was alan turing") == {"tool": "kb", "args": {"q": "who was alan turing", "k": 3}}
+    kb = KBSnapshot([{"name": "Grace Hopper", "summary": "Compiler pioneer."}], (0, 0))
+    prompt = "tell me about grace hoper"
+    assert llm._fuzzy_kb_call(kb, prompt, scan(prompt)) == {"tool": "kb", "args": {"q": "Grace Hopper", "k": 3}}
@@ -0,0 +1,28 @@
+import json
+import os
+from agent.kb_store import KBStore
+
+def write_kb(path, entries):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"entries": entries}, f)
+
+def test_kb_store_loads_once(tmp_path):
+    path = tmp_path / "kb.json"
+    write_kb(path, [{"name": "Grace Hopper", "summary": "Grace Hopper wrote the first compiler."}])
+    store = KBStore(str(path))
+    snap = store.snapshot()
+    assert snap.names_lower == ["grace hopper"]
+    assert snap.index.match_prompt("what is a compiler?") == (0, "compiler")
+    assert store.snapshot() is snap
+
+def test_kb_store_reloads_on_change(tmp_path):
+    path = tmp_path / "kb.json"
+    write_kb(path, [{"name": "Grace Hopper", "summary": "Compilers."}])
+    store = KBStore(str(path))
+    old = store.snapshot()
+    write_kb(path, [{"name": "Edsger Dijkstra", "summary": "Shortest paths and structured programming."}])
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    new = store.snapshot()
+    assert new is not old
+    assert new.names == ["Edsger Dijkstra"]
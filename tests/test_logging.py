@@ -0,0 +1,47 @@
+import logging
+import os
+import subprocess
+import sys
+import uuid
+from logger import pipeline
+from logger.info_logger import info_logger
+from logger.llm_cost_logger import llm_cost_logger
+
+
+def test_handlers_are_attached_once():
+    first = info_logger()
+    assert info_logger() is first
+    assert len(first.handlers) == 1
+    assert len(llm_cost_logger().handlers) == 1
+
+
+def test_records_reach_the_file_after_flush():
+    marker = uuid.uuid4().hex
+    info_logger().info("test_logging: %s %s", marker, {"city": "paris"})
+    pipeline.flush_logs()
+    with open(os.path.join(pipeline.LOG_DIR, "info_logs.log")) as f:
+        lines = [line for line in f if marker in line]
+    assert len(lines) == 1
+    assert lines[0].rstrip().endswith(f"INFO test_logging: {marker} {{'city': 'paris'}}")
+
+
+def test_queued_records_keep_the_message_at_call_time():
+    marker = uuid.uuid4().hex
+    args = {"n": 1}
+    info_logger().info("test_logging: %s %s", marker, args)
+    args["n"] = 2
+    pipeline.flush_logs()
+    with open(os.path.join(pipeline.LOG_DIR, "info_logs.log")) as f:
+        assert any(marker in line and "{'n': 1}" in line for line in f)
+
+
+def test_parse_level():
+    assert pipeline._parse_level("debug") == logging.DEBUG
+    assert pipeline._parse_level("nonsense") == logging.INFO
+
+
+def test_importing_the_agent_keeps_stdlib_record_fields():
+    code = ("import logging, agent.agent, agent.server; "
+            "print(logging.logThreads, logging.logProcesses, logging._srcfile is not None)")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["True", "True", "True"]
@@ -0,0 +1,79 @@
+import copy
+import dataclasses
+from agent import registry
+from agent.agent import answer
+from agent.memo import ResultMemo, SQLiteMemoBackend
+
+calls = []
+
+def counted_temp(city, keyword, context=None):
+    calls.append(city)
+    if context is not None:
+        context[city] = len(calls)
+    return len(calls)
+
+WEATHER = dataclasses.replace(registry.get_tool("weather"), runner=counted_temp)
+
+def run(memo, spec, args, context):
+    return memo.call(spec, args, context, lambda ctx: spec.invoke(args, ctx))
+
+def test_memo_serves_hits_and_replays_context_writes():
+    calls.clear()
+    memo = ResultMemo()
+    first, second = {}, {}
+    assert run(memo, WEATHER, {"city": "paris", "keyword": "temp"}, first) == 1
+    assert run(memo, WEATHER, {"city": "paris", "keyword": "temp"}, second) == 1
+    assert calls == ["paris"] and second == {"paris": 1}
+    stats = memo.stats()["tools"]["weather"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+def test_memo_respects_ttl_and_data_version():
+    calls.clear()
+    memo = ResultMemo()
+    expiring = dataclasses.replace(WEATHER, memo_ttl=-1)
+    run(memo, expiring, {"city": "paris", "keyword": "temp"}, {})
+    run(memo, expiring, {"city": "paris", "keyword": "temp"}, {})
+    assert len(calls) == 2
+    version = [1]
+    versioned = dataclasses.replace(WEATHER, data_version=lambda: version[0])
+    run(memo, versioned, {"city": "dhaka", "keyword": "temp"}, {})
+    run(memo, versioned, {"city": "dhaka", "keyword": "temp"}, {})
+    version[0] = 2
+    run(memo, versioned, {"city": "dhaka", "keyword": "temp"}, {})
+    assert calls[2:] == ["dhaka", "dhaka"]
+
+def test_memo_keys_context_reading_tools_on_context():
+    memo = ResultMemo()
+    calc = registry.get_tool("calc")
+    assert run(memo, calc, {"expr": "paris plus 1"}, {"paris": 18}) == 19
+    assert run(memo, calc, {"expr": "paris plus 1"}, {"paris": 20}) == 21
+
+def test_memo_shared_backend(tmp_path):
+    calls.clear()
+    path = str(tmp_path / "memo.sqlite")
+    writer, reader = ResultMemo(backend=SQLiteMemoBackend(path)), ResultMemo(backend=SQLiteMemoBackend(path))
+    run(writer, WEATHER, {"city": "london", "keyword": "temp"}, {})
+    context = {}
+    assert run(reader, WEATHER, {"city": "london", "keyword": "temp"}, context) == 1
+    assert calls == ["london"] and context == {"london": 1}
+    assert reader.stats()["tools"]["weather"]["shared_hits"] == 1
+
+def test_memo_hits_are_copies_callers_may_mutate(tmp_path):
+    jobs = registry.get_tool("job_search")
+    listing = lambda ctx: [{"role": "engineer"}, {"role": "designer"}]
+    for memo in (ResultMemo(), ResultMemo(backend=SQLiteMemoBackend(str(tmp_path / "memo.sqlite")))):
+        first = memo.call(jobs, {"location": "germany"}, {}, listing)
+        first[0]["role"] = "changed"
+        second = memo.call(jobs, {"location": "germany"}, {}, listing)
+        assert second == [{"role": "engineer"}, {"role": "designer"}]
+        second.clear()
+        memo._entries.clear()  # the shared backend's copy must be unaffected too
+        third = memo.call(jobs, {"location": "germany"}, {}, listing)
+        assert third == [{"role": "engineer"}, {"role": "designer"}] and third is not second
+
+def test_mutating_an_answer_does_not_change_the_next_one():
+    first = answer("Find jobs in Germany")
+    expected = copy.deepcopy(first)
+    first[0]["role"] = "changed"
+    first.clear()
+    assert answer("Find jobs in Germany") == expected
@@ -0,0 +1,52 @@
+import constants
+from agent import llm
+from agent.llm import call_llm
+from agent.plan_cache import PLAN_CACHE, PlanCache
+
+def test_plan_cache_hits_on_normalized_prompt():
+    PLAN_CACHE.clear()
+    first = call_llm("What is 2 plus 2?")
+    second = call_llm("  what is 2 PLUS 2?\n")
+    assert first == second == [{"tool": "calc", "args": {"expr": "what is 2 plus 2?"}}]
+    assert (PLAN_CACHE.stats()["hits"], PLAN_CACHE.stats()["misses"]) == (1, 1)
+
+def test_plan_cache_never_changes_a_plan():
+    PLAN_CACHE.clear()
+    fresh = [call_llm(p) for p in ("who is ada  lovelace", "who is ada lovelace?")]
+    PLAN_CACHE.clear()
+    call_llm("who is ada lovelace")
+    assert [call_llm(p) for p in ("who is ada  lovelace", "who is ada lovelace?")] == fresh
+
+def test_plan_cache_invalidated_by_planner_settings(monkeypatch):
+    PLAN_CACHE.clear()
+    assert call_llm("who is ada lovelace")[0]["args"] == {"q": "Ada Lovelace"}
+    monkeypatch.setattr(llm, "KB_TOP_K", 3)
+    assert call_llm("who is ada lovelace")[0]["args"] == {"q": "who is ada lovelace", "k": 3}
+    assert PLAN_CACHE.stats()["hits"] == 0
+
+def test_plan_cache_returns_copies():
+    PLAN_CACHE.clear()
+    call_llm("weather in london")[0]["args"]["city"] = "mutated"
+    assert call_llm("weather in london")[0]["args"]["city"] == "london"
+
+def test_plan_cache_invalidated_by_keyword_table_change():
+    PLAN_CACHE.clear()
+    assert call_llm("weather in berlin")[0]["args"]["city"] == "paris"
+    constants.WEATHER["berlin"] = "windy"
+    try:
+        assert call_llm("weather in berlin")[0]["args"]["city"] == "berlin"
+    finally:
+        del constants.WEATHER["berlin"]
+    assert call_llm("weather in berlin")[0]["args"]["city"] == "paris"
+    assert PLAN_CACHE.stats()["hits"] == 0
+
+def test_plan_cache_lru_and_ttl():
+    cache = PlanCache(maxsize=2, ttl=None)
+    for key in ("a", "b", "c"):
+        cache.put(key, 0, [])
+    assert cache.get("a", 0) is None and cache.get("c", 0) == []
+    assert cache.get("c", 1) is None  # other generation
+    assert cache.stats()["evictions"] == 1
+    expired = PlanCache(ttl=-1)
+    expired.put("a", 0, [])
+    assert expired.get("a", 0) is None
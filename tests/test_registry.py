@@ -0,0 +1,35 @@
+import pytest
+from agent import registry
+from agent.agent import answer, run_tool
+from agent.llm import call_llm
+from agent.registry import NONE, ToolSpec
+
+def echo(text, context=None):
+    return text.upper()
+
+def extract_echo(prompt, hits):
+    if prompt.startswith("echo "):
+        return {"tool": "echo", "args": {"text": prompt[5:]}}
+    return None
+
+def test_registered_tool_is_planned_and_dispatched():
+    registry.register(ToolSpec(
+        name="echo", runner=echo, extractor=extract_echo, priority=0,
+        args={"text": str}, required=frozenset({"text"}), reads=lambda a: NONE, writes=lambda a: NONE,
+    ))
+    try:
+        assert call_llm("echo hello")[0] == {"tool": "echo", "args": {"text": "hello"}}
+        assert answer("echo hello") == "HELLO"
+    finally:
+        registry.unregister("echo")
+    assert answer("echo hello") == "Sorry, I could not find an answer."
+
+def test_builtin_tools_keep_their_priorities():
+    assert [(s.name, s.priority) for s in registry.all_tools()] == [("calc", 2), ("weather", 1), ("kb", 1), ("job_search", 2)]
+
+def test_dispatch_validates_args():
+    with pytest.raises(TypeError):
+        run_tool({"tool": "weather", "args": {"city": "paris"}}, {})
+    with pytest.raises(TypeError):
+        run_tool({"tool": "job_search", "args": {"limit": "ten"}}, {})
+    assert run_tool({"tool": "nope", "args": {}}, {}) is None
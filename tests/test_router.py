@@ -0,0 +1,92 @@
+import random
+from constants import (
+    OP_MAP, WEATHER, WEATHER_KEYWORDS, JOB_KEYWORDS, ROLE_KEYWORDS,
+    LOCATION_KEYWORDS, DATE_KEYWORDS, COMPANY_KEYWORDS,
+)
+from agent import entity_index, llm
+from agent.llm import call_llm, extract_kb_tool
+from agent.plan_cache import PLAN_CACHE
+from agent.router import KeywordRouter
+
+# The per-tool keyword scans call_llm used before the single-pass router.
+
+def legacy_calc(prompt):
+    if any(k in prompt for k in set(OP_MAP.keys()) | set(OP_MAP.values())):
+        return {"tool": "calc", "args": {"expr": prompt}}
+    return None
+
+def legacy_weather(prompt):
+    keyword = next((k for k in WEATHER_KEYWORDS if k in prompt), None)
+    if not keyword:
+        return []
+    # The original iterated set(WEATHER), whose order varied between runs; the router uses table order.
+    cities = [c for c in WEATHER if c in prompt] or ["paris"]
+    return [{"tool": "weather", "args": {"city": c, "keyword": keyword}} for c in cities]
+
+def legacy_job_search(prompt):
+    has_job = any(k in prompt for k in JOB_KEYWORDS)
+    role = next((r for r in ROLE_KEYWORDS if r in prompt), None)
+    company = next((c for c in COMPANY_KEYWORDS if c in prompt), None)
+    if not has_job and not role:
+        return None
+    args = {}
+    if role:
+        args["role"] = role
+    if company:
+        args["company"] = company
+    location = next((l for l in LOCATION_KEYWORDS if l in prompt), None)
+    if location:
+        args["location"] = location
+    date = next((d for d in DATE_KEYWORDS if d in prompt), None)
+    if date:
+        args["date_posted"] = date
+    return {"tool": "job_search", "args": args}
+
+def legacy_plan(prompt):
+    prompt = prompt.lower().strip()
+    calls = [legacy_calc(prompt)] + legacy_weather(prompt) + [extract_kb_tool(prompt), legacy_job_search(prompt)]
+    priority = {"weather": 1, "kb": 1, "calc": 2, "job_search": 2}
+    return sorted([c for c in calls if c], key=lambda c: priority[c["tool"]])
+
+def corpus(n=2000):
+    rng = random.Random(3)
+    words = (
+        list(OP_MAP) + list(WEATHER) + WEATHER_KEYWORDS + JOB_KEYWORDS + ROLE_KEYWORDS + LOCATION_KEYWORDS
+        + DATE_KEYWORDS + COMPANY_KEYWORDS + ["what is", "in", "find", "ada lovelace", "father", "12", "3.5", "?"]
+    )
+    fixed = [
+        "What is 12.5% of 243?", "add 10 to the average temperature in paris and london right now",
+        "Find software engineer jobs in Dhaka at Optimizly posted 24h", "Unknown query", "who is alan turing",
+        "temperatures in AMSTERDAM, dhaka", "swearing developers", "",
+    ]
+    return fixed + [" ".join(rng.choice(words) for _ in range(rng.randint(1, 8))) for _ in range(n)]
+
+def test_router_matches_legacy_extractors(monkeypatch):
+    monkeypatch.setattr(entity_index, "FUZZY_ENABLED", False)
+    monkeypatch.setattr(llm, "FUZZY_ENABLED", False)
+    PLAN_CACHE.clear()
+    try:
+        for prompt in corpus():
+            assert (call_llm(prompt) or []) == (legacy_plan(prompt) if prompt else []), prompt
+    finally:
+        PLAN_CACHE.clear()
+
+def test_fuzzy_resolution_only_fills_slots_with_data_values(monkeypatch):
+    monkeypatch.setattr(entity_index, "FUZZY_ENABLED", True)
+    monkeypatch.setattr(llm, "FUZZY_ENABLED", True)
+    PLAN_CACHE.clear()
+    try:
+        for prompt in corpus():
+            expected = legacy_plan(prompt) if prompt else []
+            if "optimizly" in prompt.lower():  # not a router keyword, but the company as jobs.json spells it
+                expected[0]["args"]["company"] = "optimizly"
+            assert (call_llm(prompt) or []) == expected, prompt
+    finally:
+        PLAN_CACHE.clear()
+
+def test_router_reports_shared_keywords_to_every_table():
+    router = KeywordRouter({"a": ["new york", "york"], "b": ["york", "ork"]})
+    hits = router.scan("i live in new york")
+    assert hits.all("a") == ["new york", "york"]
+    assert hits.all("b") == ["york", "ork"]
+    assert not router.scan("nothing").any("a")
@@ -0,0 +1,140 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import pytest
+from agent.agent import answer
+from agent.client import Client, Overloaded
+
+ENV = dict(os.environ, AGENT_LOG_MODE="off")
+
+
+def start(workers, queue):
+    path = os.path.join(tempfile.mkdtemp(), "agent.sock")
+    proc = subprocess.Popen([sys.executable, "-m", "agent.server", "--socket", path, "--workers", str(workers),
+                             "--queue", str(queue)], env=ENV, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            with Client(path) as client:
+                if client.stats()["workers"] == workers:
+                    return proc, path
+        except OSError:
+            pass
+        assert time.monotonic() < deadline, "server did not start"
+        time.sleep(0.05)
+
+
+def stop(proc, path):
+    proc.send_signal(signal.SIGTERM)
+    assert proc.wait(10) == 0
+    assert not os.path.exists(path)
+
+
+@pytest.fixture(scope="module")
+def server():
+    proc, path = start(workers=2, queue=8)
+    yield path
+    stop(proc, path)
+
+
+def test_answers_match_in_process(server):
+    prompts = ["What is 12.5% of 243?", "What's the temperature in Dhaka?", "Who is Ada Lovelace?",
+               "Find developer jobs in remote", "add 10 to the average temperature in paris and london"]
+    with Client(server) as client:
+        for prompt in prompts:
+            assert client.ask(prompt) == json.loads(json.dumps(answer(prompt), default=str)), prompt
+
+
+def test_thin_client_cli_prints_what_the_local_cli_prints(server):
+    for prompt in ["What is 1 + 1?", "Find developer jobs in remote"]:
+        outputs = [
+            subprocess.run([sys.executable, "main.py", prompt], env=dict(ENV, AGENT_SOCKET=server, AGENT_SERVER=flag),
+                           capture_output=True, text=True, check=True).stdout
+            for flag in ("1", "0")
+        ]
+        assert outputs[0] == outputs[1], prompt
+
+
+def test_worker_crash_is_replaced(server):
+    with Client(server) as client:
+        before = client.stats()
+        os.kill(before["pids"][0], signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        while client.stats()["respawned"] == before["respawned"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        after = client.stats()
+        assert after["workers"] == 2 and before["pids"][0] not in after["pids"]
+        assert client.ask("What is 2 plus 2?") == 4
+
+
+def test_full_queue_sheds_requests():
+    proc, path = start(workers=1, queue=1)
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(path)
+        sock.sendall(b"".join(json.dumps({"id": i, "q": f"what is {i} plus 1"}).encode() + b"\n" for i in range(5))
+                     + b"{not json\n")
+        reader = sock.makefile("rb")
+        replies = {}
+        for _ in range(6):
+            reply = json.loads(reader.readline())
+            replies.setdefault(reply["id"], []).append(reply)
+        sock.close()
+        assert replies[0][0]["answer"] == 1 and replies[1][0]["answer"] == 2
+        assert all(replies[i][0]["error"] == "overloaded" for i in (2, 3, 4))
+        assert replies[None][0]["error"].startswith("bad request")
+        with Client(path) as client:
+            assert client.stats()["shed"] == 3
+            assert client.ask("what is 3 times 3") == 9
+    finally:
+        stop(proc, path)
+
+
+
+def fake_server(reply):
+    """A socket whose "server" answers one request with `reply` and closes; None never answers."""
+    path = os.path.join(tempfile.mkdtemp(), "fake.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+
+    def serve():
+        conn, _ = listener.accept()
+        with conn:
+            conn.makefile("rb").readline()
+            if reply is None:
+                time.sleep(60)
+            else:
+                conn.sendall(reply)
+        listener.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return path
+
+
+def test_overloaded_reply_raises_and_the_cli_falls_back():
+    with Client(fake_server(b'{"id": 1, "error": "overloaded"}\n')) as client:
+        with pytest.raises(Overloaded):
+            client.ask("What is 1 + 1?")
+    cli = lambda env: subprocess.run([sys.executable, "main.py", "What is 1 + 1?"], env=env,
+                                     capture_output=True, text=True, check=True).stdout
+    local = cli(dict(ENV, AGENT_SERVER="0"))
+    for reply in (b'{"id": 1, "error": "overloaded"}\n', b'{"id": 1, "error": "ValueError: boom"}\n', b""):
+        assert cli(dict(ENV, AGENT_SOCKET=fake_server(reply), AGENT_SERVER="1")) == local, reply
+
+
+def test_cli_falls_back_when_the_server_never_answers():
+    env = dict(ENV, AGENT_SOCKET=fake_server(None), AGENT_SERVER="1", AGENT_SERVER_TIMEOUT="0.5")
+    start = time.monotonic()
+    out = subprocess.run([sys.executable, "main.py", "What is 1 + 1?"], env=env, capture_output=True,
+                         text=True, check=True, timeout=30).stdout
+    assert out == subprocess.run([sys.executable, "main.py", "What is 1 + 1?"], env=dict(ENV, AGENT_SERVER="0"),
+                                 capture_output=True, text=True, check=True).stdout
+    assert time.monotonic() - start < 20
@@ -0,0 +1,133 @@
+import json
+import os
+import random
+import pytest
+from agent import data_store
+from agent.aho_corasick import AhoCorasick, MappedAhoCorasick
+from agent.job_store import JobStore
+from agent.kb_store import KBStore
+from agent.snapshot import Snapshot, SnapshotError, SnapshotWriter, StringTable, compile_snapshot, snapshot_path
+
+KB = {"entries": [
+    {"name": "Grace Hopper", "summary": "Grace Hopper wrote the first compiler."},
+    {"name": "Ada Lovelace", "summary": "Notes on the Analytical Engine, the first program."},
+    {"name": "Edsger Dijkstra", "summary": "Shortest paths and structured programming."},
+    {"name": "Ümit Çelik", "summary": "Works on Unicode normalisation 😀."},
+]}
+JOBS = {"jobs": [
+    {"company": "Google", "role": "Developer", "location": "remote", "date_posted": "24h", "url": "x/1"},
+    {"role": "developer", "url": "x/2", "salary": 120000, "tags": ["a", {"b": None}]},
+    {"company": "GOOGLE", "date_posted": "1w", "role": "designer", "url": "é/3"},
+]}
+
+
+def write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def json_view(store_class, path, monkeypatch):
+    monkeypatch.setattr(data_store, "USE_SNAPSHOTS", False)
+    view = store_class(path).snapshot()
+    monkeypatch.setattr(data_store, "USE_SNAPSHOTS", True)
+    return view
+
+
+def test_mapped_automaton_matches_dict_automaton():
+    rng = random.Random(3)
+    alphabet = "abcé "
+    patterns = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))) for _ in range(200)]
+    ac = AhoCorasick(patterns)
+    mapped = MappedAhoCorasick(*(ac.tables()[k] for k in ("starts", "chars", "targets", "fail", "best")))
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet + "xz") for _ in range(rng.randint(0, 30)))
+        assert mapped.first_match(text) == ac.first_match(text), text
+
+
+def test_writer_round_trips_sections(tmp_path):
+    writer = SnapshotWriter("test", (1, 2))
+    writer.array("ints", "I", [1, 2, 3])
+    writer.strings("words", ["", "héllo", "😀"])
+    writer.postings("post", {"a": [0, 4], "": [2], "ü": []})
+    writer.mapping("map", {"x": 7})
+    writer.write(str(tmp_path / "t.snap"))
+    snap = Snapshot(str(tmp_path / "t.snap"), "test", (1, 2))
+    assert list(snap.array("ints")) == [1, 2, 3]
+    assert list(snap.strings("words")) == ["", "héllo", "😀"]
+    post = snap.postings("post")
+    assert list(post.get("a")) == [0, 4] and list(post.get("")) == [2] and list(post.get("ü")) == []
+    assert post.get("b") is None and "a" in post
+    assert snap.mapping("map").get("x") == 7 and snap.mapping("map").get("y", -1) == -1
+    with pytest.raises(SnapshotError):
+        Snapshot(str(tmp_path / "t.snap"), "kb")
+    with pytest.raises(SnapshotError):
+        Snapshot(str(tmp_path / "t.snap"), "test", (1, 3))
+
+
+def test_kb_snapshot_serves_the_same_answers(tmp_path, monkeypatch):
+    path = write(tmp_path / "kb.json", KB)
+    compile_snapshot(KBStore(path))
+    expected = json_view(KBStore, path, monkeypatch)
+    kb = KBStore(path).snapshot()
+    assert isinstance(kb.names, StringTable) and kb.version == expected.version
+    assert list(kb.names) == expected.names and list(kb.summaries) == expected.summaries
+    for q in ["who is grace hopper?", "tell me about the analytical engine", "shortest path", "ümit", "nothing here", ""]:
+        assert kb.index.match_prompt(q) == expected.index.match_prompt(q), q
+    for q in ["grace", "ra", "g", "first", "programming", "çel", "unicode", "zz", ""]:
+        assert kb.index.lookup(q) == expected.index.lookup(q), q
+
+
+def test_job_snapshot_rebuilds_rows_and_filters(tmp_path, monkeypatch):
+    path = write(tmp_path / "jobs.json", JOBS)
+    compile_snapshot(JobStore(path))
+    expected = json_view(JobStore, path, monkeypatch)
+    jobs = JobStore(path).snapshot()
+    assert [jobs.row(i) for i in range(jobs.count)] == JOBS["jobs"]
+    assert [list(jobs.row(i)) for i in range(jobs.count)] == [list(j) for j in JOBS["jobs"]]
+    for filters in ({}, {"role": "DEVELOPER"}, {"company": "google"}, {"company": "google", "date_posted": "1W"},
+                    {"location": ""}, {"role": "nobody"}):
+        assert jobs.search(filters) == expected.search(filters), filters
+        assert jobs.search(filters, limit=1, offset=1) == expected.search(filters, limit=1, offset=1)
+    for prompt in ("devloper jobs at gogle", "designer jobs, remote"):
+        tables = ("role", "company", "location")
+        assert jobs.fuzzy_values().resolve(prompt, tables) == expected.fuzzy_values().resolve(prompt, tables)
+    assert jobs.fuzzy_values().resolve("devloper jobs at gogle", ("role", "company")) == {
+        "role": ["developer"], "company": ["google"]}
+
+
+def test_job_snapshot_keeps_non_string_filter_values(tmp_path, monkeypatch):
+    data = {"jobs": [
+        {"role": 7, "location": None, "company": True, "url": "x/1"},
+        {"role": "7", "location": ["remote", "uk"], "company": 1, "url": "x/2"},
+        {"role": 7.5, "company": "Google", "url": "x/3"},
+    ]}
+    path = write(tmp_path / "jobs.json", data)
+    compile_snapshot(JobStore(path))
+    expected = json_view(JobStore, path, monkeypatch)
+    jobs = JobStore(path).snapshot()
+    rows = [jobs.row(i) for i in range(jobs.count)]
+    assert rows == [expected.row(i) for i in range(expected.count)] == data["jobs"]
+    assert [type(r["company"]) for r in rows] == [bool, int, str]
+    for filters in ({"role": "7"}, {"location": ""}, {"company": "true"}, {"role": "7.5"}):
+        assert jobs.search(filters) == expected.search(filters), filters
+
+
+def test_stale_or_foreign_snapshot_falls_back_to_json(tmp_path):
+    path = write(tmp_path / "kb.json", KB)
+    compile_snapshot(KBStore(path))
+    write(tmp_path / "kb.json", {"entries": KB["entries"][:1]})
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    kb = KBStore(path).snapshot()
+    assert kb.names == ["Grace Hopper"]
+
+    jobs_path = write(tmp_path / "jobs.json", JOBS)
+    os.replace(snapshot_path(path), snapshot_path(jobs_path))  # a kb snapshot where a jobs one belongs
+    assert JobStore(jobs_path).snapshot().search({"role": "designer"}) == [JOBS["jobs"][2]]
+
+
+def test_store_can_point_at_the_snapshot_directly(tmp_path):
+    path = write(tmp_path / "jobs.json", JOBS)
+    snap = compile_snapshot(JobStore(path))
+    os.remove(path)
+    assert JobStore(snap).snapshot().search({"role": "developer"}) == JOBS["jobs"][:2]
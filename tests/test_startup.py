@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+from agent import token_count, warm_state
+from agent.token_count import BPECounter, load_ranks
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = ["What is 12.5% of 243?", "Who is Ada Lovelace?", "naïve café résumé", ""]
+
+
+def run_python(code, **env):
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=dict(os.environ, **env),
+                          check=True, capture_output=True, text=True).stdout
+
+
+def test_import_has_no_side_effects_and_skips_unused_modules(tmp_path):
+    log_dir = tmp_path / "logs"
+    out = run_python(
+        "import sys, threading, agent.agent\n"
+        "print(sorted(m for m in ('asyncio', 'http.client', 'sqlite3', 'logging.handlers', 'argparse',"
+        " 'concurrent.futures.thread') if m in sys.modules))\n"
+        "print(threading.active_count())\n"
+        "agent.agent.answer('What is 2 plus 3?')\n",
+        AGENT_LOG_DIR=str(log_dir))
+    loaded, threads = out.splitlines()
+    assert loaded == "[]"
+    assert threads == "1"  # no log writer thread until something is logged
+    assert (log_dir / "info_logs.log").exists()
+
+
+def test_import_creates_no_log_directory(tmp_path):
+    log_dir = tmp_path / "logs"
+    run_python("import agent.agent, agent.async_agent, agent.server", AGENT_LOG_DIR=str(log_dir))
+    assert not log_dir.exists()
+
+
+def test_warm_state_gives_the_same_counts(tmp_path, monkeypatch):
+    path = str(tmp_path / "warm_state.bin")
+    assert set(warm_state.compile_warm_state(path)) == {"bpe"}
+    monkeypatch.setattr(warm_state, "WARM_STATE_PATH", path)
+    warm_state.reset()
+    try:
+        warm = warm_state.load("bpe", token_count.VOCAB_PATH)
+        assert warm is not None and warm[0] == load_ranks(token_count.VOCAB_PATH)
+        cold, hot = BPECounter(load_ranks(token_count.VOCAB_PATH)), BPECounter.from_file()
+        assert hot.ascii_tokens == cold.ascii_tokens
+        assert [hot.count(s) for s in SAMPLES] == [cold.count(s) for s in SAMPLES]
+    finally:
+        warm_state.reset()
+
+
+def test_warm_state_is_ignored_when_its_source_changes(tmp_path, monkeypatch):
+    vocab = tmp_path / "vocab.tiktoken"
+    with open(token_count.VOCAB_PATH, "rb") as f:
+        vocab.write_bytes(f.read())
+    monkeypatch.setattr(token_count, "VOCAB_PATH", str(vocab))
+    path = str(tmp_path / "warm_state.bin")
+    warm_state.compile_warm_state(path)
+    monkeypatch.setattr(warm_state, "WARM_STATE_PATH", path)
+    warm_state.reset()
+    try:
+        assert warm_state.load("bpe", str(vocab)) is not None
+        with open(vocab, "ab") as f:
+            f.write(b"\n")
+        assert warm_state.load("bpe", str(vocab)) is None
+        (tmp_path / "warm_state.bin").write_bytes(b"not a warm state file")
+        warm_state.reset()
+        assert warm_state.load("bpe", str(vocab)) is None
+    finally:
+        warm_state.reset()
@@ -0,0 +1,61 @@
+import base64
+import pytest
+from agent import token_count
+from agent.token_count import BPECounter, WhitespaceCounter, count_tokens, load_ranks, set_counter
+
+
+def tiny_ranks():
+    ranks = {bytes([b]): b for b in range(256)}
+    for token in [b"lo", b"low", b"er", b" low", b"lower"]:
+        ranks[token] = len(ranks)
+    return ranks
+
+
+def test_merges_follow_rank_order():
+    counter = BPECounter(tiny_ranks())
+    assert counter.merge_count(b"lower") == 1
+    assert counter.merge_count(b"lowest") == 4  # low + e + s + t
+    assert counter.count("lower lower") == 3  # "lower", then " lower" -> " low" + "er"
+    assert counter.count("") == 0
+
+
+def test_non_ascii_text_is_counted_by_bytes():
+    counter = BPECounter(tiny_ranks())
+    assert counter.count("é") == 2
+    assert counter.count("lowé") == 3
+
+
+def test_bundled_vocab_counts_punctuation_and_numbers():
+    counter = BPECounter.from_file()
+    assert len(counter.ranks) == 8192
+    prompt = "What is 12.5% of 243?"
+    assert counter.count(prompt) > WhitespaceCounter().count(prompt)
+    assert counter.count(prompt) == counter.count(prompt)
+    assert counter.count.cache_info().hits >= 1
+
+
+def test_load_ranks_roundtrip(tmp_path):
+    path = tmp_path / "vocab.tiktoken"
+    path.write_bytes(b"".join(base64.b64encode(t) + b" %d\n" % r for t, r in tiny_ranks().items()))
+    assert load_ranks(str(path)) == tiny_ranks()
+
+
+def test_set_counter_switches_log_cost_counting():
+    from agent.llm import log_cost
+    try:
+        set_counter(WhitespaceCounter())
+        assert log_cost("what is 2+2?", "calc(expr=what is 2+2?)")["prompt_tokens"] == 3
+    finally:
+        set_counter(None)
+    assert count_tokens("what is 2+2?") > 3
+
+
+def test_matches_tiktoken_on_the_same_vocab():
+    tiktoken = pytest.importorskip("tiktoken")
+    counter = BPECounter.from_file()
+    enc = tiktoken.Encoding("bundled", pat_str=token_count.PIECE_PATTERN.pattern,
+                            mergeable_ranks=counter.ranks, special_tokens={})
+    with open("README.md", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    for text in lines + ["Wie ist das Wetter in München? 東京の天気は？", "  a\n\n b\t c", "x_1 __init__"]:
+        assert counter.count(text) == len(enc.encode_ordinary(text)), text
@@ -0,0 +1,66 @@
+import random
+from agent import executor
+from agent.tracing import NOOP_SPAN, Histogram, Tracer
+
+
+def test_histogram_percentiles_within_bucket_error():
+    rng = random.Random(7)
+    values = sorted(rng.randint(1_000, 5_000_000) for _ in range(10_000))
+    hist = Histogram()
+    for v in values:
+        hist.record(v)
+    for q in (50, 95, 99):
+        exact = values[int(len(values) * q / 100) - 1]
+        assert abs(hist.percentile(q) - exact) / exact < 0.07
+    assert hist.count == len(values) and hist.max == values[-1]
+
+
+def test_histogram_buckets_are_monotonic():
+    last = -1
+    for ns in range(0, 5000):
+        idx = Histogram.bucket(ns)
+        assert idx >= last and Histogram.lower_bound(idx) <= ns < Histogram.lower_bound(idx + 1)
+        last = idx
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    assert tracer.span("answer") is NOOP_SPAN
+    with tracer.span("answer"):
+        pass
+    assert tracer.stats() == {} and not tracer.spans
+
+
+def test_nested_spans_share_a_trace_and_link_parents():
+    tracer = Tracer(enabled=True)
+    with tracer.span("answer") as root:
+        with tracer.span("tool", "calc") as child:
+            pass
+    assert child.parent_id == root.span_id and child.trace_id == root.trace_id
+    assert set(tracer.stats()) == {"answer", "tool.calc"}
+    otel = tracer.otel_trace()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {s["name"]: s.get("parentSpanId") for s in otel}["tool.calc"] == f"{root.span_id:016x}"
+    events = tracer.chrome_trace()["traceEvents"]
+    assert {e["name"] for e in events} == {"answer", "tool.calc"} and all(e["ph"] == "X" for e in events)
+
+
+def test_histogram_only_mode_keeps_no_spans():
+    tracer = Tracer(enabled=True)
+    tracer.enable(keep_spans=False)
+    with tracer.span("answer"):
+        pass
+    assert tracer.stats()["answer"]["count"] == 1 and not tracer.spans
+
+
+def test_parallel_tool_spans_keep_their_parent():
+    tracer = Tracer(enabled=True)
+
+    def run(call, context):
+        with tracer.span("tool", call["tool"]):
+            context[call["args"]["city"]] = 1
+
+    tasks = [{"tool": "weather", "args": {"city": c, "keyword": "temp"}} for c in ("paris", "london")]
+    with tracer.span("answer") as root:
+        executor.execute_plan(tasks, {}, run)
+    children = [s for s in tracer.spans if s.name == "tool.weather"]
+    assert len(children) == 2 and all(s.parent_id == root.span_id for s in children)
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+import pytest
+from agent import tools
+from agent.agent import plan
+from agent.async_agent import answer_async
+from agent.executor import execute_plan
+from agent.registry import get_tool
+from agent.weather import HTTPProvider, StaticProvider, WeatherService, set_weather_service
+from benchmarks.weather_stub import WeatherStub, _Handler
+
+PROMPTS = ["weather in paris", "temperature in london", "humidity in dhaka",
+           "add 10 to the average temperature in paris and london"]
+
+
+class CountingProvider(StaticProvider):
+    def __init__(self, gate=None, fail=False):
+        super().__init__()
+        self.calls = []
+        self.gate = gate
+        self.fail = fail
+
+    def fetch(self, cities):
+        self.calls.append(list(cities))
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise OSError("weather service down")
+        return super().fetch(cities)
+
+
+@pytest.fixture
+def use():
+    old = set_weather_service(None)
+    yield lambda service: set_weather_service(service)
+    set_weather_service(old)
+
+
+@pytest.fixture(scope="module")
+def stub():
+    server = WeatherStub().start()
+    yield server
+    server.stop()
+
+
+def run_plan(q):
+    """Runs a plan without the answer memo, so every weather call reaches the service."""
+    return execute_plan(plan(q), {}, lambda call, ctx: get_tool(call["tool"]).invoke(call["args"], ctx))[-1]
+
+
+def test_http_provider_answers_like_static_tables(use, stub):
+    expected = [run_plan(q) for q in PROMPTS]
+    use(WeatherService(HTTPProvider(stub.url), ttl=0))
+    assert [run_plan(q) for q in PROMPTS] == expected
+    assert (tools.temp("Atlantis", "temp"), tools.temp("Atlantis", "weather")) == (20, "clear sky")
+
+
+def test_connections_are_kept_alive(stub):
+    provider = HTTPProvider(stub.url, pool_size=2)
+    for _ in range(5):
+        assert provider.fetch(["paris"]) == {"paris": {"temp": 18, "condition": "mild cloudy"}}
+    assert provider.stats == {"requests": 5, "connections": 1}
+    provider.close()
+
+
+def test_stale_keep_alive_connection_is_retried():
+    class ClosingHandler(_Handler):
+        def _send(self, status, payload):
+            super()._send(status, payload)
+            self.close_connection = True  # drop the connection without announcing it, like an idle timeout
+
+    server = WeatherStub()
+    server.RequestHandlerClass = ClosingHandler
+    server.start()
+    try:
+        provider = HTTPProvider(server.url)
+        assert provider.fetch(["london"])["london"]["temp"] == 17.0
+        time.sleep(0.05)
+        assert provider.fetch(["london"])["london"]["temp"] == 17.0
+        assert provider.stats == {"requests": 2, "connections": 2}
+    finally:
+        server.stop()
+
+
+def test_concurrent_lookups_of_a_city_share_one_fetch(use):
+    gate = threading.Event()
+    provider = CountingProvider(gate)
+    service = WeatherService(provider, ttl=0)
+    use(service)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(tools.temp("Paris", "temp"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    while service.stats["coalesced"] < 7:
+        time.sleep(0.001)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert results == [18] * 8
+    assert provider.calls == [["paris"]]
+
+
+def test_multi_city_plan_fetches_in_one_request(use):
+    provider = CountingProvider()
+    use(WeatherService(provider, ttl=60))
+    assert run_plan("weather in paris, london, dhaka and amsterdam") == "cloudy"
+    assert provider.calls == [["paris", "london", "dhaka", "amsterdam"]]
+    assert asyncio.run(answer_async("temperature in paris and dhaka")) == 31
+    assert len(provider.calls) == 1
+
+
+def test_ttl_cache_expires(use):
+    provider = CountingProvider()
+    use(WeatherService(provider, ttl=0.05))
+    for _ in range(3):
+        assert tools.temp("atlantis", "weather") == "clear sky"
+    assert len(provider.calls) == 1
+    time.sleep(0.06)
+    tools.temp("atlantis", "weather")
+    assert len(provider.calls) == 2
+
+
+def test_backend_failure_falls_back_to_static_data_and_is_not_cached(use):
+    provider = CountingProvider(fail=True)
+    use(WeatherService(provider, ttl=60))
+    assert tools.temp("dhaka", "condition") == "hot & humid"
+    assert tools.temp("dhaka", "temp") == 31
+    assert len(provider.calls) == 2